@@ -1,9 +1,26 @@
-from flask import Flask, jsonify, request, render_template, redirect, url_for, session, flash
+from flask import Flask, jsonify, request, render_template, redirect, url_for, session, flash, Response, stream_with_context
 from flask_cors import CORS
 import oracledb
 from contextlib import contextmanager
+from collections import deque
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from decimal import Decimal
 import logging
+import threading
+import time
+import atexit
+import hmac
+import hashlib
+import base64
+import json
+import math
+import csv
+import io
+import os
+import queue
+import secrets
+import sqlite3
 from functools import wraps
 
 app = Flask(__name__)
@@ -28,15 +45,590 @@ DB_CONFIG = {
 
 TABLE_OWNER = 'SYSTEM'
 
+# Paramètres du pool de sessions Oracle (oracledb.create_pool)
+POOL_CONFIG = {
+    'min': 2,                 # Sessions ouvertes en permanence
+    'max': 20,                # Plafond de sessions simultanées
+    'increment': 2,           # Sessions ajoutées quand le pool est saturé
+    'wait_timeout': 5000,     # Attente max (ms) pour obtenir une session
+    'ping_interval': 0,       # 0 = ping systématique de la session à l'acquisition
+    'stmtcachesize': 100,     # Cache d'instructions par session (>= len(SQL) + variantes de liste)
+    'drain_timeout': 10       # Attente max (s) des sessions occupées à l'arrêt
+}
+
+# Authentification : logons bornés par un sémaphore + cache des droits vérifiés
+AUTH_CONFIG = {
+    'logons_max': 4,          # Logons simultanés max vers Oracle pour /login
+    'wait_timeout': 3000,     # Attente max (ms) d'un créneau d'authentification
+    'cache_ttl': 300,         # Durée de validité (s) d'un couple (utilisateur, rôles) vérifié
+    'max_echecs': 5,          # Échecs tolérés avant blocage
+    'fenetre_echecs': 300,    # Fenêtre (s) de comptage des échecs
+    'duree_blocage': 300,     # Durée (s) du blocage après trop d'échecs
+    'max_suivis': 10000       # Utilisateurs suivis max (compteurs d'échecs)
+}
+
+# Cache en mémoire des lectures fréquentes (tableaux de bord)
+CACHE_CONFIG = {
+    'ttl_defaut': 5,          # Durée de vie (s) d'une entrée
+    'ttl_statistiques': 5,    # Durée de vie (s) des statistiques
+    'ttl_tarifs': 60,         # Borne de sécurité : la version de TARIF (VERSION_DONNEES) invalide avant
+    'ttl_versions': 1,        # Relecture (s) de VERSION_DONNEES : retard max sur une écriture externe
+    'delai_commit': 2,        # Après un changement de version (s) : cache bref et pas d'ETag
+    'attente_calcul': 10      # Attente max (s) du calcul lancé par une autre requête
+}
+
+# Flux Server-Sent Events des tableaux de bord (/events)
+SSE_CONFIG = {
+    'taille_file': 100,       # Événements en attente max par client (au-delà : client déconnecté)
+    'keepalive': 15,          # Intervalle (s) des commentaires keep-alive
+    'veille': 2               # Intervalle (s) de détection des passages des autres processus
+}
+
+# Ingestion groupée des passages (/entree/batch, /sortie/batch)
+LOT_CONFIG = {
+    'taille_max': 1000        # Événements max par lot
+}
+
+# Import en masse des clients et abonnements (/clients/import)
+IMPORT_CONFIG = {
+    'lignes_max': 30000,      # Lignes max par import (limite de SYS.ODCIVARCHAR2LIST)
+    'duree_abonnement': 30    # Durée (jours) des abonnements créés
+}
+
+# Pagination par clé (keyset) des listes
+PAGINATION_CONFIG = {
+    'limite_defaut': 100,     # Taille de page si ?limit est absent
+    'limite_max': 500         # Taille de page maximale acceptée
+}
+
+# Export en flux (?format=ndjson|csv)
+EXPORT_CONFIG = {
+    'arraysize': 1000,        # Lignes récupérées par fetchmany
+    'prefetchrows': 1000,     # Lignes préchargées dès l'exécution
+    'formats': {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv; charset=utf-8'
+    }
+}
+
+# Bornes de dates des listes (?from=&to=&tz=)
+DATES_CONFIG = {
+    'fuseau_base': 'Africa/Casablanca'   # Fuseau des colonnes DATE (SYSDATE du serveur)
+}
+
+# Variante asyncio des routes de passage (app_async.py, oracledb.create_pool_async)
+ASYNC_CONFIG = {
+    'min': 4,                 # Sessions ouvertes en permanence
+    'max': 40,                # Plafond de sessions (les requêtes en vol au-delà attendent une session)
+    'increment': 4,           # Sessions ouvertes à la fois quand le pool grandit
+    'wait_timeout': 10000,    # Attente max (ms) pour obtenir une session
+    'stmtcachesize': 100,     # Cache d'instructions par session
+    'corps_max': 64 * 1024    # Taille max (octets) du corps d'une requête
+}
+
+# Journal local des passages : écriture différée vers Oracle (/entree, /sortie)
+JOURNAL_CONFIG = {
+    'actif': False,                     # True = réponse 202 dès l'écriture dans le journal
+    'chemin': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'journal_passages.db'),
+                                        # Base SQLite (WAL) partagée par les workers de la machine
+    'taille_lot': 200,                  # Événements rejoués par aller-retour
+    'intervalle': 0.5,                  # Attente (s) quand le journal est vide
+    'pause_erreur': 5,                  # Attente (s) après un échec d'Oracle
+    'duree_bail': 30,                   # Un seul processus vide le journal (bail renouvelé)
+    'retention_jours': 7                # Conservation des événements traités
+}
+
+# Historique de l'occupation (/statistiques/occupation/historique)
+OCCUPATION_CONFIG = {
+    'actif': True,            # Thread d'échantillonnage démarré à la première requête
+    'intervalle': 60,         # Secondes entre deux relevés
+    'taille_memoire': 1440,   # Relevés gardés en mémoire (24 h à 1 relevé/min)
+    'retention_jours': 400,   # Durée de conservation en base
+    'points_defaut': 200,     # Seaux renvoyés si ?points est absent
+    'points_max': 1000        # Seaux renvoyés au maximum
+}
+
+# ========================================================
+# REGISTRE DES REQUÊTES
+# ========================================================
+# Chaque instruction Oracle de l'application est déclarée ici une seule fois,
+# avec une variable de liaison pour chaque valeur venant de la requête HTTP.
+# {schema} est remplacé par TABLE_OWNER à l'import : le schéma propriétaire
+# ne se configure qu'à un endroit. Le texte d'une instruction ne variant pas
+# d'un appel à l'autre, le cache d'instructions de chaque session
+# (POOL_CONFIG['stmtcachesize']) garde le curseur ouvert et Oracle ne la
+# ré-analyse pas. Seuls executer_page et requete_export complètent les bases
+# liste_* avec des fragments constants (prédicats de clé, filtres, tri).
+# Contrôle : python database/verifier_requetes.py
+SQL = {}
+
+def requete(nom, texte):
+    """Enregistre l'instruction `nom` ({schema} = TABLE_OWNER) et retourne son texte"""
+    if nom in SQL:
+        raise ValueError(f"Instruction déjà enregistrée: {nom}")
+    SQL[nom] = texte.replace('{schema}', TABLE_OWNER)
+    return SQL[nom]
+
+def sous_programme(nom):
+    """Nom qualifié d'une procédure ou fonction PL/SQL du schéma"""
+    return f'{TABLE_OWNER}.{nom}'
+
+PROCEDURE_ENTREE = sous_programme('ajouter_entree')
+PROCEDURE_SORTIE = sous_programme('valider_sortie')
+PROCEDURE_ABONNEMENT = sous_programme('s_abonner')
+PROCEDURE_TARIFS = sous_programme('mettre_a_jour_tarifs')
+FONCTION_AJOUTER_CLIENT = sous_programme('Ajouter_client')
+
+# -- Versions des tables (migration 7), pour les ETag et le cache --
+requete('versions_tables', "SELECT nom_table, version FROM {schema}.VERSION_DONNEES")
+
+# -- Session et authentification --
+requete('roles_utilisateur', """
+    SELECT GRANTED_ROLE
+    FROM USER_ROLE_PRIVS
+    WHERE GRANTED_ROLE IN ('R_ADMIN', 'R_AGENT')
+""")
+
+requete('test_connexion', "SELECT 'Connexion réussie!' FROM DUAL")
+
+# -- Bases des listes paginées (complétées par executer_page / requete_export) --
+requete('liste_clients', "SELECT * FROM {schema}.CLIENT")
+
+requete('liste_abonnements', """
+    SELECT a.*, c.nom, c.prenom, c.telephone
+    FROM {schema}.ABONNEMENT a
+    JOIN {schema}.CLIENT c ON a.id_client = c.id_client
+""")
+
+requete('liste_reservations', """
+    SELECT r.*, c.nom, c.prenom, p.numero_place, p.type_place, t.tarif_horaire
+    FROM {schema}.RESERVATION r
+    JOIN {schema}.CLIENT c ON r.id_client = c.id_client
+    JOIN {schema}.PLACE p ON r.id_place = p.id_place
+    LEFT JOIN {schema}.TARIF t ON r.id_tarif = t.id_tarif
+""")
+
+requete('liste_paiements', """
+    SELECT p.*, c.nom, c.prenom, r.date_entree, r.date_sortie
+    FROM {schema}.PAIEMENT p
+    JOIN {schema}.RESERVATION r ON p.id_reservation = r.id_reservation
+    JOIN {schema}.CLIENT c ON r.id_client = c.id_client
+""")
+
+# -- Tarifs, places et tickets --
+requete('tarifs', """
+    SELECT id_tarif, type_client, tarif_horaire
+    FROM {schema}.TARIF
+    ORDER BY id_tarif
+""")
+
+requete('places', "SELECT * FROM {schema}.PLACE ORDER BY numero_place")
+
+requete('places_par_type', """
+    SELECT * FROM {schema}.PLACE
+    WHERE type_place = :type
+    ORDER BY numero_place
+""")
+
+requete('places_disponibles', """
+    SELECT * FROM {schema}.PLACE
+    WHERE disponible = 'O'
+    ORDER BY type_place, numero_place
+""")
+
+requete('tickets_en_cours', """
+    SELECT t.id_ticket,
+           r.date_entree,
+           p.numero_place,
+           c.nom,
+           c.prenom
+    FROM {schema}.TICKET t
+    JOIN {schema}.RESERVATION r ON t.id_reservation = r.id_reservation
+    JOIN {schema}.CLIENT c ON r.id_client = c.id_client
+    JOIN {schema}.PLACE p ON r.id_place = p.id_place
+    WHERE r.date_sortie IS NULL
+    ORDER BY r.date_entree DESC
+""")
+
+# Lignes touchées par un passage, poussées aux tableaux de bord (SSE)
+requete('passage_ticket', """
+    SELECT r.id_reservation, r.id_client, r.date_entree, r.date_sortie,
+           c.nom, c.prenom, p.id_place, p.numero_place, p.type_place
+    FROM {schema}.TICKET t
+    JOIN {schema}.RESERVATION r ON t.id_reservation = r.id_reservation
+    JOIN {schema}.CLIENT c ON r.id_client = c.id_client
+    JOIN {schema}.PLACE p ON r.id_place = p.id_place
+    WHERE t.id_ticket = :id_ticket
+""")
+
+# -- Clients --
+requete('client_par_id', """
+    SELECT id_client, nom, prenom, telephone, pmr
+    FROM {schema}.CLIENT
+    WHERE id_client = :id
+""")
+
+requete('client_existe', """
+    SELECT id_client FROM {schema}.CLIENT
+    WHERE id_client = :id
+""")
+
+requete('telephone_autre_client', """
+    SELECT id_client FROM {schema}.CLIENT
+    WHERE telephone = :tel AND id_client != :id
+""")
+
+requete('reservations_en_cours_client', """
+    SELECT COUNT(*) FROM {schema}.RESERVATION
+    WHERE id_client = :id AND date_sortie IS NULL
+""")
+
+requete('modifier_client', """
+    UPDATE {schema}.CLIENT
+    SET nom = :nom,
+        prenom = :prenom,
+        telephone = :telephone,
+        pmr = :pmr
+    WHERE id_client = :id
+""")
+
+requete('supprimer_client', """
+    DELETE FROM {schema}.CLIENT
+    WHERE id_client = :id
+""")
+
+# -- Import en masse des clients --
+requete('clients_existants', """
+    SELECT c.telephone, c.id_client,
+           CASE WHEN EXISTS (SELECT 1 FROM {schema}.ABONNEMENT a
+                             WHERE a.id_client = c.id_client AND a.statut = 'Actif')
+                THEN 1 ELSE 0 END
+    FROM {schema}.CLIENT c
+    WHERE c.telephone IN (SELECT column_value FROM TABLE(:telephones))
+""")
+
+requete('ids_clients', "SELECT {schema}.seq_client.NEXTVAL FROM DUAL CONNECT BY LEVEL <= :n")
+
+requete('inserer_client', """
+    INSERT INTO {schema}.CLIENT (id_client, nom, prenom, telephone, pmr)
+    VALUES (:id_client, :nom, :prenom, :telephone, :pmr)
+""")
+
+requete('inserer_abonnement', """
+    INSERT INTO {schema}.ABONNEMENT (id_abonne, id_client, date_inscription, date_expiration, statut)
+    VALUES ({schema}.seq_abonnement.NEXTVAL, :id_client, SYSDATE, SYSDATE + :duree, 'Actif')
+""")
+
+# -- Statistiques --
+requete('statistiques', """
+    SELECT (SELECT COUNT(*) FROM {schema}.CLIENT) AS total_clients,
+           (SELECT COUNT(*) FROM {schema}.ABONNEMENT
+             WHERE statut = 'Actif') AS total_abonnes,
+           pl.total_places,
+           pl.places_occupees,
+           pl.places_libres,
+           (SELECT NVL(SUM(montant), 0) FROM {schema}.PAIEMENT
+             WHERE date_paiement >= TRUNC(SYSDATE)
+               AND date_paiement < TRUNC(SYSDATE) + 1) AS revenu_jour,
+           (SELECT COUNT(*) FROM {schema}.PAIEMENT
+             WHERE statut = 'Effectue') AS paiements_valides
+    FROM (SELECT COUNT(*) AS total_places,
+                 COUNT(CASE WHEN disponible = 'N' THEN 1 END) AS places_occupees,
+                 COUNT(CASE WHEN disponible = 'O' THEN 1 END) AS places_libres
+          FROM {schema}.PLACE) pl
+""")
+
+requete('revenus', """
+    SELECT periode, mode_paiement, SUM(nb_paiements), SUM(montant_total)
+    FROM (SELECT TRUNC(jour, :format_groupe) AS periode, mode_paiement,
+                 nb_paiements, montant_total
+          FROM {schema}.PAIEMENT_DAILY
+          WHERE jour >= :debut AND jour < :fin)
+    GROUP BY periode, mode_paiement
+    ORDER BY periode, mode_paiement
+""")
+
+# -- Historique de l'occupation --
+requete('occupation_par_type', """
+    SELECT type_place, COUNT(*), COUNT(CASE WHEN disponible = 'N' THEN 1 END)
+    FROM {schema}.PLACE
+    GROUP BY type_place
+""")
+
+requete('inserer_occupation', """
+    INSERT INTO {schema}.OCCUPATION_HISTORIQUE (instant, type_place, places_total, places_occupees)
+    VALUES (:instant, :type_place, :total, :occupees)
+""")
+
+requete('purger_occupation', """
+    DELETE FROM {schema}.OCCUPATION_HISTORIQUE
+    WHERE instant < SYSDATE - :retention
+""")
+
+requete('historique_occupation', """
+    SELECT type_place, seau, MIN(taux), MAX(taux), AVG(taux), COUNT(*)
+    FROM (SELECT type_place,
+                 FLOOR((instant - :debut) * 86400 / :largeur) AS seau,
+                 100 * places_occupees / places_total AS taux
+          FROM {schema}.OCCUPATION_HISTORIQUE
+          WHERE instant >= :debut AND instant < :fin AND places_total > 0)
+    GROUP BY type_place, seau
+    ORDER BY type_place, seau
+""")
+
+requete('historique_occupation_type', """
+    SELECT type_place, seau, MIN(taux), MAX(taux), AVG(taux), COUNT(*)
+    FROM (SELECT type_place,
+                 FLOOR((instant - :debut) * 86400 / :largeur) AS seau,
+                 100 * places_occupees / places_total AS taux
+          FROM {schema}.OCCUPATION_HISTORIQUE
+          WHERE instant >= :debut AND instant < :fin AND places_total > 0
+            AND type_place = :type_place)
+    GROUP BY type_place, seau
+    ORDER BY type_place, seau
+""")
+
+# -- Passages groupés : chaque itération est isolée dans son propre bloc, une
+# erreur n'interrompt pas le lot et est renvoyée dans :erreur (équivalent de
+# batcherrors pour PL/SQL) --
+requete('entree_lot', """
+    BEGIN
+        {schema}.ajouter_entree(:nom, :prenom, :telephone, :pmr,
+                                :id_ticket, :id_reservation, :numero_place, :tarif_horaire);
+    EXCEPTION
+        WHEN OTHERS THEN
+            :erreur := SQLERRM;
+    END;
+""")
+
+requete('sortie_lot', """
+    BEGIN
+        {schema}.valider_sortie(:id_ticket, :mode_paiement,
+                                :montant, :duree_heures, :id_paiement);
+    EXCEPTION
+        WHEN OTHERS THEN
+            :erreur := SQLERRM;
+    END;
+""")
+
+# -- Rejeu du journal des passages : un seul aller-retour par lot. Pour chaque
+# événement, marqueur PASSAGE_JOURNAL, passage (procédure sans COMMIT,
+# migration 11) et résultats du marqueur sont validés ensemble ; un événement
+# déjà marqué n'est pas rejoué. :codes/:erreurs donnent l'issue des événements
+# tentés, le bloc s'arrêtant après la première erreur de :transitoires --
+requete('entree_journal', """
+    DECLARE
+        v_ids SYS.ODCINUMBERLIST := :ids;
+        v_transitoires SYS.ODCINUMBERLIST := :transitoires;
+        v_codes SYS.ODCINUMBERLIST := SYS.ODCINUMBERLIST();
+        v_erreurs SYS.ODCIVARCHAR2LIST := SYS.ODCIVARCHAR2LIST();
+        v_deja NUMBER;
+        v_transitoire NUMBER := 0;
+        v_noms SYS.ODCIVARCHAR2LIST := :noms;
+        v_prenoms SYS.ODCIVARCHAR2LIST := :prenoms;
+        v_telephones SYS.ODCIVARCHAR2LIST := :telephones;
+        v_pmr SYS.ODCIVARCHAR2LIST := :pmr;
+        v_id_ticket NUMBER;
+        v_id_reservation NUMBER;
+        v_numero_place VARCHAR2(20);
+        v_tarif_horaire NUMBER;
+    BEGIN
+        FOR i IN 1 .. v_ids.COUNT LOOP
+            v_codes.EXTEND;
+            v_erreurs.EXTEND;
+            v_codes(i) := 0;
+            SAVEPOINT evenement;
+            BEGIN
+                v_deja := 0;
+                BEGIN
+                    INSERT INTO {schema}.PASSAGE_JOURNAL (source, id_evenement, date_application)
+                    VALUES (:source, v_ids(i), SYSDATE);
+                EXCEPTION
+                    WHEN DUP_VAL_ON_INDEX THEN
+                        v_deja := 1;
+                END;
+                IF v_deja = 0 THEN
+                    {schema}.enregistrer_entree(v_noms(i), v_prenoms(i), v_telephones(i), v_pmr(i),
+                                                v_id_ticket, v_id_reservation, v_numero_place, v_tarif_horaire);
+                    UPDATE {schema}.PASSAGE_JOURNAL
+                    SET id_ticket = v_id_ticket, id_reservation = v_id_reservation,
+                        numero_place = v_numero_place, tarif_horaire = v_tarif_horaire
+                    WHERE source = :source AND id_evenement = v_ids(i);
+                    COMMIT;
+                END IF;
+            EXCEPTION
+                WHEN OTHERS THEN
+                    v_codes(i) := SQLCODE;
+                    v_erreurs(i) := SQLERRM;
+                    ROLLBACK TO evenement;
+            END;
+            IF v_codes(i) <> 0 THEN
+                SELECT COUNT(*) INTO v_transitoire FROM TABLE(v_transitoires)
+                WHERE column_value = v_codes(i);
+            END IF;
+            -- Erreur passagère : les événements suivants ne sont pas tentés
+            EXIT WHEN v_transitoire > 0;
+        END LOOP;
+        :codes := v_codes;
+        :erreurs := v_erreurs;
+    END;
+""")
+
+requete('sortie_journal', """
+    DECLARE
+        v_ids SYS.ODCINUMBERLIST := :ids;
+        v_transitoires SYS.ODCINUMBERLIST := :transitoires;
+        v_codes SYS.ODCINUMBERLIST := SYS.ODCINUMBERLIST();
+        v_erreurs SYS.ODCIVARCHAR2LIST := SYS.ODCIVARCHAR2LIST();
+        v_deja NUMBER;
+        v_transitoire NUMBER := 0;
+        v_tickets SYS.ODCINUMBERLIST := :tickets;
+        v_modes SYS.ODCIVARCHAR2LIST := :modes;
+        v_montant NUMBER;
+        v_duree_heures NUMBER;
+        v_id_paiement NUMBER;
+    BEGIN
+        FOR i IN 1 .. v_ids.COUNT LOOP
+            v_codes.EXTEND;
+            v_erreurs.EXTEND;
+            v_codes(i) := 0;
+            SAVEPOINT evenement;
+            BEGIN
+                v_deja := 0;
+                BEGIN
+                    INSERT INTO {schema}.PASSAGE_JOURNAL (source, id_evenement, date_application)
+                    VALUES (:source, v_ids(i), SYSDATE);
+                EXCEPTION
+                    WHEN DUP_VAL_ON_INDEX THEN
+                        v_deja := 1;
+                END;
+                IF v_deja = 0 THEN
+                    {schema}.enregistrer_sortie(v_tickets(i), v_modes(i),
+                                                v_montant, v_duree_heures, v_id_paiement);
+                    UPDATE {schema}.PASSAGE_JOURNAL
+                    SET montant = v_montant, duree_heures = v_duree_heures, id_paiement = v_id_paiement
+                    WHERE source = :source AND id_evenement = v_ids(i);
+                    COMMIT;
+                END IF;
+            EXCEPTION
+                WHEN OTHERS THEN
+                    v_codes(i) := SQLCODE;
+                    v_erreurs(i) := SQLERRM;
+                    ROLLBACK TO evenement;
+            END;
+            IF v_codes(i) <> 0 THEN
+                SELECT COUNT(*) INTO v_transitoire FROM TABLE(v_transitoires)
+                WHERE column_value = v_codes(i);
+            END IF;
+            -- Erreur passagère : les événements suivants ne sont pas tentés
+            EXIT WHEN v_transitoire > 0;
+        END LOOP;
+        :codes := v_codes;
+        :erreurs := v_erreurs;
+    END;
+""")
+
+# Résultats des événements appliqués (rejoués à l'instant ou déjà marqués)
+requete('resultats_entree_journal', """
+    SELECT id_evenement, id_ticket, id_reservation, numero_place, tarif_horaire
+    FROM {schema}.PASSAGE_JOURNAL
+    WHERE source = :source AND id_evenement IN (SELECT column_value FROM TABLE(:ids))
+""")
+
+requete('resultats_sortie_journal', """
+    SELECT id_evenement, montant, duree_heures, id_paiement
+    FROM {schema}.PASSAGE_JOURNAL
+    WHERE source = :source AND id_evenement IN (SELECT column_value FROM TABLE(:ids))
+""")
+
+# ========================================================
+# POOL DE SESSIONS
+# ========================================================
+_pool = None
+_pool_lock = threading.Lock()
+_pool_stats = {
+    'acquisitions': 0,
+    'temps_attente_total_ms': 0.0,
+    'temps_attente_max_ms': 0.0
+}
+
+def get_pool():
+    """Retourne le pool de sessions Oracle (créé au premier appel)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = oracledb.create_pool(
+                    user=DB_CONFIG['user'],
+                    password=DB_CONFIG['password'],
+                    dsn=DB_CONFIG['dsn'],
+                    min=POOL_CONFIG['min'],
+                    max=POOL_CONFIG['max'],
+                    increment=POOL_CONFIG['increment'],
+                    getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                    wait_timeout=POOL_CONFIG['wait_timeout'],
+                    ping_interval=POOL_CONFIG['ping_interval'],
+                    stmtcachesize=POOL_CONFIG['stmtcachesize']
+                )
+                logger.info(f"Pool Oracle créé (min={POOL_CONFIG['min']}, max={POOL_CONFIG['max']})")
+                if len(SQL) > POOL_CONFIG['stmtcachesize']:
+                    logger.warning(f"stmtcachesize ({POOL_CONFIG['stmtcachesize']}) inférieur au nombre "
+                                   f"d'instructions enregistrées ({len(SQL)}) : des ré-analyses sont à prévoir")
+    return _pool
+
+def get_pool_stats():
+    """Statistiques du pool : sessions ouvertes/occupées et temps d'attente"""
+    with _pool_lock:
+        stats = dict(_pool_stats)
+    acquisitions = stats['acquisitions']
+    stats['temps_attente_moyen_ms'] = round(stats['temps_attente_total_ms'] / acquisitions, 3) if acquisitions else 0.0
+    stats['temps_attente_total_ms'] = round(stats['temps_attente_total_ms'], 3)
+    stats['temps_attente_max_ms'] = round(stats['temps_attente_max_ms'], 3)
+    if _pool is None:
+        stats.update({'ouvert': False, 'sessions_ouvertes': 0, 'sessions_occupees': 0})
+    else:
+        stats.update({
+            'ouvert': True,
+            'sessions_ouvertes': _pool.opened,
+            'sessions_occupees': _pool.busy,
+            'min': _pool.min,
+            'max': _pool.max
+        })
+    return stats
+
+def fermer_pool(timeout=None):
+    """Ferme le pool en laissant les sessions occupées terminer (drain)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is None:
+        return
+    timeout = POOL_CONFIG['drain_timeout'] if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while pool.busy and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if pool.busy:
+        logger.warning(f"Fermeture forcée du pool: {pool.busy} session(s) encore occupée(s)")
+    pool.close(force=True)
+    logger.info("Pool Oracle fermé")
+
+atexit.register(fermer_pool)
+
 # ========================================================
 # GESTIONNAIRE DE CONNEXION (Context Manager)
 # ========================================================
 @contextmanager
 def get_db_connection():
-    """Context manager pour gérer automatiquement les connexions"""
+    """Context manager qui emprunte une session au pool et la restitue"""
     connection = None
     try:
-        connection = oracledb.connect(**DB_CONFIG)
+        debut = time.perf_counter()
+        connection = get_pool().acquire()
+        attente_ms = (time.perf_counter() - debut) * 1000
+        with _pool_lock:
+            _pool_stats['acquisitions'] += 1
+            _pool_stats['temps_attente_total_ms'] += attente_ms
+            _pool_stats['temps_attente_max_ms'] = max(_pool_stats['temps_attente_max_ms'], attente_ms)
         yield connection
     except oracledb.Error as error:
         logger.error(f"Erreur de connexion à la base de données: {error}")
@@ -46,8 +638,12 @@ def get_db_connection():
             connection.close()
 
 @contextmanager
-def get_db_cursor(commit=False):
-    """Context manager pour gérer les curseurs avec commit optionnel"""
+def get_db_cursor(commit=False, tables=()):
+    """Context manager pour gérer les curseurs avec commit optionnel.
+
+    `tables` liste les tables modifiées : les caches qui en dépendent sont
+    invalidés une fois le commit effectué.
+    """
     with get_db_connection() as connection:
         cursor = connection.cursor()
         try:
@@ -60,6 +656,394 @@ def get_db_cursor(commit=False):
             raise
         finally:
             cursor.close()
+    if tables:
+        signaler_modification(*tables)
+
+# ========================================================
+# CACHE DES LECTURES (TTL + CALCUL UNIQUE + INVALIDATION)
+# ========================================================
+_cache = {}            # clé -> {'valeur', 'expire', 'tables'}
+_cache_calculs = {}    # clé -> threading.Event du calcul en cours
+_cache_generation = 0  # incrémentée à chaque invalidation
+_cache_lock = threading.Lock()
+
+def cache_obtenir(cle, calcul, tables, ttl=None):
+    """Retourne la valeur en cache pour `cle` ou la calcule via `calcul()`.
+
+    Un seul calcul est lancé pour une clé donnée : les requêtes concurrentes
+    attendent son résultat. La valeur est invalidée dès qu'une des `tables`
+    est modifiée, par ce processus (signaler_modification) ou ailleurs
+    (version de la table en base, voir versions_tables).
+    """
+    ttl = CACHE_CONFIG['ttl_defaut'] if ttl is None else ttl
+    # Versions lues avant le calcul : la valeur est au moins aussi récente
+    versions = versions_tables(tables)
+    if versions_recentes(tables):
+        # L'écriture qui a changé la version n'est peut-être pas encore validée
+        ttl = min(ttl, CACHE_CONFIG['delai_commit'])
+    while True:
+        with _cache_lock:
+            entree = _cache.get(cle)
+            if entree and entree['expire'] > time.monotonic() and entree['versions'] == versions:
+                return entree['valeur']
+            evenement = _cache_calculs.get(cle)
+            if evenement is None:
+                evenement = _cache_calculs[cle] = threading.Event()
+                generation = _cache_generation
+                break
+        # Un autre thread calcule déjà cette valeur : attendre son résultat
+        evenement.wait(CACHE_CONFIG['attente_calcul'])
+
+    try:
+        valeur = calcul()
+        with _cache_lock:
+            # Ne pas stocker une valeur calculée avant une invalidation
+            if generation == _cache_generation:
+                _cache[cle] = {
+                    'valeur': valeur,
+                    'expire': time.monotonic() + ttl,
+                    'tables': frozenset(tables),
+                    'versions': versions
+                }
+        return valeur
+    finally:
+        with _cache_lock:
+            _cache_calculs.pop(cle, None)
+        evenement.set()
+
+# Tables touchées par les procédures de passage (triggers et abonnements expirés inclus)
+TABLES_ENTREE = ('CLIENT', 'ABONNEMENT', 'PLACE', 'RESERVATION', 'TICKET')
+TABLES_SORTIE = ('ABONNEMENT', 'PLACE', 'RESERVATION', 'PAIEMENT')
+
+def signaler_modification(*tables):
+    """Invalide les entrées de cache qui dépendent des tables modifiées
+    et incrémente la version de données de ces tables"""
+    global _cache_generation
+    modifiees = {t.upper() for t in tables}
+    with _cache_lock:
+        _cache_generation += 1
+        for table in modifiees:
+            _versions_tables[table] = _versions_tables.get(table, 0) + 1
+        for cle in [c for c, e in _cache.items() if e['tables'] & modifiees]:
+            del _cache[cle]
+        # Relire les versions en base : ce processus voit ses écritures aussitôt
+        _versions_base['expire'] = 0
+
+# ========================================================
+# VERSIONS DES TABLES (ETAG ET CACHE, PARTAGÉES PAR LES PROCESSUS)
+# ========================================================
+# VERSION_DONNEES (migration 7) porte un compteur par table, incrémenté par un
+# trigger d'instruction à chaque écriture : les autres workers, app_async.py,
+# le vidage du journal, archivage.py ou du SQL lancé directement sur Oracle
+# changent donc la version vue par tous les processus, au plus
+# CACHE_CONFIG['ttl_versions'] secondes plus tard.
+# Depuis la migration 9, l'incrément est validé dans une transaction autonome
+# (aucun verrou gardé jusqu'au COMMIT de l'écriture) : la version peut changer
+# avant que l'écriture soit visible. Pendant CACHE_CONFIG['delai_commit']
+# secondes après un changement, une valeur calculée n'est gardée que ce délai
+# et la réponse ne porte pas d'ETag (pas de 304 sur des données d'avant COMMIT).
+# Sans cette table (ou base injoignable), les versions sont celles du processus
+# complétées d'un seau de ttl_defaut secondes : un ETag périmé ne survit pas
+# au-delà de ce délai.
+TABLES_VERSIONNEES = ('ABONNEMENT', 'CLIENT', 'PAIEMENT', 'PLACE', 'RESERVATION', 'TARIF', 'TICKET')
+
+_versions_tables = {}                 # table -> compteur des modifications de ce processus
+_versions_base = {'valeurs': {}, 'expire': 0, 'repli': False, 'changements': {}}
+_jeton_processus = secrets.token_hex(4)  # distingue les versions locales de deux processus
+
+def _versions_locales():
+    """Versions de repli : compteurs du processus et seau de temps"""
+    seau = int(time.time() // CACHE_CONFIG['ttl_defaut'])
+    with _cache_lock:
+        return {t: f"{_jeton_processus}.{_versions_tables.get(t, 0)}.{seau}" for t in TABLES_VERSIONNEES}
+
+def lire_versions():
+    """Versions de toutes les tables, relues en base au plus toutes les ttl_versions secondes"""
+    maintenant = time.monotonic()
+    with _cache_lock:
+        if _versions_base['expire'] > maintenant:
+            return _versions_base['valeurs']
+    repli = False
+    try:
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL['versions_tables'])
+            valeurs = {table: str(version) for table, version in cursor}
+    except oracledb.Error as error:
+        if not _versions_base['repli']:
+            logger.warning(f"Versions des tables indisponibles, repli sur les versions locales: {error}")
+        valeurs, repli = _versions_locales(), True
+    with _cache_lock:
+        if not repli:
+            # Instant où ce processus a vu chaque version changer
+            precedentes = _versions_base['valeurs']
+            for table, version in valeurs.items():
+                if table in precedentes and precedentes[table] != version:
+                    _versions_base['changements'][table] = maintenant
+        _versions_base.update(valeurs=valeurs, expire=maintenant + CACHE_CONFIG['ttl_versions'], repli=repli)
+    return valeurs
+
+def versions_tables(tables):
+    """Versions des `tables`, dans l'ordre alphabétique"""
+    valeurs = lire_versions()
+    return tuple(valeurs.get(t.upper(), '0') for t in sorted(tables))
+
+def versions_recentes(tables):
+    """Vrai si la version d'une des `tables` a changé depuis moins de delai_commit secondes"""
+    limite = time.monotonic() - CACHE_CONFIG['delai_commit']
+    with _cache_lock:
+        changements = _versions_base['changements']
+        return any(changements.get(t.upper(), 0) > limite for t in tables)
+
+# ========================================================
+# REQUÊTES CONDITIONNELLES (ETAG / IF-NONE-MATCH)
+# ========================================================
+def calculer_etag(tables, quotidien=False):
+    """ETag de la requête courante à partir des versions des tables lues"""
+    versions = [f"{t}:{v}" for t, v in zip(sorted(tables), versions_tables(tables))]
+    if quotidien:
+        versions.append(datetime.now().date().isoformat())
+    return hashlib.sha1(f"{request.full_path}|{'|'.join(versions)}".encode('utf-8')).hexdigest()[:20]
+
+def reponse_conditionnelle(*tables, quotidien=False):
+    """Décorateur : répond 304 Not Modified sans interroger Oracle si aucune
+    des tables lues n'a été modifiée depuis l'ETag envoyé par le client.
+
+    `quotidien` ajoute la date du jour à l'ETag (valeurs dépendant de SYSDATE).
+    """
+    def decorateur(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = calculer_etag(tables, quotidien)
+            if versions_recentes(tables):
+                # Écriture peut-être pas encore validée : ni 304 ni ETag
+                return f(*args, **kwargs)
+            if request.if_none_match.contains_weak(etag):
+                reponse = Response(status=304)
+                reponse.set_etag(etag, weak=True)
+                return reponse
+            reponse = app.make_response(f(*args, **kwargs))
+            if reponse.status_code == 200:
+                reponse.set_etag(etag, weak=True)
+                reponse.headers['Cache-Control'] = 'no-cache'
+            return reponse
+        return decorated_function
+    return decorateur
+
+# ========================================================
+# ÉVÉNEMENTS TEMPS RÉEL (SERVER-SENT EVENTS)
+# ========================================================
+_abonnes_sse = set()
+_sse_lock = threading.Lock()
+
+def abonner_evenements():
+    """Inscrit un client SSE et retourne sa file d'événements"""
+    file = queue.Queue(maxsize=SSE_CONFIG['taille_file'])
+    with _sse_lock:
+        _abonnes_sse.add(file)
+    demarrer_veille_passages()
+    return file
+
+def desabonner_evenements(file):
+    with _sse_lock:
+        _abonnes_sse.discard(file)
+
+def publier_evenement(type_evenement, donnees):
+    """Diffuse un événement à tous les tableaux de bord connectés"""
+    message = f"event: {type_evenement}\ndata: {json.dumps(donnees, default=_json_default)}\n\n"
+    with _sse_lock:
+        abonnes = list(_abonnes_sse)
+    for file in abonnes:
+        try:
+            file.put_nowait(message)
+        except queue.Full:
+            # Client trop lent : on vide sa file et on lui demande de tout recharger
+            try:
+                while True:
+                    file.get_nowait()
+            except queue.Empty:
+                pass
+            file.put_nowait("event: resync\ndata: {}\n\n")
+
+def decrire_passage(id_ticket):
+    """Réservation, client et place d'un ticket : de quoi mettre à jour les
+    lignes des tableaux de bord sans recharger les listes"""
+    with get_db_cursor() as cursor:
+        cursor.execute(SQL['passage_ticket'], {'id_ticket': id_ticket})
+        lignes = convertir_lignes(cursor, cursor.fetchall())
+    return {cle.lower(): valeur for cle, valeur in lignes[0].items()} if lignes else {}
+
+def diffuser_passage(type_evenement, details):
+    """Publie un passage (entrée/sortie) suivi de l'occupation recalculée une seule fois.
+
+    Un passage unitaire porte les lignes touchées (decrire_passage) : les
+    tableaux de bord les appliquent localement. Un lot ({'lot': n}) ne porte
+    que sa taille et fait recharger les sections concernées.
+    """
+    if not _abonnes_sse:
+        return
+    details = dict(details, horodatage=datetime.now().isoformat())
+    if 'id_ticket' in details:
+        try:
+            details.update(decrire_passage(details['id_ticket']))
+        except oracledb.Error as error:
+            logger.error(f"Erreur lors de la description du passage diffusé: {error}")
+    publier_evenement(type_evenement, details)
+    # Ce passage est diffusé : la veille ne doit pas le signaler une seconde fois
+    _passages_diffuses['versions'] = versions_tables(TABLES_PASSAGES)
+    try:
+        publier_evenement('occupation', formater_statistiques(lire_statistiques()))
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors du calcul de l'occupation diffusée: {error}")
+
+# Passages des autres processus (app_async.py, autres workers, SQL direct) :
+# ils n'appellent pas diffuser_passage ici, mais incrémentent VERSION_DONNEES.
+# Tant qu'un tableau de bord est abonné, un thread compare les versions de
+# TICKET et PAIEMENT à celles des passages déjà diffusés ; un écart non
+# diffusé par ce processus envoie 'resync' (le contenu en est inconnu) et
+# l'occupation recalculée. Rien n'est envoyé en mode repli (versions locales).
+TABLES_PASSAGES = ('PAIEMENT', 'TICKET')
+
+_passages_diffuses = {'versions': None}
+_veille = None
+_veille_lock = threading.Lock()
+_veille_arret = threading.Event()
+
+def _boucle_veille():
+    """Corps du thread : publie les passages écrits hors de ce processus"""
+    while not _veille_arret.wait(SSE_CONFIG['veille']):
+        if not _abonnes_sse:
+            _passages_diffuses['versions'] = None
+            continue
+        versions = versions_tables(TABLES_PASSAGES)
+        if _versions_base['repli']:
+            continue
+        precedentes, _passages_diffuses['versions'] = _passages_diffuses['versions'], versions
+        if precedentes is None or precedentes == versions:
+            continue
+        publier_evenement('resync', {})
+        try:
+            publier_evenement('occupation', formater_statistiques(lire_statistiques()))
+        except oracledb.Error as error:
+            logger.error(f"Erreur lors du calcul de l'occupation diffusée: {error}")
+
+def demarrer_veille_passages():
+    """Démarre le thread de veille des passages externes (une seule fois par processus)"""
+    global _veille
+    if _veille is not None:
+        return
+    with _veille_lock:
+        if _veille is None:
+            _veille = threading.Thread(target=_boucle_veille, name='veille-passages', daemon=True)
+            _veille.start()
+
+def arreter_veille_passages():
+    _veille_arret.set()
+    if _veille is not None:
+        _veille.join(timeout=5)
+
+atexit.register(arreter_veille_passages)
+
+# ========================================================
+# AUTHENTIFICATION ORACLE (LOGONS BORNÉS + CACHE DES DROITS)
+# ========================================================
+# Vérifier un mot de passe exige un logon complet : une session réutilisée
+# (pool hétérogène) ne le vérifierait pas. Pas de pool donc, mais une
+# connexion dédiée fermée après lecture des rôles ; le sémaphore borne les
+# logons simultanés et le cache évite le logon aux connexions répétées.
+_auth_logons = threading.BoundedSemaphore(AUTH_CONFIG['logons_max'])
+_auth_lock = threading.Lock()
+_auth_cache = {}     # utilisateur -> {'empreinte', 'roles', 'expire'}
+_auth_echecs = {}    # utilisateur -> {'dates': [...], 'bloque_jusqu_a'}
+_auth_purge = 0      # Prochaine purge (monotonic) des compteurs expirés
+
+class AuthentificationBloquee(Exception):
+    """Trop d'échecs récents : la tentative n'est pas transmise à Oracle"""
+
+class AuthentificationSaturee(Exception):
+    """Aucun créneau de logon libéré dans AUTH_CONFIG['wait_timeout']"""
+
+def _empreinte_identifiants(username, password):
+    """Empreinte HMAC des identifiants (le mot de passe n'est jamais conservé)"""
+    message = f"{username}\x00{password}".encode('utf-8')
+    return hmac.new(app.secret_key.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+def verifier_blocage(username):
+    """Lève AuthentificationBloquee si l'utilisateur est temporairement bloqué"""
+    with _auth_lock:
+        etat = _auth_echecs.get(username)
+        if etat and etat['bloque_jusqu_a'] > time.monotonic():
+            raise AuthentificationBloquee(username)
+
+def _purger_echecs(maintenant):
+    """Retire les compteurs sans échec récent ni blocage en cours ; au-delà de
+    AUTH_CONFIG['max_suivis'], les plus anciens (appelé sous _auth_lock)"""
+    global _auth_purge
+    if maintenant < _auth_purge and len(_auth_echecs) < AUTH_CONFIG['max_suivis']:
+        return
+    _auth_purge = maintenant + AUTH_CONFIG['fenetre_echecs']
+    expires = [nom for nom, etat in _auth_echecs.items()
+               if etat['bloque_jusqu_a'] <= maintenant
+               and all(maintenant - d >= AUTH_CONFIG['fenetre_echecs'] for d in etat['dates'])]
+    for nom in expires:
+        del _auth_echecs[nom]
+    while len(_auth_echecs) >= AUTH_CONFIG['max_suivis']:
+        del _auth_echecs[next(iter(_auth_echecs))]
+
+def enregistrer_echec(username):
+    """Comptabilise un échec et bloque l'utilisateur au-delà du seuil"""
+    maintenant = time.monotonic()
+    with _auth_lock:
+        _auth_cache.pop(username, None)
+        _purger_echecs(maintenant)
+        etat = _auth_echecs.setdefault(username, {'dates': [], 'bloque_jusqu_a': 0})
+        etat['dates'] = [d for d in etat['dates'] if maintenant - d < AUTH_CONFIG['fenetre_echecs']]
+        etat['dates'].append(maintenant)
+        if len(etat['dates']) >= AUTH_CONFIG['max_echecs']:
+            etat['bloque_jusqu_a'] = maintenant + AUTH_CONFIG['duree_blocage']
+            etat['dates'] = []
+            logger.warning(f"Utilisateur {username} bloqué pour {AUTH_CONFIG['duree_blocage']}s")
+
+def get_roles_utilisateur(username, password):
+    """Vérifie les identifiants et retourne les rôles applicatifs de l'utilisateur.
+
+    Un couple déjà vérifié est servi depuis le cache pendant AUTH_CONFIG['cache_ttl']
+    secondes ; sinon une connexion est ouverte au nom de l'utilisateur, au plus
+    AUTH_CONFIG['logons_max'] à la fois.
+    """
+    verifier_blocage(username)
+    empreinte = _empreinte_identifiants(username, password)
+    with _auth_lock:
+        entree = _auth_cache.get(username)
+        if entree and entree['expire'] > time.monotonic() \
+                and hmac.compare_digest(entree['empreinte'], empreinte):
+            return list(entree['roles'])
+
+    if not _auth_logons.acquire(timeout=AUTH_CONFIG['wait_timeout'] / 1000):
+        raise AuthentificationSaturee(username)
+    try:
+        try:
+            connection = oracledb.connect(user=username, password=password, dsn=DB_CONFIG['dsn'])
+        except oracledb.Error as error:
+            error_obj = error.args[0] if error.args else None
+            if error_obj and error_obj.code in [1017, 28000]:
+                enregistrer_echec(username)
+            raise
+        with connection:
+            cursor = connection.cursor()
+            cursor.execute(SQL['roles_utilisateur'])
+            roles = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+    finally:
+        _auth_logons.release()
+
+    with _auth_lock:
+        _auth_echecs.pop(username, None)
+        _auth_cache[username] = {
+            'empreinte': empreinte,
+            'roles': roles,
+            'expire': time.monotonic() + AUTH_CONFIG['cache_ttl']
+        }
+    return roles
 
 # ========================================================
 # DÉCORATEURS D'AUTHENTIFICATION
@@ -103,14 +1087,9 @@ def agent_required(f):
 # ========================================================
 # FONCTIONS UTILITAIRES
 # ========================================================
-def row_to_dict(cursor, row):
-    """Convertit une ligne de résultat en dictionnaire"""
-    columns = [col[0] for col in cursor.description]
-    return dict(zip(columns, row))
-
 def rows_to_dict_list(cursor, rows):
     """Convertit plusieurs lignes en liste de dictionnaires"""
-    return [row_to_dict(cursor, row) for row in rows]
+    return convertir_lignes(cursor, rows)
 
 def serialize_datetime(obj):
     """Sérialise les objets datetime pour JSON"""
@@ -118,6 +1097,321 @@ def serialize_datetime(obj):
         return obj.isoformat()
     return obj
 
+# ========================================================
+# PAGINATION PAR CLÉ (KEYSET)
+# ========================================================
+class ParametreInvalide(ValueError):
+    """Paramètre de requête invalide (limit, cursor, format...)"""
+
+def encoder_curseur(valeurs):
+    """Encode les valeurs de clé de la dernière ligne en curseur opaque"""
+    brut = [['d', v.isoformat()] if isinstance(v, datetime) else ['v', v] for v in valeurs]
+    return base64.urlsafe_b64encode(json.dumps(brut).encode('utf-8')).decode('ascii')
+
+def decoder_curseur(curseur, nb_cles):
+    """Décode un curseur opaque en liste de valeurs de clé"""
+    try:
+        brut = json.loads(base64.urlsafe_b64decode(curseur.encode('ascii')))
+        if not isinstance(brut, list) or len(brut) != nb_cles:
+            raise ValueError
+        return [datetime.fromisoformat(v) if t == 'd' else v for t, v in brut]
+    except (ValueError, TypeError, UnicodeError):
+        raise ParametreInvalide('Curseur de pagination invalide')
+
+def lire_pagination(nb_cles):
+    """Lit ?limit et ?cursor ; retourne (limite, valeurs de clé ou None)"""
+    limite = request.args.get('limit', PAGINATION_CONFIG['limite_defaut'])
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        raise ParametreInvalide('Le paramètre limit doit être un entier')
+    if limite <= 0:
+        raise ParametreInvalide('Le paramètre limit doit être positif')
+    limite = min(limite, PAGINATION_CONFIG['limite_max'])
+
+    curseur = request.args.get('cursor')
+    return limite, (decoder_curseur(curseur, nb_cles) if curseur else None)
+
+def executer_page(cursor, query, conditions, params, cles, descendant=False, forme='records',
+                  pagination=None):
+    """Exécute une requête paginée par clé et retourne (données, next_cursor).
+
+    `cles` est une liste de couples (expression SQL, nom de colonne du résultat)
+    formant une clé unique ; toutes les clés sont triées dans le même sens.
+    `pagination` (limite, valeurs de clé) remplace ?limit/?cursor si fourni.
+    """
+    limite, valeurs = pagination or lire_pagination(len(cles))
+    conditions = list(conditions)
+    params = dict(params)
+    sens = 'DESC' if descendant else 'ASC'
+    op = '<' if descendant else '>'
+
+    if valeurs is not None:
+        alternatives = []
+        for i, (expr, _) in enumerate(cles):
+            termes = [f"{cles[j][0]} = :k{j}" for j in range(i)]
+            termes.append(f"{expr} {op} :k{i}")
+            alternatives.append('(' + ' AND '.join(termes) + ')')
+        conditions.append('(' + ' OR '.join(alternatives) + ')')
+        params.update({f'k{i}': v for i, v in enumerate(valeurs)})
+
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY " + ", ".join(f"{expr} {sens}" for expr, _ in cles)
+    query += " FETCH FIRST :limite_page ROWS ONLY"
+    params['limite_page'] = limite + 1
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    # Le curseur suivant est construit sur les valeurs brutes (avant conversion)
+    next_cursor = None
+    if len(rows) > limite:
+        rows = rows[:limite]
+        colonnes = [col[0] for col in cursor.description]
+        derniere = dict(zip(colonnes, rows[-1]))
+        next_cursor = encoder_curseur([derniere[nom] for _, nom in cles])
+    return convertir_lignes(cursor, rows, forme), next_cursor
+
+# ========================================================
+# PÉRIODES (BORNES DE DATES DES LISTES)
+# ========================================================
+# Les filtres de dates sont des intervalles semi-ouverts [debut, fin[ sur la
+# colonne brute (jamais TRUNC(colonne)) pour rester exploitables par un index.
+def _fuseau_base():
+    """Fuseau des colonnes DATE ; sans base de fuseaux (Windows sans le paquet
+    tzdata), repli sur le décalage local du serveur, sans changement d'heure"""
+    try:
+        return ZoneInfo(DATES_CONFIG['fuseau_base'])
+    except ZoneInfoNotFoundError:
+        local = datetime.now().astimezone().tzinfo
+        logger.warning(f"Fuseau {DATES_CONFIG['fuseau_base']} introuvable (installer tzdata), "
+                       f"repli sur le fuseau local {local}")
+        return local
+
+FUSEAU_BASE = _fuseau_base()
+
+def _lire_fuseau():
+    """Fuseau des bornes sans décalage explicite (?tz=, défaut : fuseau de la base)"""
+    nom = request.args.get('tz')
+    if not nom:
+        return FUSEAU_BASE
+    try:
+        return ZoneInfo(nom)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ParametreInvalide(f'Fuseau horaire inconnu: {nom}')
+
+def _lire_borne(nom, valeur, fuseau):
+    """Convertit une date/heure ISO 8601 en DATE locale de la base (naïve, à la seconde)"""
+    try:
+        borne = datetime.fromisoformat(valeur.strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise ParametreInvalide(f'Date invalide pour {nom}: {valeur}')
+    if borne.tzinfo is None:
+        borne = borne.replace(tzinfo=fuseau)
+    return borne.astimezone(FUSEAU_BASE).replace(tzinfo=None, microsecond=0)
+
+def lire_periode():
+    """Lit la période demandée et retourne (debut, fin), fin exclue.
+
+    ?from= (inclus) et ?to= (exclu) acceptent une date ou une date/heure ISO
+    8601, avec ou sans décalage ; sans décalage, ?tz= s'applique. Les anciens
+    paramètres ?date_debut=&date_fin= (jours inclus) restent acceptés.
+    """
+    fuseau = _lire_fuseau()
+    debut = fin = None
+    if request.args.get('from'):
+        debut = _lire_borne('from', request.args['from'], fuseau)
+    elif request.args.get('date_debut'):
+        debut = _lire_borne('date_debut', request.args['date_debut'], fuseau)
+    if request.args.get('to'):
+        fin = _lire_borne('to', request.args['to'], fuseau)
+    elif request.args.get('date_fin'):
+        fin = _lire_borne('date_fin', request.args['date_fin'], fuseau) + timedelta(days=1)
+    if debut and fin and debut >= fin:
+        raise ParametreInvalide('La borne from doit précéder la borne to')
+    return debut, fin
+
+def conditions_periode(colonne, debut=None, fin=None):
+    """Prédicats semi-ouverts sur `colonne` : (conditions, paramètres)"""
+    conditions, params = [], {}
+    if debut:
+        conditions.append(f"{colonne} >= :debut")
+        params['debut'] = debut
+    if fin:
+        conditions.append(f"{colonne} < :fin")
+        params['fin'] = fin
+    return conditions, params
+
+def decrire_periode(debut, fin):
+    """Période effectivement appliquée, pour la réponse JSON"""
+    if not debut and not fin:
+        return None
+    return {
+        'from': debut.isoformat() if debut else None,
+        'to': fin.isoformat() if fin else None,
+        'tz': DATES_CONFIG['fuseau_base']
+    }
+
+# ========================================================
+# MATÉRIALISATION DES LIGNES
+# ========================================================
+FORMES_REPONSE = ('records', 'columns')
+
+_TYPES_DATE = (
+    oracledb.DB_TYPE_DATE,
+    oracledb.DB_TYPE_TIMESTAMP,
+    oracledb.DB_TYPE_TIMESTAMP_TZ,
+    oracledb.DB_TYPE_TIMESTAMP_LTZ
+)
+
+def _date_iso(valeur):
+    return None if valeur is None else valeur.isoformat()
+
+def _nombre(valeur):
+    return float(valeur) if isinstance(valeur, Decimal) else valeur
+
+def preparer_colonnes(cursor):
+    """Calcule une seule fois par curseur les noms de colonnes et leurs conversions"""
+    colonnes = []
+    conversions = []
+    for i, col in enumerate(cursor.description):
+        colonnes.append(col[0])
+        if col.type_code in _TYPES_DATE:
+            conversions.append((i, _date_iso))
+        elif col.type_code is oracledb.DB_TYPE_NUMBER and oracledb.defaults.fetch_decimals:
+            conversions.append((i, _nombre))
+    return colonnes, conversions
+
+def convertir_lignes(cursor, rows, forme='records'):
+    """Convertit des lignes brutes en liste de dictionnaires ('records')
+    ou en forme colonnaire compacte ('columns')"""
+    colonnes, conversions = preparer_colonnes(cursor)
+    if conversions and rows:
+        # Conversion colonne par colonne : zip/map restent dans le code C
+        valeurs = list(zip(*rows))
+        for i, convertir in conversions:
+            valeurs[i] = map(convertir, valeurs[i])
+        rows = list(zip(*valeurs))
+    if forme == 'columns':
+        return {'columns': colonnes, 'rows': [list(row) for row in rows]}
+    return [dict(zip(colonnes, row)) for row in rows]
+
+def appliquer_rowfactory(cursor):
+    """Installe sur un curseur exécuté une rowfactory produisant des dictionnaires"""
+    colonnes, conversions = preparer_colonnes(cursor)
+    if conversions:
+        def fabrique(*row):
+            row = list(row)
+            for i, convertir in conversions:
+                row[i] = convertir(row[i])
+            return dict(zip(colonnes, row))
+    else:
+        def fabrique(*row):
+            return dict(zip(colonnes, row))
+    cursor.rowfactory = fabrique
+    return cursor
+
+def lire_forme():
+    """Forme de réponse demandée via ?shape=records|columns"""
+    forme = request.args.get('shape', 'records')
+    if forme not in FORMES_REPONSE:
+        raise ParametreInvalide(f"Forme de réponse invalide: {forme}")
+    return forme
+
+def compter(donnees):
+    """Nombre de lignes d'une réponse, quelle que soit sa forme"""
+    return len(donnees['rows']) if isinstance(donnees, dict) else len(donnees)
+
+# ========================================================
+# EXPORT EN FLUX (NDJSON / CSV)
+# ========================================================
+def _json_default(obj):
+    """Sérialiseur JSON de secours pour les types Oracle (dates, décimaux)"""
+    valeur = serialize_datetime(obj)
+    return valeur if valeur is not obj else str(obj)
+
+def lire_format_export():
+    """Retourne le format d'export demandé (None si réponse JSON classique)"""
+    format_export = request.args.get('format')
+    if format_export is None or format_export == 'json':
+        return None
+    if format_export not in EXPORT_CONFIG['formats']:
+        raise ParametreInvalide(f"Format d'export invalide: {format_export}")
+    return format_export
+
+def exporter_requete(query, params, format_export, nom_fichier):
+    """Réponse Flask en flux : les lignes sont émises au fil du curseur"""
+    def generer():
+        with get_db_cursor() as cursor:
+            cursor.arraysize = EXPORT_CONFIG['arraysize']
+            cursor.prefetchrows = EXPORT_CONFIG['prefetchrows']
+            cursor.execute(query, params)
+            colonnes = [col[0] for col in cursor.description]
+            tampon = io.StringIO()
+            writer = csv.writer(tampon)
+            if format_export == 'csv':
+                writer.writerow(colonnes)
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                if format_export == 'csv':
+                    writer.writerows([serialize_datetime(v) for v in row] for row in rows)
+                else:
+                    for row in rows:
+                        tampon.write(json.dumps(dict(zip(colonnes, row)), default=_json_default))
+                        tampon.write('\n')
+                yield tampon.getvalue()
+                tampon.seek(0)
+                tampon.truncate()
+            if tampon.tell():
+                yield tampon.getvalue()
+
+    return Response(
+        stream_with_context(generer()),
+        mimetype=EXPORT_CONFIG['formats'][format_export],
+        headers={'Content-Disposition': f'attachment; filename={nom_fichier}.{format_export}'}
+    )
+
+# ========================================================
+# REQUÊTES DE LISTE (PARTAGÉES PAR LES ROUTES ET LES TABLEAUX DE BORD)
+# ========================================================
+CLES_CLIENTS = [('nom', 'NOM'), ('prenom', 'PRENOM'), ('id_client', 'ID_CLIENT')]
+# Les colonnes de clé sont NOT NULL (migrations 5 et 10) : un curseur ne porte jamais NULL
+CLES_ABONNEMENTS = [('a.date_inscription', 'DATE_INSCRIPTION'), ('a.id_abonne', 'ID_ABONNE')]
+CLES_RESERVATIONS = [('r.date_entree', 'DATE_ENTREE'), ('r.id_reservation', 'ID_RESERVATION')]
+CLES_PAIEMENTS = [('p.date_paiement', 'DATE_PAIEMENT'), ('p.id_paiement', 'ID_PAIEMENT')]
+
+def requete_clients():
+    """Retourne (requête, conditions, paramètres) de la liste des clients"""
+    return SQL['liste_clients'], [], {}
+
+def requete_abonnements(actif_only=False):
+    """Retourne (requête, conditions, paramètres) de la liste des abonnements"""
+    conditions = []
+    if actif_only:
+        conditions.append("a.statut = 'Actif'")
+    return SQL['liste_abonnements'], conditions, {}
+
+def requete_reservations(en_cours=False, debut=None, fin=None):
+    """Retourne (requête, conditions, paramètres) de la liste des réservations"""
+    conditions, params = conditions_periode('r.date_entree', debut, fin)
+    if en_cours:
+        conditions.append("r.date_sortie IS NULL")
+    return SQL['liste_reservations'], conditions, params
+
+def requete_paiements(debut=None, fin=None):
+    """Retourne (requête, conditions, paramètres) de la liste des paiements"""
+    conditions, params = conditions_periode('p.date_paiement', debut, fin)
+    return SQL['liste_paiements'], conditions, params
+
+def requete_export(query, conditions, cles):
+    """Requête complète (sans pagination) pour un export en flux"""
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return query + " ORDER BY " + ", ".join(f"{expr} DESC" for expr, _ in cles)
+
 # ========================================================
 # ROUTES - PAGE D'ACCUEIL ET AUTHENTIFICATION
 # ========================================================
@@ -154,27 +1448,9 @@ def login():
                 'error': 'Rôle invalide'
             }), 400
         
-        # Tentative de connexion à Oracle avec les credentials fournis
+        # Vérification des identifiants (cache, puis logon Oracle)
         try:
-            connection = oracledb.connect(
-                user=username,
-                password=password,
-                dsn=DB_CONFIG['dsn']
-            )
-            
-            # Vérifier le rôle de l'utilisateur
-            cursor = connection.cursor()
-            
-            # Requête pour vérifier les rôles attribués
-            cursor.execute("""
-                SELECT GRANTED_ROLE 
-                FROM USER_ROLE_PRIVS 
-                WHERE GRANTED_ROLE IN ('R_ADMIN', 'R_AGENT')
-            """)
-            
-            roles = [row[0] for row in cursor.fetchall()]
-            cursor.close()
-            connection.close()
+            roles = get_roles_utilisateur(username, password)
             
             # Vérifier que l'utilisateur a le rôle demandé
             required_role = f'R_{role_type}'
@@ -203,6 +1479,20 @@ def login():
                 'redirect': redirect_url
             }), 200
             
+        except AuthentificationBloquee:
+            logger.warning(f"Connexion refusée pour {username}: trop de tentatives échouées")
+            return jsonify({
+                'success': False,
+                'error': 'Trop de tentatives échouées. Réessayez plus tard.'
+            }), 429
+            
+        except AuthentificationSaturee:
+            logger.warning(f"Connexion refusée pour {username}: trop de connexions simultanées")
+            return jsonify({
+                'success': False,
+                'error': 'Service de connexion saturé. Réessayez dans un instant.'
+            }), 503
+            
         except oracledb.Error as db_error:
             error_obj = db_error.args[0] if db_error.args else None
             
@@ -259,49 +1549,90 @@ def api_info():
                 'POST /login': 'Se connecter',
                 'GET /logout': 'Se déconnecter',
                 'GET /admin': 'Dashboard administrateur',
-                'GET /agent': 'Dashboard agent'
+                'GET /agent': 'Dashboard agent',
+                'GET /admin/dashboard-data': 'Données du dashboard administrateur (une requête)',
+                'GET /agent/dashboard': 'Données du dashboard agent (une requête)'
             },
             'clients': {
-                'GET /clients': 'Liste tous les clients',
-                'GET /clients/<id>': 'Détails d\'un client'
+                'GET /clients': 'Liste les clients (paginée: ?limit=&cursor=)',
+                'GET /clients/<id>': 'Détails d\'un client',
+                'POST /clients/import': 'Import en masse CSV/JSON (nom, prenom, telephone, pmr, abonnement)'
+            },
+            'tarifs': {
+                'GET /tarifs': 'Liste les tarifs (cache mémoire)',
+                'PUT /tarif/update': 'Mettre à jour les tarifs',
+                'GET /tarifs/devis': 'Estimer un montant (?heures=&type_client=)'
             },
             'places': {
                 'GET /places': 'Liste toutes les places',
                 'GET /places/disponibles': 'Places disponibles uniquement'
             },
             'abonnements': {
-                'GET /abonnements': 'Liste tous les abonnements',
+                'GET /abonnements': 'Liste les abonnements (paginée: ?limit=&cursor=)',
                 'POST /abonner': 'Créer un abonnement'
             },
             'reservations': {
-                'GET /reservations': 'Liste toutes les réservations',
+                'GET /reservations': 'Liste les réservations (paginée: ?limit=&cursor=, période: ?from=&to=&tz=, export: ?format=ndjson|csv)',
                 'POST /entree': 'Enregistrer une entrée',
-                'POST /sortie': 'Valider une sortie'
+                'POST /sortie': 'Valider une sortie',
+                'POST /entree/batch': 'Enregistrer un lot d\'entrées',
+                'POST /sortie/batch': 'Valider un lot de sorties'
             },
             'paiements': {
-                'GET /paiements': 'Liste tous les paiements'
+                'GET /paiements': 'Liste les paiements (paginée: ?limit=&cursor=, période: ?from=&to=&tz=, export: ?format=ndjson|csv)'
             },
             'statistiques': {
-                'GET /statistiques': 'Statistiques du parking'
+                'GET /statistiques': 'Statistiques du parking',
+                'GET /statistiques/revenus': 'Revenus cumulés (?from=&to=&tz=&group=day|week|month)',
+                'GET /statistiques/occupation/historique': 'Occupation min/max/moyenne par seau (?from=&to=&tz=&type=&points=)',
+                'GET /events': 'Flux SSE (occupation, entrées, sorties)'
             },
             'test': {
-                'GET /test-connexion': 'Tester la connexion DB'
+                'GET /test-connexion': 'Tester la connexion DB',
+                'GET /pool/stats': 'Statistiques du pool de sessions',
+                'GET /journal/statut': 'Profondeur et retard du journal des passages (écriture différée)',
+                'GET /journal/evenements/<id>': 'État et résultat d\'un passage journalisé'
             }
         }
     })
+# ========================================================
+# ROUTES - TARIFS
+# ========================================================
+# Copie en mémoire de TARIF (deux lignes), invalidée par /tarif/update via
+# signaler_modification('TARIF') ; côté base, tarif_par_type est en RESULT_CACHE.
+def lire_tarifs():
+    """Retourne les tarifs depuis le cache du processus.
+
+    /tarif/update ne vide que le cache du worker qui la sert ; les autres
+    voient la nouvelle version de TARIF au plus ttl_versions secondes après
+    (cache_obtenir compare les versions), ttl_tarifs ne sert que de borne.
+    """
+    def charger():
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL['tarifs'])
+            rows = cursor.fetchall()
+            return rows_to_dict_list(cursor, rows)
+
+    return cache_obtenir('tarifs', charger, ('TARIF',), CACHE_CONFIG['ttl_tarifs'])
+
+def tarif_horaire(type_client):
+    """Tarif horaire d'un type de client ('Abonne' / 'Non_Abonne')"""
+    for tarif in lire_tarifs():
+        if tarif['TYPE_CLIENT'] == type_client:
+            return tarif['TARIF_HORAIRE']
+    raise ParametreInvalide(f'Type de client inconnu: {type_client}')
+
+def calculer_devis(duree_heures, type_client):
+    """Montant d'un stationnement, même règle que calculer_montant (heure entamée due)"""
+    return math.ceil(duree_heures) * tarif_horaire(type_client)
+
 @app.route('/tarifs', methods=['GET'])
 @login_required
+@reponse_conditionnelle('TARIF')
 def get_tarifs():
     """Récupérer tous les tarifs"""
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute(f"""
-                SELECT id_tarif, type_client, tarif_horaire
-                FROM {TABLE_OWNER}.TARIF
-                ORDER BY id_tarif
-            """)
-            rows = cursor.fetchall()
-            tarifs = rows_to_dict_list(cursor, rows)
+        tarifs = lire_tarifs()
 
         return jsonify({
             'success': True,
@@ -337,10 +1668,9 @@ def update_tarif():
                 'error': 'Les tarifs doivent être positifs.'
             }), 400
 
-        with get_db_cursor(commit=True) as cursor:
+        with get_db_cursor(commit=True, tables=('TARIF',)) as cursor:
             # Appeler la procédure PL/SQL
-            cursor.callproc(f"{TABLE_OWNER}.mettre_a_jour_tarifs", 
-                           [tarif_abonne, tarif_non_abonne])
+            cursor.callproc(PROCEDURE_TARIFS, [tarif_abonne, tarif_non_abonne])
 
         logger.info("Tarifs mis à jour avec succès via procédure PL/SQL")
 
@@ -364,31 +1694,71 @@ def update_tarif():
             'success': False,
             'error': error_msg
         }), 500
+
+@app.route('/tarifs/devis', methods=['GET'])
+@reponse_conditionnelle('TARIF')
+def get_devis():
+    """Estimer le montant d'un stationnement (?heures=&type_client=Abonne|Non_Abonne)"""
+    try:
+        try:
+            heures = float(request.args.get('heures', ''))
+        except ValueError:
+            raise ParametreInvalide('Paramètre heures invalide')
+        # nan et inf passent float() mais pas le calcul du montant
+        if not math.isfinite(heures) or heures < 0:
+            raise ParametreInvalide('Paramètre heures invalide')
+        type_client = request.args.get('type_client', 'Non_Abonne')
+
+        return jsonify({
+            'success': True,
+            'heures': heures,
+            'type_client': type_client,
+            'tarif_horaire': tarif_horaire(type_client),
+            'montant': calculer_devis(heures, type_client)
+        })
+
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as e:
+        logger.error(f"Erreur calcul devis: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # ========================================================
 # ROUTES - GESTION DES PLACES
 # ========================================================
 @app.route('/places', methods=['GET'])
+@reponse_conditionnelle('PLACE')
 def get_places():
     """Récupérer toutes les places"""
     try:
         type_place = request.args.get('type')  # Filtre optionnel par type
+        forme = lire_forme()
         
-        with get_db_cursor() as cursor:
-            query = f"SELECT * FROM {TABLE_OWNER}.PLACE"
-            if type_place:
-                query += " WHERE type_place = :type"
-                cursor.execute(query + " ORDER BY numero_place", {'type': type_place})
-            else:
-                cursor.execute(query + " ORDER BY numero_place")
-            
-            rows = cursor.fetchall()
-            places = rows_to_dict_list(cursor, rows)
+        def charger():
+            with get_db_cursor() as cursor:
+                if type_place:
+                    cursor.execute(SQL['places_par_type'], {'type': type_place})
+                else:
+                    cursor.execute(SQL['places'])
+                
+                rows = cursor.fetchall()
+                return convertir_lignes(cursor, rows, forme)
+        
+        places = cache_obtenir(('places', type_place, forme), charger, ('PLACE',))
         
         return jsonify({
             'success': True,
-            'count': len(places),
+            'count': compter(places),
             'data': places
         })
+    except ParametreInvalide as error:
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 400
     except oracledb.Error as error:
         logger.error(f"Erreur lors de la récupération des places: {error}")
         return jsonify({
@@ -397,23 +1767,30 @@ def get_places():
         }), 500
 
 @app.route('/places/disponibles', methods=['GET'])
+@reponse_conditionnelle('PLACE')
 def get_places_disponibles():
     """Récupérer uniquement les places disponibles"""
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute(f"""
-                SELECT * FROM {TABLE_OWNER}.PLACE 
-                WHERE disponible = 'O' 
-                ORDER BY type_place, numero_place
-            """)
-            rows = cursor.fetchall()
-            places = rows_to_dict_list(cursor, rows)
+        forme = lire_forme()
+        
+        def charger():
+            with get_db_cursor() as cursor:
+                cursor.execute(SQL['places_disponibles'])
+                rows = cursor.fetchall()
+                return convertir_lignes(cursor, rows, forme)
+        
+        places = cache_obtenir(('places_disponibles', forme), charger, ('PLACE',))
         
         return jsonify({
             'success': True,
-            'count': len(places),
+            'count': compter(places),
             'data': places
         })
+    except ParametreInvalide as error:
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 400
     except oracledb.Error as error:
         logger.error(f"Erreur lors de la récupération des places disponibles: {error}")
         return jsonify({
@@ -425,30 +1802,30 @@ def get_places_disponibles():
 # ROUTES - GESTION DES ABONNEMENTS
 # ========================================================
 @app.route('/abonnements', methods=['GET'])
+@reponse_conditionnelle('ABONNEMENT', 'CLIENT')
 def get_abonnements():
     """Récupérer tous les abonnements"""
     try:
         actif_only = request.args.get('actif', 'false').lower() == 'true'
         
         with get_db_cursor() as cursor:
-            query = f"""
-                SELECT a.*, c.nom, c.prenom, c.telephone
-                FROM {TABLE_OWNER}.ABONNEMENT a
-                JOIN {TABLE_OWNER}.CLIENT c ON a.id_client = c.id_client
-            """
-            if actif_only:
-                query += " WHERE a.actif = 'O'"
-            query += " ORDER BY a.date_inscription DESC"
-            
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            abonnements = rows_to_dict_list(cursor, rows)
+            abonnements, next_cursor = executer_page(
+                cursor, *requete_abonnements(actif_only), CLES_ABONNEMENTS,
+                descendant=True,
+                forme=lire_forme()
+            )
         
         return jsonify({
             'success': True,
-            'count': len(abonnements),
-            'data': abonnements
+            'count': compter(abonnements),
+            'data': abonnements,
+            'next_cursor': next_cursor
         })
+    except ParametreInvalide as error:
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 400
     except oracledb.Error as error:
         logger.error(f"Erreur lors de la récupération des abonnements: {error}")
         return jsonify({
@@ -476,10 +1853,11 @@ def s_abonner():
         telephone = data.get('telephone')
         pmr = data.get('pmr', 'N')
         
-        with get_db_cursor(commit=True) as cursor:
-            cursor.callproc(f'{TABLE_OWNER}.s_abonner', [nom, prenom, telephone, pmr])
+        with get_db_cursor(commit=True, tables=('CLIENT', 'ABONNEMENT')) as cursor:
+            cursor.callproc(PROCEDURE_ABONNEMENT, [nom, prenom, telephone, pmr])
         
         logger.info(f"Nouvel abonnement créé pour {nom} {prenom}")
+        publier_evenement('clients', {'action': 'abonnement'})
         return jsonify({
             'success': True,
             'message': f'Abonnement effectué avec succès pour {nom} {prenom}'
@@ -496,141 +1874,739 @@ def s_abonner():
 # ROUTES - GESTION DES RÉSERVATIONS
 # ========================================================
 @app.route('/reservations', methods=['GET'])
+@reponse_conditionnelle('RESERVATION', 'CLIENT', 'PLACE', 'TARIF')
 def get_reservations():
     """Récupérer toutes les réservations"""
     try:
         en_cours = request.args.get('en_cours', 'false').lower() == 'true'
+        debut, fin = lire_periode()
+        format_export = lire_format_export()
+        query, conditions, params = requete_reservations(en_cours, debut, fin)
+        
+        if format_export:
+            return exporter_requete(requete_export(query, conditions, CLES_RESERVATIONS),
+                                    params, format_export, 'reservations')
         
         with get_db_cursor() as cursor:
-            query = f"""
-                SELECT r.*, c.nom, c.prenom, p.numero_place, p.type_place, t.tarif_horaire
-                FROM {TABLE_OWNER}.RESERVATION r
-                JOIN {TABLE_OWNER}.CLIENT c ON r.id_client = c.id_client
-                JOIN {TABLE_OWNER}.PLACE p ON r.id_place = p.id_place
-                LEFT JOIN {TABLE_OWNER}.TARIF t ON r.id_tarif = t.id_tarif
-            """
-            if en_cours:
-                query += " WHERE r.date_sortie IS NULL"
-            query += " ORDER BY r.date_entree DESC"
-            
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            reservations = rows_to_dict_list(cursor, rows)
+            reservations, next_cursor = executer_page(
+                cursor, query, conditions, params, CLES_RESERVATIONS,
+                descendant=True,
+                forme=lire_forme()
+            )
         
         return jsonify({
             'success': True,
-            'count': len(reservations),
-            'data': reservations
-        })
+            'count': compter(reservations),
+            'data': reservations,
+            'next_cursor': next_cursor,
+            'periode': decrire_periode(debut, fin)
+        })
+    except ParametreInvalide as error:
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 400
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors de la récupération des réservations: {error}")
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 500
+
+# ========================================================
+# PASSAGES (PARTAGÉS AVEC LA VARIANTE ASYNCIO app_async.py)
+# ========================================================
+# Validation, paramètres OUT et codes d'erreur des procédures de passage : la
+# seule différence entre app.py et app_async.py est l'appel (bloquant ou await).
+# PROCEDURE_ENTREE et PROCEDURE_SORTIE sont déclarées avec le registre.
+SORTIES_ENTREE = {'id_ticket': int, 'id_reservation': int, 'numero_place': str, 'tarif_horaire': float}
+SORTIES_SORTIE = {'montant': float, 'duree_heures': float, 'id_paiement': int}
+
+# Valeurs admises par la contrainte CHECK de PAIEMENT.mode_paiement
+MODES_PAIEMENT = ('Especes', 'Carte', 'En ligne')
+
+def lire_entree(data):
+    """Valide le corps d'une entrée ; retourne (nom, prenom, telephone, pmr)"""
+    data = data if isinstance(data, dict) else {}
+    for field in ('nom', 'prenom', 'telephone'):
+        if not data.get(field):
+            raise ParametreInvalide(f'Le champ {field} est requis')
+    pmr = data.get('pmr', 'N')
+    if isinstance(pmr, bool):
+        pmr = 'O' if pmr else 'N'
+    return data['nom'], data['prenom'], data['telephone'], pmr
+
+def lire_sortie(data):
+    """Valide le corps d'une sortie ; retourne (id_ticket, mode_paiement)"""
+    data = data if isinstance(data, dict) else {}
+    if not data.get('id_ticket'):
+        raise ParametreInvalide('Le champ id_ticket est requis')
+    return data['id_ticket'], lire_mode_paiement(data)
+
+def lire_mode_paiement(data):
+    """Mode de paiement d'une sortie ('Especes' par défaut), parmi MODES_PAIEMENT"""
+    mode_paiement = data.get('mode_paiement') or 'Especes'
+    if mode_paiement not in MODES_PAIEMENT:
+        raise ParametreInvalide(f"Mode de paiement invalide (valeurs admises : {', '.join(MODES_PAIEMENT)})")
+    return mode_paiement
+
+def variables_sorties(cursor, sorties):
+    """Variables OUT d'une procédure de passage (curseur synchrone ou asynchrone)"""
+    return {nom: cursor.var(type_) for nom, type_ in sorties.items()}
+
+def valeurs_sorties(variables):
+    """Valeurs des variables OUT après l'appel"""
+    valeurs = {nom: var.getvalue() for nom, var in variables.items()}
+    if valeurs.get('duree_heures') is not None:
+        valeurs['duree_heures'] = round(valeurs['duree_heures'], 2)
+    return valeurs
+
+def _code_oracle(error):
+    return error.args[0].code if error.args and hasattr(error.args[0], 'code') else None
+
+def statut_erreur_entree(error):
+    """(statut HTTP, message) d'une entrée refusée : 409 si le parking est complet"""
+    return (409 if _code_oracle(error) == 20001 else 500), str(error)
+
+def statut_erreur_sortie(error):
+    """(statut HTTP, message) d'une sortie refusée : 404 ticket inconnu, 409 déjà payé"""
+    code = _code_oracle(error)
+    return {1403: 404, 20001: 409}.get(code, 500), ('Ticket introuvable.' if code == 1403 else str(error))
+
+def enregistrer_entree(cursor, nom, prenom, telephone, pmr):
+    """Appelle ajouter_entree et retourne le ticket émis (paramètres OUT)"""
+    variables = variables_sorties(cursor, SORTIES_ENTREE)
+    cursor.callproc(PROCEDURE_ENTREE, [nom, prenom, telephone, pmr, *variables.values()])
+    return valeurs_sorties(variables)
+
+def erreur_entree(error):
+    """Réponse d'erreur d'une entrée (409 si le parking est complet)"""
+    statut, message = statut_erreur_entree(error)
+    return jsonify({
+        'success': False,
+        'error': message
+    }), statut
+
+@app.route('/entree', methods=['POST'])
+def ajouter_entree():
+    """Ajouter une entrée - utilise la procédure PL/SQL"""
+    try:
+        nom, prenom, telephone, pmr = lire_entree(request.json)
+        if JOURNAL_CONFIG['actif']:
+            return reponse_journalisee('entree', {'nom': nom, 'prenom': prenom, 'telephone': telephone, 'pmr': pmr})
+
+        with get_db_cursor(commit=True, tables=TABLES_ENTREE) as cursor:
+            ticket = enregistrer_entree(cursor, nom, prenom, telephone, pmr)
+
+        logger.info(f"Entrée enregistrée pour {nom} {prenom} (ticket {ticket['id_ticket']})")
+        diffuser_passage('entree', {'nom': nom, 'prenom': prenom, **ticket})
+        return jsonify({
+            'success': True,
+            'message': f'Entrée validée pour {nom} {prenom}',
+            **ticket
+        }), 201
+
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors de l'ajout de l'entrée: {error}")
+        return erreur_entree(error)
+    except sqlite3.Error as error:
+        logger.error(f"Erreur d'écriture dans le journal des passages: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
+
+def enregistrer_sortie(cursor, id_ticket, mode_paiement):
+    """Appelle valider_sortie et retourne le paiement créé (paramètres OUT)"""
+    variables = variables_sorties(cursor, SORTIES_SORTIE)
+    cursor.callproc(PROCEDURE_SORTIE, [id_ticket, mode_paiement, *variables.values()])
+    return valeurs_sorties(variables)
+
+def erreur_sortie(error):
+    """Réponse d'erreur d'une sortie (404 ticket inconnu, 409 déjà payé)"""
+    statut, message = statut_erreur_sortie(error)
+    return jsonify({
+        'success': False,
+        'error': message
+    }), statut
+
+@app.route('/sortie', methods=['POST'])
+def valider_sortie():
+    """Valider une sortie - utilise la procédure PL/SQL"""
+    try:
+        if JOURNAL_CONFIG['actif']:
+            return reponse_journalisee('sortie', lire_sortie_journal(request.json))
+        id_ticket, mode_paiement = lire_sortie(request.json)
+
+        with get_db_cursor(commit=True, tables=TABLES_SORTIE) as cursor:
+            paiement = enregistrer_sortie(cursor, id_ticket, mode_paiement)
+
+        logger.info(f"Sortie validée pour le ticket {id_ticket} ({paiement['montant']})")
+        diffuser_passage('sortie', {'id_ticket': id_ticket, 'mode_paiement': mode_paiement, **paiement})
+        return jsonify({
+            'success': True,
+            'message': 'Sortie validée avec succès',
+            'id_ticket': id_ticket,
+            **paiement
+        }), 200
+
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
     except oracledb.Error as error:
-        logger.error(f"Erreur lors de la récupération des réservations: {error}")
-        return jsonify({
-            'success': False,
-            'error': str(error)
-        }), 500
+        logger.error(f"Erreur lors de la validation de sortie: {error}")
+        return erreur_sortie(error)
+    except sqlite3.Error as error:
+        logger.error(f"Erreur d'écriture dans le journal des passages: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
 
-@app.route('/entree', methods=['POST'])
-def ajouter_entree():
-    """Ajouter une entrée - utilise la procédure PL/SQL"""
+# ========================================================
+# ROUTES - PASSAGES GROUPÉS (REJEU DES BORNES)
+# ========================================================
+# Blocs PL/SQL : SQL['entree_lot'] et SQL['sortie_lot'] (registre des requêtes).
+def lire_lot():
+    """Retourne la liste d'événements du corps (liste JSON ou {'evenements': [...]})"""
+    data = request.json
+    evenements = data.get('evenements') if isinstance(data, dict) else data
+    if not isinstance(evenements, list) or not evenements:
+        raise ParametreInvalide('Une liste non vide d\'événements est requise')
+    if len(evenements) > LOT_CONFIG['taille_max']:
+        raise ParametreInvalide(f"Lot trop volumineux (max {LOT_CONFIG['taille_max']} événements)")
+    return evenements
+
+def executer_lot(bloc, lignes, sorties, tables):
+    """Exécute `bloc` pour chaque ligne en un seul aller-retour (executemany).
+
+    `sorties` associe chaque variable OUT à son type Python ; retourne pour
+    chaque ligne un dictionnaire des valeurs OUT.
+    """
+    with get_db_cursor(commit=True, tables=tables) as cursor:
+        variables = {nom: cursor.var(type_, arraysize=len(lignes)) for nom, type_ in sorties.items()}
+        cursor.setinputsizes(**variables)
+        cursor.executemany(bloc, lignes)
+        return [{nom: var.getvalue(i) for nom, var in variables.items()} for i in range(len(lignes))]
+
+def reponse_lot(resultats, statut=200):
+    """Réponse commune des routes groupées"""
+    reussis = sum(1 for r in resultats if r['success'])
+    return jsonify({
+        'success': True,
+        'total': len(resultats),
+        'reussis': reussis,
+        'echecs': len(resultats) - reussis,
+        'resultats': resultats
+    }), statut
+
+def reponse_lot_journalisee(type_passage, resultats, valides):
+    """Réponse 202 d'un lot dont les événements valides (index, données) sont
+    ajoutés au journal, comme les passages de /entree et /sortie"""
+    for (i, _), id_evenement in zip(valides, journaliser_passages(type_passage, [d for _, d in valides])):
+        resultats[i] = {'index': i, 'success': True, 'en_attente': True, 'id_evenement': id_evenement}
+    if valides:
+        demarrer_videur()
+    return reponse_lot(resultats, 202)
+
+@app.route('/entree/batch', methods=['POST'])
+def ajouter_entrees_lot():
+    """Enregistrer un lot d'entrées (rejeu des bornes) en un seul aller-retour"""
     try:
-        data = request.json
+        evenements = lire_lot()
+        resultats = [None] * len(evenements)
+        lignes, positions = [], []
         
-        # Validation
-        required_fields = ['nom', 'prenom', 'telephone']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({
-                    'success': False,
-                    'error': f'Le champ {field} est requis'
-                }), 400
+        for i, ev in enumerate(evenements):
+            try:
+                nom, prenom, telephone, pmr = lire_entree(ev)
+            except ParametreInvalide as error:
+                resultats[i] = {'index': i, 'success': False, 'error': str(error)}
+                continue
+            lignes.append({'nom': nom, 'prenom': prenom, 'telephone': str(telephone), 'pmr': pmr})
+            positions.append(i)
         
-        nom = data.get('nom')
-        prenom = data.get('prenom')
-        telephone = data.get('telephone')
-        pmr = data.get('pmr', 'N')
+        if JOURNAL_CONFIG['actif']:
+            return reponse_lot_journalisee('entree', resultats, list(zip(positions, lignes)))
         
-        with get_db_cursor(commit=True) as cursor:
-            cursor.callproc(f'{TABLE_OWNER}.ajouter_entree', [nom, prenom, telephone, pmr])
+        if lignes:
+            sorties = executer_lot(SQL['entree_lot'], lignes, {
+                'id_ticket': int, 'id_reservation': int, 'numero_place': str,
+                'tarif_horaire': float, 'erreur': str
+            }, TABLES_ENTREE)
+            for i, sortie in zip(positions, sorties):
+                erreur = sortie.pop('erreur')
+                if erreur:
+                    resultats[i] = {'index': i, 'success': False, 'error': erreur}
+                else:
+                    resultats[i] = {'index': i, 'success': True, **sortie}
         
-        logger.info(f"Entrée enregistrée pour {nom} {prenom}")
-        return jsonify({
-            'success': True,
-            'message': f'Entrée validée pour {nom} {prenom}'
-        }), 201
+        reponse = reponse_lot(resultats)
+        logger.info(f"Lot d'entrées traité: {len(evenements)} événement(s)")
+        diffuser_passage('entree', {'lot': len(evenements)})
+        return reponse
         
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
     except oracledb.Error as error:
-        logger.error(f"Erreur lors de l'ajout de l'entrée: {error}")
-        return jsonify({
-            'success': False,
-            'error': str(error)
-        }), 500
+        logger.error(f"Erreur lors du lot d'entrées: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
+    except sqlite3.Error as error:
+        logger.error(f"Erreur d'écriture dans le journal des passages: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
 
-@app.route('/sortie', methods=['POST'])
-def valider_sortie():
-    """Valider une sortie - utilise la procédure PL/SQL"""
+@app.route('/sortie/batch', methods=['POST'])
+def valider_sorties_lot():
+    """Valider un lot de sorties (rejeu des bornes) en un seul aller-retour"""
     try:
-        data = request.json
+        evenements = lire_lot()
+        resultats = [None] * len(evenements)
+        lignes, positions = [], []
         
-        if not data.get('id_ticket'):
-            return jsonify({
-                'success': False,
-                'error': 'Le champ id_ticket est requis'
-            }), 400
+        for i, ev in enumerate(evenements):
+            try:
+                if JOURNAL_CONFIG['actif']:
+                    lignes.append(lire_sortie_journal(ev))
+                else:
+                    id_ticket, mode_paiement = lire_sortie(ev)
+                    lignes.append({'id_ticket': id_ticket, 'mode_paiement': mode_paiement})
+            except ParametreInvalide as error:
+                resultats[i] = {'index': i, 'success': False, 'error': str(error)}
+                continue
+            positions.append(i)
         
-        id_ticket = data.get('id_ticket')
-        mode_paiement = data.get('mode_paiement', 'Espèces')
+        if JOURNAL_CONFIG['actif']:
+            return reponse_lot_journalisee('sortie', resultats, list(zip(positions, lignes)))
         
-        with get_db_cursor(commit=True) as cursor:
-            cursor.callproc(f'{TABLE_OWNER}.valider_sortie', [id_ticket, mode_paiement])
+        if lignes:
+            sorties = executer_lot(SQL['sortie_lot'], lignes, {
+                'montant': float, 'duree_heures': float, 'id_paiement': int, 'erreur': str
+            }, TABLES_SORTIE)
+            for i, ligne, sortie in zip(positions, lignes, sorties):
+                erreur = sortie.pop('erreur')
+                if erreur:
+                    resultats[i] = {'index': i, 'success': False, 'id_ticket': ligne['id_ticket'], 'error': erreur}
+                else:
+                    sortie['duree_heures'] = round(sortie['duree_heures'], 2)
+                    resultats[i] = {'index': i, 'success': True, 'id_ticket': ligne['id_ticket'], **sortie}
         
-        logger.info(f"Sortie validée pour le ticket {id_ticket}")
-        return jsonify({
-            'success': True,
-            'message': 'Sortie validée avec succès',
-            'id_ticket': id_ticket
-        }), 200
+        reponse = reponse_lot(resultats)
+        logger.info(f"Lot de sorties traité: {len(evenements)} événement(s)")
+        diffuser_passage('sortie', {'lot': len(evenements)})
+        return reponse
         
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
     except oracledb.Error as error:
-        logger.error(f"Erreur lors de la validation de sortie: {error}")
+        logger.error(f"Erreur lors du lot de sorties: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
+    except sqlite3.Error as error:
+        logger.error(f"Erreur d'écriture dans le journal des passages: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
+
+# ========================================================
+# JOURNAL DES PASSAGES (ÉCRITURE DIFFÉRÉE VERS ORACLE)
+# ========================================================
+# Avec JOURNAL_CONFIG['actif'], /entree et /sortie (et leurs variantes /batch,
+# un événement par élément valide du lot) écrivent l'événement dans un
+# journal SQLite local (WAL, synchronous=FULL : durable avant la réponse 202)
+# au lieu d'attendre Oracle. Un thread (un seul processus à la fois, par bail)
+# rejoue le journal dans l'ordre, par lots d'événements consécutifs de même
+# type. Chaque événement rejoué est marqué dans PASSAGE_JOURNAL (migration 6),
+# avec ses résultats, dans la transaction du passage (migration 11) : un
+# événement déjà appliqué (reprise après une coupure entre Oracle et le
+# journal) n'est jamais rejoué, et ses résultats sont relus du marqueur.
+# Blocs PL/SQL : SQL['entree_journal'] et SQL['sortie_journal'].
+MESSAGES_JOURNAL = {'entree': 'Entrée enregistrée', 'sortie': 'Sortie enregistrée'}
+
+# SQLCODE d'erreurs passagères : l'événement reste en attente et sera rejoué
+ERREURS_TRANSITOIRES = {
+    -54,     # ORA-00054 : ressource occupée
+    -60,     # ORA-00060 : interblocage
+    -4068,   # ORA-04068 : état de package invalidé
+    -8177,   # ORA-08177 : sérialisation impossible
+}
+
+_journal_local = threading.local()
+_journal_pret = False
+_journal_lock = threading.Lock()
+_videur = None
+_videur_lock = threading.Lock()
+_videur_arret = threading.Event()
+_videur_stats = {'lots': 0, 'dernier_vidage': None, 'derniere_erreur': None}
+_proprietaire_bail = secrets.token_hex(8)
+
+def _creer_journal(connexion):
+    """Crée le journal (mode WAL, tables, identifiant) ; une fois par processus"""
+    global _journal_pret
+    with _journal_lock:
+        if _journal_pret:
+            return
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.executescript("""
+            CREATE TABLE IF NOT EXISTS evenements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                donnees TEXT NOT NULL,
+                recu_le REAL NOT NULL,
+                etat TEXT NOT NULL DEFAULT 'en_attente',
+                resultat TEXT,
+                traite_le REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_evenements_etat ON evenements(etat, id);
+            CREATE TABLE IF NOT EXISTS parametres (cle TEXT PRIMARY KEY, valeur TEXT);
+            INSERT OR IGNORE INTO parametres VALUES ('source', lower(hex(randomblob(16))));
+            INSERT OR IGNORE INTO parametres VALUES ('bail', '');
+            INSERT OR IGNORE INTO parametres VALUES ('bail_expire', '0');
+        """)
+        _journal_pret = True
+
+def _journal():
+    """Connexion SQLite du thread courant au journal (créé au premier accès)"""
+    connexion = getattr(_journal_local, 'connexion', None)
+    if connexion is None:
+        connexion = sqlite3.connect(JOURNAL_CONFIG['chemin'], timeout=10, isolation_level=None)
+        # synchronous est propre à chaque connexion (WAL est gardé dans le fichier)
+        connexion.execute("PRAGMA synchronous=FULL")
+        _creer_journal(connexion)
+        _journal_local.connexion = connexion
+    return connexion
+
+def source_journal():
+    """Identifiant du journal, préfixe des marqueurs PASSAGE_JOURNAL"""
+    return _journal().execute("SELECT valeur FROM parametres WHERE cle = 'source'").fetchone()[0]
+
+def journaliser_passage(type_passage, donnees):
+    """Ajoute un passage au journal (durable au retour) ; retourne son identifiant"""
+    curseur = _journal().execute(
+        "INSERT INTO evenements (type, donnees, recu_le) VALUES (?, ?, ?)",
+        (type_passage, json.dumps(donnees), time.time())
+    )
+    return curseur.lastrowid
+
+def journaliser_passages(type_passage, liste_donnees):
+    """Ajoute des passages au journal en une transaction (durable au retour) ;
+    retourne leurs identifiants, dans l'ordre"""
+    connexion = _journal()
+    maintenant = time.time()
+    connexion.execute("BEGIN IMMEDIATE")
+    try:
+        ids = [connexion.execute(
+            "INSERT INTO evenements (type, donnees, recu_le) VALUES (?, ?, ?)",
+            (type_passage, json.dumps(donnees), maintenant)
+        ).lastrowid for donnees in liste_donnees]
+        connexion.execute("COMMIT")
+    except Exception:
+        connexion.execute("ROLLBACK")
+        raise
+    return ids
+
+def lire_sortie_journal(data):
+    """Sortie journalisée : id_ticket, ou `evenement` = identifiant de l'entrée journalisée"""
+    data = data if isinstance(data, dict) else {}
+    if data.get('evenement') and not data.get('id_ticket'):
+        try:
+            evenement = int(data['evenement'])
+        except (TypeError, ValueError):
+            raise ParametreInvalide('Le champ evenement doit être un entier')
+        # La sortie est journalisée après l'entrée qu'elle désigne : une entrée
+        # absente du journal aurait un identifiant supérieur et bloquerait le vidage
+        entree = _journal().execute(
+            "SELECT 1 FROM evenements WHERE id = ? AND type = 'entree'", (evenement,)
+        ).fetchone()
+        if entree is None:
+            raise ParametreInvalide(f'Entrée journalisée {evenement} inconnue')
+        return {'evenement': evenement, 'mode_paiement': lire_mode_paiement(data)}
+    id_ticket, mode_paiement = lire_sortie(data)
+    return {'id_ticket': id_ticket, 'mode_paiement': mode_paiement}
+
+def reponse_journalisee(type_passage, donnees):
+    """Réponse 202 d'un passage accepté dans le journal"""
+    id_evenement = journaliser_passage(type_passage, donnees)
+    demarrer_videur()
+    return jsonify({
+        'success': True,
+        'en_attente': True,
+        'id_evenement': id_evenement,
+        'message': f'{MESSAGES_JOURNAL[type_passage]}, transmission différée'
+    }), 202
+
+def _prendre_bail():
+    """Vrai si ce processus détient (ou vient d'obtenir) le droit de vider le journal"""
+    maintenant = time.time()
+    connexion = _journal()
+    connexion.execute("BEGIN IMMEDIATE")
+    try:
+        bail, expire = [v for (v,) in connexion.execute(
+            "SELECT valeur FROM parametres WHERE cle IN ('bail', 'bail_expire') ORDER BY cle")]
+        libre = bail == _proprietaire_bail or float(expire) < maintenant
+        if libre:
+            connexion.execute("UPDATE parametres SET valeur = ? WHERE cle = 'bail'", (_proprietaire_bail,))
+            connexion.execute("UPDATE parametres SET valeur = ? WHERE cle = 'bail_expire'",
+                              (str(maintenant + JOURNAL_CONFIG['duree_bail']),))
+        connexion.execute("COMMIT")
+        return libre
+    except Exception:
+        connexion.execute("ROLLBACK")
+        raise
+
+def _marquer(evenements):
+    """Enregistre l'issue des événements traités : [(id, etat, resultat)]"""
+    maintenant = time.time()
+    connexion = _journal()
+    connexion.execute("BEGIN IMMEDIATE")
+    connexion.executemany(
+        "UPDATE evenements SET etat = ?, resultat = ?, traite_le = ? WHERE id = ?",
+        [(etat, json.dumps(resultat, default=_json_default), maintenant, id_evenement)
+         for id_evenement, etat, resultat in evenements]
+    )
+    connexion.execute("COMMIT")
+
+def _lot_suivant():
+    """Plus longue suite d'événements en attente de même type, en tête du journal"""
+    lignes = _journal().execute(
+        "SELECT id, type, donnees FROM evenements WHERE etat = 'en_attente' ORDER BY id LIMIT ?",
+        (JOURNAL_CONFIG['taille_lot'],)
+    ).fetchall()
+    lot = []
+    for id_evenement, type_passage, donnees in lignes:
+        if lot and type_passage != lot[0][1]:
+            break
+        lot.append((id_evenement, type_passage, json.loads(donnees)))
+    return lot
+
+def _resoudre_tickets(lot):
+    """Remplace la référence à une entrée journalisée par son ticket.
+
+    Retourne (lot résolu, événements rejetés). Une référence à une entrée
+    postérieure à la sortie est rejetée (elle ne serait jamais appliquée avant) ;
+    le lot s'arrête avant une entrée antérieure encore en attente.
+    """
+    resolus, rejetes = [], []
+    for id_evenement, type_passage, donnees in lot:
+        if 'evenement' in donnees:
+            if donnees['evenement'] >= id_evenement:
+                rejetes.append((id_evenement, 'rejete',
+                                {'error': f"Entrée {donnees['evenement']} postérieure à la sortie"}))
+                continue
+            ligne = _journal().execute(
+                "SELECT etat, resultat FROM evenements WHERE id = ? AND type = 'entree'",
+                (donnees['evenement'],)
+            ).fetchone()
+            if ligne is None or ligne[0] == 'rejete':
+                rejetes.append((id_evenement, 'rejete',
+                                {'error': f"Entrée {donnees['evenement']} inconnue ou rejetée"}))
+                continue
+            if ligne[0] == 'en_attente':
+                break
+            donnees = dict(donnees, id_ticket=json.loads(ligne[1])['id_ticket'])
+        resolus.append((id_evenement, type_passage, donnees))
+    return resolus, rejetes
+
+def rejouer_lot(bloc, resultats, source, ids, listes, sorties, tables):
+    """Exécute un bloc de rejeu du journal en un seul aller-retour.
+
+    `listes` associe chaque collection du bloc à (type Oracle, valeurs) ;
+    retourne [(code, erreur, sorties)] des événements tentés, dans l'ordre :
+    la liste s'arrête à la première erreur passagère.
+    """
+    with get_db_cursor(commit=True, tables=tables) as cursor:
+        nombres = cursor.connection.gettype('SYS.ODCINUMBERLIST')
+        textes = cursor.connection.gettype('SYS.ODCIVARCHAR2LIST')
+        liste_ids = nombres.newobject(ids)
+        codes, erreurs = cursor.var(nombres), cursor.var(textes)
+        params = {nom: cursor.connection.gettype(type_liste).newobject(valeurs)
+                  for nom, (type_liste, valeurs) in listes.items()}
+        cursor.execute(bloc, dict(params, source=source, ids=liste_ids, codes=codes, erreurs=erreurs,
+                                  transitoires=nombres.newobject(sorted(ERREURS_TRANSITOIRES))))
+        cursor.execute(resultats, {'source': source, 'ids': liste_ids})
+        appliques = {
+            ligne[0]: {nom: None if v is None else type_(v) for (nom, type_), v in zip(sorties.items(), ligne[1:])}
+            for ligne in cursor.fetchall()
+        }
+        issues = zip(ids, codes.getvalue().aslist(), erreurs.getvalue().aslist())
+        return [(int(code), erreur, appliques.get(id_evenement)) for id_evenement, code, erreur in issues]
+
+def vider_journal():
+    """Rejoue un lot du journal dans Oracle ; retourne le nombre d'événements traités"""
+    lot, rejetes = _resoudre_tickets(_lot_suivant())
+    traites = list(rejetes)
+    if lot:
+        source = source_journal()
+        ids = [i for i, _, _ in lot]
+        if lot[0][1] == 'entree':
+            bloc, resultats, tables = SQL['entree_journal'], SQL['resultats_entree_journal'], TABLES_ENTREE
+            listes = {
+                'noms': ('SYS.ODCIVARCHAR2LIST', [d['nom'] for _, _, d in lot]),
+                'prenoms': ('SYS.ODCIVARCHAR2LIST', [d['prenom'] for _, _, d in lot]),
+                'telephones': ('SYS.ODCIVARCHAR2LIST', [str(d['telephone']) for _, _, d in lot]),
+                'pmr': ('SYS.ODCIVARCHAR2LIST', [d['pmr'] for _, _, d in lot]),
+            }
+            sorties = SORTIES_ENTREE
+        else:
+            bloc, resultats, tables = SQL['sortie_journal'], SQL['resultats_sortie_journal'], TABLES_SORTIE
+            listes = {
+                'tickets': ('SYS.ODCINUMBERLIST', [d['id_ticket'] for _, _, d in lot]),
+                'modes': ('SYS.ODCIVARCHAR2LIST', [d['mode_paiement'] for _, _, d in lot]),
+            }
+            sorties = SORTIES_SORTIE
+
+        # Un événement non tenté (après une erreur passagère) reste en attente
+        for (id_evenement, _, _), (code, erreur, sortie) in zip(
+                lot, rejouer_lot(bloc, resultats, source, ids, listes, sorties, tables)):
+            if code in ERREURS_TRANSITOIRES:
+                break
+            if code:
+                traites.append((id_evenement, 'rejete', {'error': erreur}))
+            else:
+                if sortie.get('duree_heures') is not None:
+                    sortie['duree_heures'] = round(sortie['duree_heures'], 2)
+                traites.append((id_evenement, 'applique', sortie))
+        diffuser_passage(lot[0][1], {'lot': len(lot), 'journal': True})
+
+    if traites:
+        _marquer(traites)
+    return len(traites)
+
+def purger_journal():
+    """Supprime les événements traités plus anciens que la durée de rétention"""
+    _journal().execute(
+        "DELETE FROM evenements WHERE etat <> 'en_attente' AND traite_le < ?",
+        (time.time() - JOURNAL_CONFIG['retention_jours'] * 86400,)
+    )
+
+def _boucle_vidage():
+    """Corps du thread : vide le journal tant qu'il reste des événements"""
+    prochaine_purge = 0
+    while not _videur_arret.is_set():
+        attente = JOURNAL_CONFIG['intervalle']
+        try:
+            if _prendre_bail():
+                if vider_journal():
+                    attente = 0
+                _videur_stats['lots'] += 1
+                _videur_stats['dernier_vidage'] = time.time()
+                if time.monotonic() >= prochaine_purge:
+                    purger_journal()
+                    prochaine_purge = time.monotonic() + 3600
+        except (oracledb.Error, sqlite3.Error) as error:
+            logger.error(f"Erreur du vidage du journal des passages: {error}")
+            _videur_stats['derniere_erreur'] = str(error)
+            attente = JOURNAL_CONFIG['pause_erreur']
+        _videur_arret.wait(attente)
+
+def demarrer_videur():
+    """Démarre le thread de vidage du journal (une seule fois par processus)"""
+    global _videur
+    if _videur is not None or not JOURNAL_CONFIG['actif']:
+        return
+    with _videur_lock:
+        if _videur is None:
+            _videur = threading.Thread(target=_boucle_vidage, name='videur-journal', daemon=True)
+            _videur.start()
+            logger.info(f"Vidage du journal des passages démarré ({JOURNAL_CONFIG['chemin']})")
+
+def arreter_videur():
+    """Arrête le thread de vidage (avant la fermeture du pool)"""
+    _videur_arret.set()
+    if _videur is not None:
+        _videur.join(timeout=10)
+
+atexit.register(arreter_videur)
+app.before_request(demarrer_videur)
+
+def etat_journal():
+    """Métriques du journal : profondeur, retard de vidage, issues"""
+    if not JOURNAL_CONFIG['actif']:
+        # Journal inactif : ne pas ouvrir (ni créer) la base SQLite
+        return {'actif': False, 'videur_local': False}
+    connexion = _journal()
+    compte = dict(connexion.execute("SELECT etat, COUNT(*) FROM evenements GROUP BY etat").fetchall())
+    plus_ancien = connexion.execute(
+        "SELECT MIN(recu_le) FROM evenements WHERE etat = 'en_attente'").fetchone()[0]
+    dernier = connexion.execute(
+        "SELECT traite_le - recu_le FROM evenements WHERE etat <> 'en_attente' "
+        "ORDER BY traite_le DESC LIMIT 1").fetchone()
+    maintenant = time.time()
+    return {
+        'actif': JOURNAL_CONFIG['actif'],
+        'profondeur': compte.get('en_attente', 0),
+        'retard_s': round(maintenant - plus_ancien, 3) if plus_ancien else 0.0,
+        'dernier_delai_s': round(dernier[0], 3) if dernier else None,
+        'appliques': compte.get('applique', 0),
+        'rejetes': compte.get('rejete', 0),
+        'videur_local': _videur is not None and _videur.is_alive(),
+        'lots': _videur_stats['lots'],
+        'dernier_vidage': datetime.fromtimestamp(_videur_stats['dernier_vidage']).isoformat()
+        if _videur_stats['dernier_vidage'] else None,
+        'derniere_erreur': _videur_stats['derniere_erreur']
+    }
+
+@app.route('/journal/evenements/<int:id_evenement>', methods=['GET'])
+def get_evenement_journal(id_evenement):
+    """État d'un passage journalisé et son résultat (ticket ou paiement) une fois appliqué"""
+    if not JOURNAL_CONFIG['actif']:
+        return jsonify({'success': False, 'error': 'Journal des passages inactif'}), 404
+    try:
+        ligne = _journal().execute(
+            "SELECT type, etat, resultat, recu_le, traite_le FROM evenements WHERE id = ?", (id_evenement,)
+        ).fetchone()
+        if ligne is None:
+            return jsonify({'success': False, 'error': 'Événement introuvable'}), 404
+        type_passage, etat, resultat, recu_le, traite_le = ligne
         return jsonify({
-            'success': False,
-            'error': str(error)
-        }), 500
+            'success': True,
+            'id_evenement': id_evenement,
+            'type': type_passage,
+            'etat': etat,
+            'recu_le': datetime.fromtimestamp(recu_le).isoformat(),
+            'traite_le': datetime.fromtimestamp(traite_le).isoformat() if traite_le else None,
+            'resultat': json.loads(resultat) if resultat else None
+        })
+    except sqlite3.Error as error:
+        logger.error(f"Erreur de lecture du journal des passages: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
+
+@app.route('/journal/statut', methods=['GET'])
+@admin_required
+def get_statut_journal():
+    """Profondeur et retard du journal des passages"""
+    try:
+        return jsonify({'success': True, 'data': etat_journal()})
+    except sqlite3.Error as error:
+        logger.error(f"Erreur de lecture du journal des passages: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
 
 # ========================================================
 # ROUTES - GESTION DES PAIEMENTS
 # ========================================================
 @app.route('/paiements', methods=['GET'])
+@reponse_conditionnelle('PAIEMENT', 'RESERVATION', 'CLIENT')
 def get_paiements():
     """Récupérer tous les paiements"""
     try:
-        date_debut = request.args.get('date_debut')
-        date_fin = request.args.get('date_fin')
+        debut, fin = lire_periode()
+        format_export = lire_format_export()
+        query, conditions, params = requete_paiements(debut, fin)
+        
+        if format_export:
+            return exporter_requete(requete_export(query, conditions, CLES_PAIEMENTS),
+                                    params, format_export, 'paiements')
         
         with get_db_cursor() as cursor:
-            query = f"""
-                SELECT p.*, c.nom, c.prenom, r.date_entree, r.date_sortie
-                FROM {TABLE_OWNER}.PAIEMENT p
-                JOIN {TABLE_OWNER}.RESERVATION r ON p.id_reservation = r.id_reservation
-                JOIN {TABLE_OWNER}.CLIENT c ON r.id_client = c.id_client
-            """
-            params = {}
-            
-            if date_debut and date_fin:
-                query += " WHERE TRUNC(p.date_paiement) BETWEEN TO_DATE(:debut, 'YYYY-MM-DD') AND TO_DATE(:fin, 'YYYY-MM-DD')"
-                params = {'debut': date_debut, 'fin': date_fin}
-            
-            query += " ORDER BY p.date_paiement DESC"
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            paiements = rows_to_dict_list(cursor, rows)
+            paiements, next_cursor = executer_page(
+                cursor, query, conditions, params, CLES_PAIEMENTS,
+                descendant=True,
+                forme=lire_forme()
+            )
         
         return jsonify({
             'success': True,
-            'count': len(paiements),
-            'data': paiements
+            'count': compter(paiements),
+            'data': paiements,
+            'next_cursor': next_cursor,
+            'periode': decrire_periode(debut, fin)
         })
+    except ParametreInvalide as error:
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 400
     except oracledb.Error as error:
         logger.error(f"Erreur lors de la récupération des paiements: {error}")
         return jsonify({
@@ -675,13 +2651,13 @@ def add_client():
         # Log de la valeur PMR finale
         logger.info(f"PMR normalisé: '{pmr}'")
         
-        with get_db_cursor(commit=True) as cursor:
+        with get_db_cursor(commit=True, tables=('CLIENT',)) as cursor:
             # Log avant l'appel de la fonction
             logger.info(f"Appel Ajouter_client({nom}, {prenom}, {telephone}, {pmr})")
             
             # Appeler la fonction PL/SQL Ajouter_client
             client_id = cursor.callfunc(
-                f'{TABLE_OWNER}.Ajouter_client',
+                FONCTION_AJOUTER_CLIENT,
                 int,
                 [nom, prenom, telephone, pmr]
             )
@@ -696,11 +2672,7 @@ def add_client():
                 }), 500
             
             # Récupérer les informations du client
-            cursor.execute(f"""
-                SELECT id_client, nom, prenom, telephone, pmr
-                FROM {TABLE_OWNER}.CLIENT 
-                WHERE id_client = :id
-            """, {'id': client_id})
+            cursor.execute(SQL['client_par_id'], {'id': client_id})
             
             client = cursor.fetchone()
             
@@ -758,21 +2730,186 @@ def add_client():
         }), 500
     
 
+# ========================================================
+# ROUTES - IMPORT EN MASSE DES CLIENTS ET ABONNEMENTS
+# ========================================================
+def lire_lignes_import():
+    """Lit les lignes à importer : JSON (liste ou {'clients': [...]}) ou CSV (corps ou fichier)"""
+    fichier = request.files.get('fichier')
+    if fichier is not None or request.mimetype == 'text/csv':
+        texte = fichier.read().decode('utf-8-sig') if fichier is not None else request.get_data(as_text=True)
+        try:
+            dialecte = csv.Sniffer().sniff(texte.split('\n', 1)[0], delimiters=',;')
+        except csv.Error:
+            dialecte = csv.excel
+        lignes = [{(k or '').strip().lower(): v for k, v in ligne.items()}
+                  for ligne in csv.DictReader(io.StringIO(texte), dialect=dialecte)]
+    else:
+        data = request.get_json(silent=True)
+        lignes = data.get('clients') if isinstance(data, dict) else data
+        if not isinstance(lignes, list):
+            raise ParametreInvalide('Une liste de clients (JSON) ou un fichier CSV est requis')
+    
+    if not lignes:
+        raise ParametreInvalide('Aucune ligne à importer')
+    if len(lignes) > IMPORT_CONFIG['lignes_max']:
+        raise ParametreInvalide(f"Import trop volumineux (max {IMPORT_CONFIG['lignes_max']} lignes)")
+    return lignes
+
+def _oui_non(valeur, defaut='N'):
+    """Normalise une valeur O/N (accepte aussi booléens, oui/non, 1/0)"""
+    if valeur is None or valeur == '':
+        return defaut
+    if isinstance(valeur, bool):
+        return 'O' if valeur else 'N'
+    valeur = str(valeur).strip().upper()
+    if valeur in ('O', 'OUI', 'Y', 'YES', '1', 'TRUE'):
+        return 'O'
+    if valeur in ('N', 'NON', 'NO', '0', 'FALSE'):
+        return 'N'
+    return None
+
+def valider_ligne_import(ligne, abonner_defaut):
+    """Retourne (client normalisé, None) ou (None, message d'erreur)"""
+    if not isinstance(ligne, dict):
+        return None, 'Ligne invalide'
+    client = {f: str(ligne.get(f) or '').strip() for f in ('nom', 'prenom', 'telephone')}
+    manquants = [f for f, v in client.items() if not v]
+    if manquants:
+        return None, f'Champs manquants: {", ".join(manquants)}'
+    if len(client['telephone']) > 15:
+        return None, 'Téléphone trop long (15 caractères max)'
+    if len(client['nom']) > 50 or len(client['prenom']) > 50:
+        return None, 'Nom ou prénom trop long (50 caractères max)'
+    client['pmr'] = _oui_non(ligne.get('pmr'))
+    abonnement = _oui_non(ligne.get('abonnement'), abonner_defaut)
+    if client['pmr'] is None or abonnement is None:
+        return None, 'Valeur O/N invalide pour pmr ou abonnement'
+    client['abonnement'] = abonnement == 'O'
+    return client, None
+
+def clients_existants(cursor, telephones):
+    """Recherche ensembliste des téléphones déjà connus : {telephone: (id_client, abonné actif)}"""
+    type_liste = cursor.connection.gettype('SYS.ODCIVARCHAR2LIST')
+    cursor.execute(SQL['clients_existants'], {'telephones': type_liste.newobject(list(telephones))})
+    return {tel: (id_client, bool(actif)) for tel, id_client, actif in cursor}
+
+def executer_en_masse(cursor, requete, lignes):
+    """executemany avec batcherrors : retourne {indice de ligne: message d'erreur}"""
+    if not lignes:
+        return {}
+    cursor.executemany(requete, lignes, batcherrors=True)
+    return {erreur.offset: erreur.message for erreur in cursor.getbatcherrors()}
+
+@app.route('/clients/import', methods=['POST'])
+@admin_required
+def importer_clients():
+    """Importer des clients (et leurs abonnements) en masse depuis un CSV ou du JSON.
+    
+    Colonnes : nom, prenom, telephone, pmr (O/N), abonnement (O/N).
+    ?abonner=O abonne par défaut toutes les lignes.
+    """
+    try:
+        lignes = lire_lignes_import()
+        abonner_defaut = _oui_non(request.args.get('abonner'))
+        if abonner_defaut is None:
+            raise ParametreInvalide('Valeur invalide pour abonner (O/N attendu)')
+        
+        resultats = [None] * len(lignes)
+        valides = {}
+        for i, ligne in enumerate(lignes):
+            client, erreur = valider_ligne_import(ligne, abonner_defaut)
+            if erreur is None and client['telephone'] in valides:
+                erreur = f"Téléphone en double dans l'import (ligne {valides[client['telephone']][0] + 1})"
+            if erreur:
+                resultats[i] = {'ligne': i + 1, 'success': False, 'error': erreur}
+            else:
+                valides[client['telephone']] = (i, client)
+        
+        with get_db_cursor(commit=True, tables=('CLIENT', 'ABONNEMENT')) as cursor:
+            existants = clients_existants(cursor, valides) if valides else {}
+            
+            # Nouveaux clients : identifiants réservés en un aller-retour, puis insertion groupée
+            nouveaux = [(i, c) for i, c in valides.values() if c['telephone'] not in existants]
+            ids = []
+            if nouveaux:
+                cursor.execute(SQL['ids_clients'], {'n': len(nouveaux)})
+                ids = [row[0] for row in cursor]
+            erreurs = executer_en_masse(cursor, SQL['inserer_client'], [
+                {'id_client': id_client, 'nom': c['nom'], 'prenom': c['prenom'],
+                 'telephone': c['telephone'], 'pmr': c['pmr']}
+                for id_client, (_, c) in zip(ids, nouveaux)])
+            
+            for k, (id_client, (i, c)) in enumerate(zip(ids, nouveaux)):
+                if k in erreurs:
+                    resultats[i] = {'ligne': i + 1, 'success': False, 'error': erreurs[k]}
+                else:
+                    resultats[i] = {'ligne': i + 1, 'success': True, 'client': 'cree', 'id_client': id_client}
+            for tel, (id_client, _) in existants.items():
+                i = valides[tel][0]
+                resultats[i] = {'ligne': i + 1, 'success': True, 'client': 'existant', 'id_client': id_client}
+            
+            # Abonnements : les clients déjà abonnés sont écartés sans solliciter le trigger
+            a_abonner = []
+            for tel, (i, c) in valides.items():
+                if not c['abonnement'] or not resultats[i]['success']:
+                    continue
+                if existants.get(tel, (None, False))[1]:
+                    resultats[i]['abonnement'] = 'deja_actif'
+                else:
+                    a_abonner.append(i)
+            erreurs = executer_en_masse(cursor, SQL['inserer_abonnement'], [
+                {'id_client': resultats[i]['id_client'], 'duree': IMPORT_CONFIG['duree_abonnement']}
+                for i in a_abonner])
+            for k, i in enumerate(a_abonner):
+                if k in erreurs:
+                    resultats[i]['abonnement'] = 'erreur'
+                    resultats[i]['error'] = erreurs[k]
+                else:
+                    resultats[i]['abonnement'] = 'cree'
+        
+        reussis = sum(1 for r in resultats if r['success'])
+        logger.info(f"Import de clients: {reussis}/{len(resultats)} ligne(s) importée(s)")
+        publier_evenement('clients', {'action': 'import', 'lignes': reussis})
+        return jsonify({
+            'success': True,
+            'total': len(resultats),
+            'reussis': reussis,
+            'echecs': len(resultats) - reussis,
+            'clients_crees': sum(1 for r in resultats if r.get('client') == 'cree'),
+            'abonnements_crees': sum(1 for r in resultats if r.get('abonnement') == 'cree'),
+            'resultats': resultats
+        }), 200
+        
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors de l'import de clients: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
+
 @app.route('/clients', methods=['GET'])
 @login_required
+@reponse_conditionnelle('CLIENT')
 def get_clients():
     """Récupérer tous les clients"""
     try:
         with get_db_cursor() as cursor:
-            cursor.execute(f"SELECT * FROM {TABLE_OWNER}.CLIENT ORDER BY nom, prenom")
-            rows = cursor.fetchall()
-            clients = rows_to_dict_list(cursor, rows)
+            clients, next_cursor = executer_page(
+                cursor, *requete_clients(), CLES_CLIENTS,
+                forme=lire_forme()
+            )
         
         return jsonify({
             'success': True,
-            'count': len(clients),
-            'data': clients
+            'count': compter(clients),
+            'data': clients,
+            'next_cursor': next_cursor
         })
+    except ParametreInvalide as error:
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 400
     except oracledb.Error as error:
         logger.error(f"Erreur lors de la récupération des clients: {error}")
         return jsonify({
@@ -782,29 +2919,62 @@ def get_clients():
 # ========================================================
 # ROUTES - STATISTIQUES
 # ========================================================
+STATISTIQUES_TABLES = ('CLIENT', 'ABONNEMENT', 'PLACE', 'PAIEMENT')
+
+def calculer_statistiques(cursor):
+    """Calcule tous les indicateurs du tableau de bord en une seule requête.
+
+    Remplace les appels successifs à total_clients, total_abonnes,
+    taux_d_occup_places, taux_places_libres, revenu_d_jour et
+    nbr_paiement_valide. PLACE n'est parcourue qu'une fois ; PAIEMENT n'est
+    jamais parcourue en entier : le revenu ne lit que la plage du jour
+    (idx_paiement_date, partition du mois) et les paiements valides sont
+    comptés dans l'index idx_paiement_statut (migration 8).
+    """
+    cursor.execute(SQL['statistiques'])
+    (total_clients, total_abonnes, total_places, occupees,
+     libres, revenu_jour, paiements_valides) = cursor.fetchone()
+
+    return {
+        'total_clients': total_clients,
+        'total_abonnes': total_abonnes,
+        'total_places': total_places,
+        'places_occupees': occupees,
+        'places_libres': libres,
+        'taux_occupation': (occupees / total_places) * 100 if total_places else 0.0,
+        'taux_places_libres': (libres / total_places) * 100 if total_places else 0.0,
+        'revenu_jour': float(revenu_jour),
+        'paiements_valides': paiements_valides
+    }
+
+def lire_statistiques():
+    """Statistiques du parking servies depuis le cache (partagé par toutes les routes)"""
+    def charger():
+        with get_db_cursor() as cursor:
+            return calculer_statistiques(cursor)
+    return cache_obtenir('statistiques', charger, STATISTIQUES_TABLES, CACHE_CONFIG['ttl_statistiques'])
+
+def formater_statistiques(stats):
+    """Format public des statistiques (réponse /statistiques et événement 'occupation')"""
+    return {
+        'total_clients': stats['total_clients'],
+        'total_abonnes': stats['total_abonnes'],
+        'taux_occupation': round(stats['taux_occupation'], 2),
+        'taux_places_libres': round(stats['taux_places_libres'], 2),
+        'revenu_du_jour': round(stats['revenu_jour'], 2),
+        'nombre_paiements_valides': stats['paiements_valides']
+    }
+
 @app.route('/statistiques', methods=['GET'])
+@reponse_conditionnelle(*STATISTIQUES_TABLES, quotidien=True)
 def get_statistiques():
     """Récupérer les statistiques du parking"""
     try:
-        with get_db_cursor() as cursor:
-            # Appel des fonctions PL/SQL
-            total_clients = cursor.callfunc(f'{TABLE_OWNER}.total_clients', int)
-            total_abonnes = cursor.callfunc(f'{TABLE_OWNER}.total_abonnes', int)
-            taux_occupation = cursor.callfunc(f'{TABLE_OWNER}.taux_d_occup_places', float)
-            taux_libres = cursor.callfunc(f'{TABLE_OWNER}.taux_places_libres', float)
-            revenu_jour = cursor.callfunc(f'{TABLE_OWNER}.revenu_d_jour', float)
-            nbr_paiements = cursor.callfunc(f'{TABLE_OWNER}.nbr_paiement_valide', int)
+        stats = lire_statistiques()
         
         return jsonify({
             'success': True,
-            'data': {
-                'total_clients': total_clients,
-                'total_abonnes': total_abonnes,
-                'taux_occupation': round(taux_occupation, 2),
-                'taux_places_libres': round(taux_libres, 2),
-                'revenu_du_jour': round(revenu_jour, 2),
-                'nombre_paiements_valides': nbr_paiements
-            }
+            'data': formater_statistiques(stats)
         })
         
     except oracledb.Error as error:
@@ -815,6 +2985,323 @@ def get_statistiques():
         }), 500
 
 
+# ========================================================
+# ROUTES - HISTORIQUE DES REVENUS (CUMUL PAIEMENT_DAILY)
+# ========================================================
+# PAIEMENT_DAILY (migration 3) est tenu à jour par trigger à chaque paiement :
+# l'historique ne lit jamais PAIEMENT.
+GROUPEMENTS_REVENUS = {'day': 'DD', 'week': 'IW', 'month': 'MM'}
+
+def lire_periode_jours(jours_defaut):
+    """Période arrondie au jour (granularité du cumul) ; défaut : les `jours_defaut` derniers jours"""
+    debut, fin = lire_periode()
+    aujourd_hui = datetime.now(FUSEAU_BASE).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    fin = fin or aujourd_hui + timedelta(days=1)
+    if fin.time() != datetime.min.time():
+        fin = fin.replace(hour=0, minute=0, second=0) + timedelta(days=1)
+    debut = (debut or fin - timedelta(days=jours_defaut)).replace(hour=0, minute=0, second=0)
+    return debut, fin
+
+@app.route('/statistiques/revenus', methods=['GET'])
+@admin_required
+@reponse_conditionnelle('PAIEMENT', quotidien=True)
+def get_revenus():
+    """Revenus par jour, semaine ou mois (?from=&to=&tz=&group=day|week|month)"""
+    try:
+        groupe = request.args.get('group', 'day')
+        if groupe not in GROUPEMENTS_REVENUS:
+            raise ParametreInvalide(f"group doit valoir {', '.join(GROUPEMENTS_REVENUS)}")
+        debut, fin = lire_periode_jours(30)
+
+        with get_db_cursor() as cursor:
+            cursor.execute(SQL['revenus'], {'format_groupe': GROUPEMENTS_REVENUS[groupe], 'debut': debut, 'fin': fin})
+            rows = cursor.fetchall()
+
+        periodes = {}
+        for periode, mode_paiement, nb, montant in rows:
+            ligne = periodes.setdefault(periode, {
+                'periode': periode.date().isoformat(),
+                'nb_paiements': 0,
+                'montant_total': 0.0,
+                'par_mode': {}
+            })
+            ligne['nb_paiements'] += nb
+            ligne['montant_total'] += float(montant)
+            ligne['par_mode'][mode_paiement] = {'nb_paiements': nb, 'montant_total': float(montant)}
+
+        data = list(periodes.values())
+        return jsonify({
+            'success': True,
+            'group': groupe,
+            'periode': decrire_periode(debut, fin),
+            'total': {
+                'nb_paiements': sum(p['nb_paiements'] for p in data),
+                'montant_total': round(sum(p['montant_total'] for p in data), 2)
+            },
+            'data': data
+        })
+
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors de la récupération des revenus: {error}")
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 500
+
+
+# ========================================================
+# HISTORIQUE DE L'OCCUPATION (ÉCHANTILLONNAGE EN TÂCHE DE FOND)
+# ========================================================
+# Un thread relève l'occupation par type de place toutes les
+# OCCUPATION_CONFIG['intervalle'] secondes : les relevés récents restent en
+# mémoire (tampon circulaire), tous sont persistés dans OCCUPATION_HISTORIQUE
+# (migration 4). Les instants sont alignés sur l'intervalle : plusieurs
+# processus produisent la même clé et le doublon est simplement ignoré.
+TYPE_TOTAL = 'Total'
+
+_echantillons = deque(maxlen=OCCUPATION_CONFIG['taille_memoire'])
+_echantillons_lock = threading.Lock()
+_echantillonneur = None
+_echantillonneur_lock = threading.Lock()
+_echantillonneur_arret = threading.Event()
+
+def relever_occupation():
+    """Relève l'occupation courante et la persiste ; retourne (instant, {type: (total, occupées)})"""
+    intervalle = OCCUPATION_CONFIG['intervalle']
+    maintenant = datetime.now(FUSEAU_BASE).replace(tzinfo=None, microsecond=0)
+    minuit = maintenant.replace(hour=0, minute=0, second=0)
+    instant = minuit + timedelta(seconds=(maintenant - minuit).seconds // intervalle * intervalle)
+
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(SQL['occupation_par_type'])
+        mesures = {type_place or 'Inconnu': (total, occupees) for type_place, total, occupees in cursor}
+        mesures[TYPE_TOTAL] = (sum(t for t, _ in mesures.values()), sum(o for _, o in mesures.values()))
+        cursor.executemany(SQL['inserer_occupation'], [
+            {'instant': instant, 'type_place': t, 'total': total, 'occupees': occupees}
+            for t, (total, occupees) in mesures.items()], batcherrors=True)
+        # ORA-00001 : relevé déjà enregistré par un autre processus
+        for erreur in cursor.getbatcherrors():
+            if erreur.code != 1:
+                logger.warning(f"Relevé d'occupation non enregistré: {erreur.message}")
+
+    with _echantillons_lock:
+        if not _echantillons or _echantillons[-1][0] < instant:
+            _echantillons.append((instant, mesures))
+    return instant, mesures
+
+def purger_occupation():
+    """Supprime les relevés plus anciens que la durée de rétention"""
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(SQL['purger_occupation'], {'retention': OCCUPATION_CONFIG['retention_jours']})
+
+def _boucle_echantillonnage():
+    """Corps du thread : relevé à intervalle fixe, purge une fois par jour"""
+    prochaine_purge = 0
+    while not _echantillonneur_arret.is_set():
+        try:
+            relever_occupation()
+            if time.monotonic() >= prochaine_purge:
+                purger_occupation()
+                prochaine_purge = time.monotonic() + 86400
+        except Exception as error:
+            logger.error(f"Erreur de l'échantillonnage de l'occupation: {error}")
+        intervalle = OCCUPATION_CONFIG['intervalle']
+        _echantillonneur_arret.wait(intervalle - time.time() % intervalle)
+
+def demarrer_echantillonneur():
+    """Démarre le thread d'échantillonnage (une seule fois par processus)"""
+    global _echantillonneur
+    if _echantillonneur is not None or not OCCUPATION_CONFIG['actif']:
+        return
+    with _echantillonneur_lock:
+        if _echantillonneur is None:
+            _echantillonneur = threading.Thread(
+                target=_boucle_echantillonnage, name='echantillonneur-occupation', daemon=True
+            )
+            _echantillonneur.start()
+            logger.info("Échantillonnage de l'occupation démarré")
+
+def arreter_echantillonneur():
+    """Arrête le thread d'échantillonnage (avant la fermeture du pool)"""
+    _echantillonneur_arret.set()
+    if _echantillonneur is not None:
+        _echantillonneur.join(timeout=5)
+
+atexit.register(arreter_echantillonneur)
+app.before_request(demarrer_echantillonneur)
+
+def _agreger_seaux(points, debut, largeur):
+    """Sous-échantillonne [(type, instant, taux)] en seaux min/max/moyenne par type"""
+    seaux = {}
+    for type_place, instant, taux in points:
+        indice = int((instant - debut).total_seconds() // largeur)
+        seau = seaux.setdefault((type_place, indice), [taux, taux, 0.0, 0])
+        seau[0] = min(seau[0], taux)
+        seau[1] = max(seau[1], taux)
+        seau[2] += taux
+        seau[3] += 1
+    return [(t, i, mini, maxi, somme / n, n) for (t, i), (mini, maxi, somme, n) in sorted(seaux.items())]
+
+def lire_historique_occupation(debut, fin, largeur, type_place=None):
+    """Seaux (type, indice, min, max, moyenne, nb) : tampon mémoire s'il couvre la période, sinon la table"""
+    with _echantillons_lock:
+        memoire = list(_echantillons)
+    if memoire and memoire[0][0] <= debut:
+        points = [(t, instant, 100.0 * occupees / total)
+                  for instant, mesures in memoire if debut <= instant < fin
+                  for t, (total, occupees) in mesures.items()
+                  if total and (type_place is None or t == type_place)]
+        return _agreger_seaux(points, debut, largeur)
+
+    nom = 'historique_occupation'
+    params = {'debut': debut, 'fin': fin, 'largeur': largeur}
+    if type_place:
+        nom = 'historique_occupation_type'
+        params['type_place'] = type_place
+    with get_db_cursor() as cursor:
+        cursor.execute(SQL[nom], params)
+        return [(t, int(seau), float(mini), float(maxi), float(moy), n)
+                for t, seau, mini, maxi, moy, n in cursor]
+
+@app.route('/statistiques/occupation/historique', methods=['GET'])
+@admin_required
+def get_historique_occupation():
+    """Historique de l'occupation sous-échantillonné (?from=&to=&tz=&type=&points=)"""
+    try:
+        debut, fin = lire_periode()
+        maintenant = datetime.now(FUSEAU_BASE).replace(tzinfo=None, microsecond=0)
+        fin = fin or maintenant
+        debut = debut or fin - timedelta(days=1)
+        try:
+            points = int(request.args.get('points', OCCUPATION_CONFIG['points_defaut']))
+        except ValueError:
+            raise ParametreInvalide('Paramètre points invalide')
+        points = max(1, min(points, OCCUPATION_CONFIG['points_max']))
+        # Un seau ne descend jamais sous l'intervalle d'échantillonnage
+        largeur = max(OCCUPATION_CONFIG['intervalle'], int((fin - debut).total_seconds() / points) or 1)
+
+        series = {}
+        for type_place, indice, mini, maxi, moyenne, nb in lire_historique_occupation(
+                debut, fin, largeur, request.args.get('type')):
+            series.setdefault(type_place, []).append({
+                'debut': (debut + timedelta(seconds=indice * largeur)).isoformat(),
+                'min': round(mini, 1),
+                'max': round(maxi, 1),
+                'moyenne': round(moyenne, 1),
+                'echantillons': nb
+            })
+
+        return jsonify({
+            'success': True,
+            'periode': decrire_periode(debut, fin),
+            'largeur_seau_s': largeur,
+            'unite': 'taux_occupation_pct',
+            'data': series
+        })
+
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors de la lecture de l'historique d'occupation: {error}")
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 500
+
+@app.route('/events', methods=['GET'])
+@login_required
+def evenements():
+    """Flux SSE : occupation, revenus et passages poussés aux tableaux de bord"""
+    file = abonner_evenements()
+
+    def generer():
+        try:
+            # État initial, puis uniquement les changements
+            try:
+                yield f"event: occupation\ndata: {json.dumps(formater_statistiques(lire_statistiques()))}\n\n"
+            except oracledb.Error as error:
+                logger.error(f"Erreur lors de l'état initial SSE: {error}")
+            while True:
+                try:
+                    yield file.get(timeout=SSE_CONFIG['keepalive'])
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            desabonner_evenements(file)
+
+    return Response(
+        stream_with_context(generer()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# ========================================================
+# ROUTES - TABLEAUX DE BORD (CHARGEMENT GROUPÉ)
+# ========================================================
+TABLEAU_DE_BORD_TABLES = ('CLIENT', 'ABONNEMENT', 'PLACE', 'RESERVATION', 'PAIEMENT', 'TARIF')
+
+def charger_tableau_de_bord(avec_statistiques=False):
+    """Charge toutes les sections d'un tableau de bord dans une seule session.
+
+    Chaque liste n'est lue qu'une fois (première page) même si plusieurs
+    panneaux de l'interface l'affichent.
+    """
+    forme = lire_forme()
+    premiere_page = (PAGINATION_CONFIG['limite_defaut'], None)
+    sections = {}
+
+    with get_db_cursor() as cursor:
+        if avec_statistiques:
+            stats = cache_obtenir('statistiques', lambda: calculer_statistiques(cursor),
+                                  STATISTIQUES_TABLES, CACHE_CONFIG['ttl_statistiques'])
+            sections['statistiques'] = formater_statistiques(stats)
+
+        sections['clients'], _ = executer_page(
+            cursor, *requete_clients(), CLES_CLIENTS,
+            forme=forme, pagination=premiere_page)
+        sections['abonnements'], _ = executer_page(
+            cursor, *requete_abonnements(), CLES_ABONNEMENTS,
+            descendant=True, forme=forme, pagination=premiere_page)
+
+        cursor.execute(SQL['places'])
+        sections['places'] = convertir_lignes(cursor, cursor.fetchall(), forme)
+
+        sections['reservations'], _ = executer_page(
+            cursor, *requete_reservations(), CLES_RESERVATIONS,
+            descendant=True, forme=forme, pagination=premiere_page)
+        sections['paiements'], _ = executer_page(
+            cursor, *requete_paiements(), CLES_PAIEMENTS,
+            descendant=True, forme=forme, pagination=premiere_page)
+
+    return sections
+
+@app.route('/agent/dashboard', methods=['GET'])
+@agent_required
+@reponse_conditionnelle(*TABLEAU_DE_BORD_TABLES)
+def agent_dashboard_data():
+    """Toutes les données du tableau de bord agent en une requête"""
+    try:
+        return jsonify({'success': True, 'data': charger_tableau_de_bord()})
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors du chargement du tableau de bord agent: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
+
+@app.route('/admin/dashboard-data', methods=['GET'])
+@admin_required
+@reponse_conditionnelle(*TABLEAU_DE_BORD_TABLES, quotidien=True)
+def admin_dashboard_data():
+    """Toutes les données du tableau de bord administrateur en une requête"""
+    try:
+        return jsonify({'success': True, 'data': charger_tableau_de_bord(avec_statistiques=True)})
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors du chargement du tableau de bord admin: {error}")
+        return jsonify({'success': False, 'error': str(error)}), 500
 
 # ========================================================
 # ROUTE DE TEST
@@ -824,7 +3311,7 @@ def test_connexion():
     """Tester la connexion à la base de données"""
     try:
         with get_db_cursor() as cursor:
-            cursor.execute("SELECT 'Connexion réussie!' FROM DUAL")
+            cursor.execute(SQL['test_connexion'])
             result = cursor.fetchone()
         
         return jsonify({
@@ -840,6 +3327,15 @@ def test_connexion():
             'status': 'FAILED'
         }), 500
 
+@app.route('/pool/stats', methods=['GET'])
+@admin_required
+def pool_stats():
+    """Statistiques du pool de sessions Oracle"""
+    return jsonify({
+        'success': True,
+        'data': get_pool_stats()
+    })
+
 # ========================================================
 # GESTION DES ERREURS GLOBALES
 # ========================================================
@@ -863,12 +3359,9 @@ def internal_error(error):
 def delete_client(id_client):
     """Supprimer un client"""
     try:
-        with get_db_cursor(commit=True) as cursor:
+        with get_db_cursor(commit=True, tables=('CLIENT', 'RESERVATION')) as cursor:
             # Vérifier d'abord si le client existe
-            cursor.execute(f"""
-                SELECT id_client FROM {TABLE_OWNER}.CLIENT 
-                WHERE id_client = :id
-            """, {'id': id_client})
+            cursor.execute(SQL['client_existe'], {'id': id_client})
             
             if not cursor.fetchone():
                 return jsonify({
@@ -877,10 +3370,7 @@ def delete_client(id_client):
                 }), 404
             
             # Vérifier si le client a des réservations en cours
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM {TABLE_OWNER}.RESERVATION 
-                WHERE id_client = :id AND date_sortie IS NULL
-            """, {'id': id_client})
+            cursor.execute(SQL['reservations_en_cours_client'], {'id': id_client})
             
             reservations_actives = cursor.fetchone()[0]
             if reservations_actives > 0:
@@ -890,10 +3380,7 @@ def delete_client(id_client):
                 }), 400
             
             # Supprimer le client (cascade gérée par Oracle)
-            cursor.execute(f"""
-                DELETE FROM {TABLE_OWNER}.CLIENT 
-                WHERE id_client = :id
-            """, {'id': id_client})
+            cursor.execute(SQL['supprimer_client'], {'id': id_client})
             
             rows_deleted = cursor.rowcount
             
@@ -939,11 +3426,7 @@ def get_client(id_client):
     """Récupérer les informations d'un client spécifique"""
     try:
         with get_db_cursor() as cursor:
-            cursor.execute(f"""
-                SELECT id_client, nom, prenom, telephone, pmr
-                FROM {TABLE_OWNER}.CLIENT 
-                WHERE id_client = :id
-            """, {'id': id_client})
+            cursor.execute(SQL['client_par_id'], {'id': id_client})
             
             client = cursor.fetchone()
             
@@ -999,12 +3482,9 @@ def update_client(id_client):
                 'error': 'Nom et prénom obligatoires.'
             }), 400
         
-        with get_db_cursor(commit=True) as cursor:
+        with get_db_cursor(commit=True, tables=('CLIENT',)) as cursor:
             # Vérifier si le client existe
-            cursor.execute(f"""
-                SELECT id_client FROM {TABLE_OWNER}.CLIENT 
-                WHERE id_client = :id
-            """, {'id': id_client})
+            cursor.execute(SQL['client_existe'], {'id': id_client})
             
             if not cursor.fetchone():
                 return jsonify({
@@ -1013,10 +3493,7 @@ def update_client(id_client):
                 }), 404
             
             # Vérifier si le téléphone est déjà utilisé par un autre client
-            cursor.execute(f"""
-                SELECT id_client FROM {TABLE_OWNER}.CLIENT 
-                WHERE telephone = :tel AND id_client != :id
-            """, {'tel': telephone, 'id': id_client})
+            cursor.execute(SQL['telephone_autre_client'], {'tel': telephone, 'id': id_client})
             
             if cursor.fetchone():
                 return jsonify({
@@ -1025,14 +3502,7 @@ def update_client(id_client):
                 }), 400
             
             # Mettre à jour le client
-            cursor.execute(f"""
-                UPDATE {TABLE_OWNER}.CLIENT 
-                SET nom = :nom, 
-                    prenom = :prenom, 
-                    telephone = :telephone, 
-                    pmr = :pmr
-                WHERE id_client = :id
-            """, {
+            cursor.execute(SQL['modifier_client'], {
                 'nom': nom,
                 'prenom': prenom,
                 'telephone': telephone,
@@ -1049,11 +3519,7 @@ def update_client(id_client):
                 }), 400
             
             # Récupérer le client mis à jour
-            cursor.execute(f"""
-                SELECT id_client, nom, prenom, telephone, pmr
-                FROM {TABLE_OWNER}.CLIENT 
-                WHERE id_client = :id
-            """, {'id': id_client})
+            cursor.execute(SQL['client_par_id'], {'id': id_client})
             
             client = cursor.fetchone()
             columns = [col[0] for col in cursor.description]
@@ -1092,73 +3558,57 @@ def update_client(id_client):
 @app.route('/agent/entree', methods=['POST'])
 def agent_entree():
     try:
-        data = request.json
-
-        nom = data.get('nom')
-        prenom = data.get('prenom')
-        telephone = data.get('telephone')
-        pmr = data.get('pmr', 'N')
-
-        if not all([nom, prenom, telephone]):
-            return jsonify({'success': False, 'error': 'Champs manquants'}), 400
-
-        if isinstance(pmr, bool):
-            pmr = 'O' if pmr else 'N'
+        nom, prenom, telephone, pmr = lire_entree(request.json)
 
-        with get_db_cursor(commit=True) as cursor:
-            cursor.callproc('Parking.ajouter_entree', [nom, prenom, telephone, pmr])
+        with get_db_cursor(commit=True, tables=TABLES_ENTREE) as cursor:
+            ticket = enregistrer_entree(cursor, nom, prenom, telephone, pmr)
 
-        return jsonify({'success': True, 'message': 'Entrée enregistrée'})
+        diffuser_passage('entree', {'nom': nom, 'prenom': prenom, **ticket})
+        return jsonify({'success': True, 'message': 'Entrée enregistrée', **ticket})
 
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as error:
+        return erreur_entree(error)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 @app.route('/agent/tickets', methods=['GET'])
+@reponse_conditionnelle('TICKET', 'RESERVATION', 'CLIENT', 'PLACE')
 def agent_tickets():
     try:
         with get_db_cursor() as cursor:
-            cursor.execute("""
-                SELECT t.id_ticket,
-                       r.date_entree,
-                       p.numero_place,
-                       c.nom,
-                       c.prenom
-                FROM Parking.TICKET t
-                JOIN Parking.RESERVATION r ON t.id_reservation = r.id_reservation
-                JOIN Parking.CLIENT c ON r.id_client = c.id_client
-                JOIN Parking.PLACE p ON r.id_place = p.id_place
-                WHERE r.date_sortie IS NULL
-                ORDER BY r.date_entree DESC
-            """)
-            rows = cursor.fetchall()
-            return jsonify({'success': True, 'data': rows_to_dict_list(cursor, rows)})
+            cursor.execute(SQL['tickets_en_cours'])
+            appliquer_rowfactory(cursor)
+            return jsonify({'success': True, 'data': cursor.fetchall()})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 @app.route('/agent/sortie', methods=['POST'])
 def agent_sortie():
     try:
-        data = request.json
-        id_ticket = data.get('id_ticket')
-        mode_paiement = data.get('mode_paiement', 'Espèces')
-
-        if not id_ticket:
-            return jsonify({'success': False, 'error': 'id_ticket requis'}), 400
+        id_ticket, mode_paiement = lire_sortie(request.json)
 
-        with get_db_cursor(commit=True) as cursor:
-            cursor.callproc('Parking.valider_sortie', [id_ticket, mode_paiement])
+        with get_db_cursor(commit=True, tables=TABLES_SORTIE) as cursor:
+            paiement = enregistrer_sortie(cursor, id_ticket, mode_paiement)
 
-        return jsonify({'success': True, 'message': 'Sortie validée'})
+        diffuser_passage('sortie', {'id_ticket': id_ticket, 'mode_paiement': mode_paiement, **paiement})
+        return jsonify({'success': True, 'message': 'Sortie validée', 'id_ticket': id_ticket, **paiement})
 
+    except ParametreInvalide as error:
+        return jsonify({'success': False, 'error': str(error)}), 400
+    except oracledb.Error as error:
+        return erreur_sortie(error)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 @app.route('/agent/statistiques', methods=['GET'])
+@reponse_conditionnelle(*STATISTIQUES_TABLES, quotidien=True)
 def agent_stats():
     try:
-        with get_db_cursor() as cursor:
-            stats = {
-                'occupation': cursor.callfunc('Parking.taux_d_occup_places', float),
-                'places_libres': cursor.callfunc('Parking.taux_places_libres', float),
-                'revenu_jour': cursor.callfunc('Parking.revenu_d_jour', float)
-            }
+        calcul = lire_statistiques()
+        stats = {
+            'occupation': calcul['taux_occupation'],
+            'places_libres': calcul['taux_places_libres'],
+            'revenu_jour': calcul['revenu_jour']
+        }
         return jsonify({'success': True, 'data': stats})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1197,7 +3647,9 @@ if __name__ == '__main__':
     print("    - GET  /paiements")
     print("  Statistiques:")
     print("    - GET  /statistiques")
+    print("    - GET  /events (SSE)")
     print("  Test:")
     print("    - GET  /test-connexion")
+    print("    - GET  /pool/stats")
     print("=" * 60)
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Variante asyncio des routes de passage (POST /entree, /sortie, /agent/entree, /agent/sortie).
+
+Application ASGI servie sur un pool oracledb asynchrone (create_pool_async) :
+une requête en attente d'Oracle ne bloque aucun thread, un seul processus
+garde des centaines de passages en vol, limités par ASYNC_CONFIG['max']
+sessions. La validation, les paramètres OUT et les codes d'erreur sont ceux
+de app.py ; les réponses JSON sont identiques à celles des routes Flask.
+
+Les tableaux de bord et le reste de l'API restent servis par app.py ; ce
+processus n'a ni cache ni abonnés SSE. Les procédures de passage incrémentent
+VERSION_DONNEES (migration 7) dans leur transaction : les processus Flask
+changent leurs ETags et leur cache au plus CACHE_CONFIG['ttl_versions']
+secondes après le commit, et leur veille SSE (SSE_CONFIG['veille']) envoie
+'resync' aux tableaux de bord connectés.
+
+Usage (n'importe quel serveur ASGI, par exemple uvicorn) :
+    uvicorn app_async:application --port 5001
+"""
+import json
+import logging
+
+import oracledb
+
+from app import (
+    ASYNC_CONFIG, DB_CONFIG, ParametreInvalide, PROCEDURE_ENTREE, PROCEDURE_SORTIE,
+    SORTIES_ENTREE, SORTIES_SORTIE, _json_default, lire_entree, lire_sortie,
+    statut_erreur_entree, statut_erreur_sortie, valeurs_sorties, variables_sorties
+)
+
+logger = logging.getLogger(__name__)
+
+# ========================================================
+# POOL DE SESSIONS ASYNCHRONE
+# ========================================================
+_pool = None
+
+def get_pool():
+    """Retourne le pool asynchrone (créé au démarrage ou au premier appel)"""
+    global _pool
+    if _pool is None:
+        _pool = oracledb.create_pool_async(
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            dsn=DB_CONFIG['dsn'],
+            min=ASYNC_CONFIG['min'],
+            max=ASYNC_CONFIG['max'],
+            increment=ASYNC_CONFIG['increment'],
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout=ASYNC_CONFIG['wait_timeout'],
+            stmtcachesize=ASYNC_CONFIG['stmtcachesize']
+        )
+        logger.info(f"Pool Oracle asynchrone créé (min={ASYNC_CONFIG['min']}, max={ASYNC_CONFIG['max']})")
+    return _pool
+
+async def fermer_pool():
+    """Ferme le pool en laissant les passages en cours se terminer"""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
+        logger.info("Pool Oracle asynchrone fermé")
+
+# ========================================================
+# PASSAGES
+# ========================================================
+async def enregistrer_entree(nom, prenom, telephone, pmr):
+    """Appelle ajouter_entree et valide ; retourne le ticket émis"""
+    async with get_pool().acquire() as connection:
+        cursor = connection.cursor()
+        variables = variables_sorties(cursor, SORTIES_ENTREE)
+        await cursor.callproc(PROCEDURE_ENTREE, [nom, prenom, telephone, pmr, *variables.values()])
+        await connection.commit()
+        return valeurs_sorties(variables)
+
+async def enregistrer_sortie(id_ticket, mode_paiement):
+    """Appelle valider_sortie et valide ; retourne le paiement créé"""
+    async with get_pool().acquire() as connection:
+        cursor = connection.cursor()
+        variables = variables_sorties(cursor, SORTIES_SORTIE)
+        await cursor.callproc(PROCEDURE_SORTIE, [id_ticket, mode_paiement, *variables.values()])
+        await connection.commit()
+        return valeurs_sorties(variables)
+
+async def ajouter_entree(data):
+    nom, prenom, telephone, pmr = lire_entree(data)
+    try:
+        ticket = await enregistrer_entree(nom, prenom, telephone, pmr)
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors de l'ajout de l'entrée: {error}")
+        statut, message = statut_erreur_entree(error)
+        return statut, {'success': False, 'error': message}
+    logger.info(f"Entrée enregistrée pour {nom} {prenom} (ticket {ticket['id_ticket']})")
+    return 201, {'success': True, 'message': f'Entrée validée pour {nom} {prenom}', **ticket}
+
+async def agent_entree(data):
+    statut, corps = await ajouter_entree(data)
+    if statut == 201:
+        statut, corps['message'] = 200, 'Entrée enregistrée'
+    return statut, corps
+
+async def valider_sortie(data):
+    id_ticket, mode_paiement = lire_sortie(data)
+    try:
+        paiement = await enregistrer_sortie(id_ticket, mode_paiement)
+    except oracledb.Error as error:
+        logger.error(f"Erreur lors de la validation de sortie: {error}")
+        statut, message = statut_erreur_sortie(error)
+        return statut, {'success': False, 'error': message}
+    logger.info(f"Sortie validée pour le ticket {id_ticket} ({paiement['montant']})")
+    return 200, {'success': True, 'message': 'Sortie validée avec succès', 'id_ticket': id_ticket, **paiement}
+
+async def agent_sortie(data):
+    statut, corps = await valider_sortie(data)
+    if statut == 200:
+        corps['message'] = 'Sortie validée'
+    return statut, corps
+
+ROUTES = {
+    '/entree': ajouter_entree,
+    '/sortie': valider_sortie,
+    '/agent/entree': agent_entree,
+    '/agent/sortie': agent_sortie,
+}
+
+# ========================================================
+# APPLICATION ASGI
+# ========================================================
+async def lire_corps(receive):
+    """Lit le corps de la requête (ParametreInvalide au-delà de ASYNC_CONFIG['corps_max'])"""
+    corps = bytearray()
+    while True:
+        message = await receive()
+        corps += message.get('body', b'')
+        if len(corps) > ASYNC_CONFIG['corps_max']:
+            raise ParametreInvalide('Corps de requête trop volumineux')
+        if not message.get('more_body'):
+            return bytes(corps)
+
+async def envoyer_json(send, statut, donnees):
+    corps = json.dumps(donnees, default=_json_default).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': statut,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(corps)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': corps})
+
+async def cycle_de_vie(receive, send):
+    """Ouvre le pool au démarrage du serveur et le ferme à l'arrêt"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                get_pool()
+            except oracledb.Error as error:
+                await send({'type': 'lifespan.startup.failed', 'message': str(error)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await fermer_pool()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    """Point d'entrée ASGI"""
+    if scope['type'] == 'lifespan':
+        await cycle_de_vie(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    route = ROUTES.get(scope['path'])
+    if route is None:
+        await envoyer_json(send, 404, {'success': False, 'error': 'Route inconnue'})
+        return
+    if scope['method'] != 'POST':
+        await envoyer_json(send, 405, {'success': False, 'error': 'Méthode non autorisée'})
+        return
+
+    try:
+        corps = await lire_corps(receive)
+        try:
+            data = json.loads(corps) if corps else None
+        except ValueError:
+            raise ParametreInvalide('Corps JSON invalide')
+        statut, reponse = await route(data)
+    except ParametreInvalide as error:
+        statut, reponse = 400, {'success': False, 'error': str(error)}
+    except Exception as error:
+        logger.error(f"Erreur inattendue sur {scope['path']}: {error}")
+        statut, reponse = 500, {'success': False, 'error': str(error)}
+    await envoyer_json(send, statut, reponse)
@@ -0,0 +1,121 @@
+"""
+Micro-benchmark de la matérialisation des lignes.
+
+Compare l'ancien helper (liste des colonnes recalculée à chaque ligne) à la
+couche de conversion actuelle de app.py sur 100 000 lignes simulées.
+
+Usage :
+    python benchmarks/bench_lignes.py [nb_lignes]
+"""
+import os
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import oracledb
+import app
+
+Colonne = namedtuple('Colonne', ['name', 'type_code'])
+
+
+class CurseurSimule:
+    """Curseur minimal exposant description et rowfactory comme oracledb"""
+
+    def __init__(self, description, rows):
+        self.description = description
+        self.rows = rows
+        self.rowfactory = None
+
+    def fetchall(self):
+        if self.rowfactory is None:
+            return list(self.rows)
+        return [self.rowfactory(*row) for row in self.rows]
+
+
+def ancien_row_to_dict(cursor, row):
+    columns = [col[0] for col in cursor.description]
+    return dict(zip(columns, row))
+
+
+def ancien_rows_to_dict_list(cursor, rows):
+    return [ancien_row_to_dict(cursor, row) for row in rows]
+
+
+def generer_lignes(nb):
+    """Lignes au format de /reservations (jointure RESERVATION/CLIENT/PLACE/TARIF)"""
+    description = [
+        Colonne('ID_RESERVATION', oracledb.DB_TYPE_NUMBER),
+        Colonne('ID_CLIENT', oracledb.DB_TYPE_NUMBER),
+        Colonne('ID_PLACE', oracledb.DB_TYPE_NUMBER),
+        Colonne('ID_TARIF', oracledb.DB_TYPE_NUMBER),
+        Colonne('DATE_ENTREE', oracledb.DB_TYPE_DATE),
+        Colonne('DATE_SORTIE', oracledb.DB_TYPE_DATE),
+        Colonne('STATUT', oracledb.DB_TYPE_VARCHAR),
+        Colonne('MONTANT_TOTAL', oracledb.DB_TYPE_NUMBER),
+        Colonne('NOM', oracledb.DB_TYPE_VARCHAR),
+        Colonne('PRENOM', oracledb.DB_TYPE_VARCHAR),
+        Colonne('NUMERO_PLACE', oracledb.DB_TYPE_VARCHAR),
+        Colonne('TYPE_PLACE', oracledb.DB_TYPE_VARCHAR),
+        Colonne('TARIF_HORAIRE', oracledb.DB_TYPE_NUMBER),
+    ]
+    debut = datetime(2025, 1, 1)
+    rows = []
+    for i in range(nb):
+        entree = debut + timedelta(minutes=i)
+        rows.append((
+            i, i % 5000, i % 300, 1 + i % 2, entree, entree + timedelta(hours=2),
+            'Terminee', 20.0, f'Nom{i % 5000}', f'Prenom{i % 5000}',
+            f'A{i % 300}', 'Standard', 10.0
+        ))
+    return description, rows
+
+
+def mesurer(nom, fonction, repetitions=3):
+    meilleur = None
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        duree = time.perf_counter() - debut
+        meilleur = duree if meilleur is None else min(meilleur, duree)
+    print(f"  {nom:<40} {meilleur * 1000:9.1f} ms")
+    return meilleur
+
+
+def main():
+    nb = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    description, rows = generer_lignes(nb)
+    print(f"Matérialisation de {nb} lignes ({len(description)} colonnes)")
+
+    candidats = {
+        'ancien rows_to_dict_list':
+            lambda: ancien_rows_to_dict_list(CurseurSimule(description, rows), rows),
+        'convertir_lignes (records)':
+            lambda: app.convertir_lignes(CurseurSimule(description, rows), rows),
+        'convertir_lignes (columns)':
+            lambda: app.convertir_lignes(CurseurSimule(description, rows), rows, 'columns'),
+        'appliquer_rowfactory + fetchall':
+            lambda: app.appliquer_rowfactory(CurseurSimule(description, rows)).fetchall(),
+    }
+
+    print("\nConversion seule :")
+    reference = None
+    for nom, fonction in candidats.items():
+        duree = mesurer(nom, fonction)
+        reference = reference or duree
+        print(f"  {'':<40} x{reference / duree:.2f} vs ancien")
+
+    # Les dates de l'ancien helper sont sérialisées par le fournisseur JSON de Flask
+    print("\nConversion + sérialisation JSON (fournisseur Flask) :")
+    dumps = app.app.json.dumps
+    reference = None
+    for nom, fonction in candidats.items():
+        duree = mesurer(nom, lambda: dumps(fonction()))
+        reference = reference or duree
+        print(f"  {'':<40} x{reference / duree:.2f} vs ancien")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Comparaison des routes de passage synchrones (Flask) et asyncio (app_async.py).
+
+Pour chaque cible et chaque niveau de concurrence, envoie N entrées puis les N
+sorties correspondantes (POST /entree puis POST /sortie) et mesure le débit
+(requêtes/s) et les latences p50/p95/p99 de chaque phase.
+
+Usage (app.py sur le port 5000, app_async.py sur le port 5001, toutes deux
+lancées sur le schéma de test) :
+    python benchmarks/bench_passages.py --dsn localhost/TESTPDB --user parking_test \
+        --schema PARKING_TEST --passages 500 --concurrence 16 64 256
+    uvicorn app_async:application --port 5001   # pour lancer la variante asyncio
+
+Comme charge_entree.py (dont la base de test et le nettoyage sont repris), le
+banc refuse la base de DB_CONFIG sauf --autoriser-base-app, refuse de démarrer
+si des clients ont déjà des téléphones du préfixe de test, et ne supprime à la
+fin de chaque palier que les places et clients qu'il a créés.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from charge_entree import (ajouter_arguments_base, connecter_base_de_test, nettoyer, percentile,
+                           preparer_places, telephones_de_test, verifier_prefixe_libre)
+
+
+def envoyer(url, chemin, donnees):
+    """POST JSON ; retourne (corps de réponse ou None, latence en ms)"""
+    requete = urllib.request.Request(url + chemin, data=json.dumps(donnees).encode('utf-8'), method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    debut = time.perf_counter()
+    try:
+        with urllib.request.urlopen(requete, timeout=60) as reponse:
+            corps = json.loads(reponse.read())
+    except (urllib.error.URLError, ValueError, OSError):
+        corps = None
+    return corps, (time.perf_counter() - debut) * 1000
+
+
+def phase(nb_threads, taches):
+    """Exécute les tâches en parallèle ; retourne (résultats, mesures)"""
+    if not taches:
+        return [], {'requetes': 0, 'reponses_ok': 0}
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=nb_threads) as executor:
+        resultats = list(executor.map(lambda tache: tache(), taches))
+    duree = time.perf_counter() - debut
+    latences = [ms for _, ms in resultats]
+    return resultats, {
+        'requetes': len(resultats),
+        'reponses_ok': sum(1 for corps, _ in resultats if corps and corps.get('success')),
+        'requetes_par_s': round(len(resultats) / duree, 1),
+        'p50_ms': round(statistics.median(latences), 1),
+        'p95_ms': round(percentile(latences, 95), 1),
+        'p99_ms': round(percentile(latences, 99), 1)
+    }
+
+
+def palier(url, connection, schema, prefixe, nb_passages, concurrence):
+    telephones = telephones_de_test(prefixe, nb_passages)
+    cursor = connection.cursor()
+    verifier_prefixe_libre(cursor, schema, prefixe)
+    places = preparer_places(cursor, schema, nb_passages)
+    connection.commit()
+
+    try:
+        entrees, mesures_entree = phase(concurrence, [
+            (lambda n=n: envoyer(url, '/entree', {
+                'nom': 'Bench', 'prenom': f'Passage{n}', 'telephone': telephones[n], 'pmr': 'N'
+            })) for n in range(nb_passages)
+        ])
+        tickets = [corps['id_ticket'] for corps, _ in entrees if corps and corps.get('success')]
+        _, mesures_sortie = phase(concurrence, [
+            (lambda t=t: envoyer(url, '/sortie', {'id_ticket': t, 'mode_paiement': 'Carte'})) for t in tickets
+        ])
+    finally:
+        nettoyer(cursor, schema, telephones, places)
+        connection.commit()
+        cursor.close()
+    return {'concurrence': concurrence, 'entree': mesures_entree, 'sortie': mesures_sortie}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sync', default='http://localhost:5000', help='URL de app.py (Flask)')
+    parser.add_argument('--async', dest='url_async', default='http://localhost:5001', help='URL de app_async.py')
+    parser.add_argument('--passages', type=int, default=500)
+    parser.add_argument('--concurrence', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--sortie', help='Fichier JSON où enregistrer les résultats')
+    ajouter_arguments_base(parser)
+    args = parser.parse_args()
+
+    connection = connecter_base_de_test(parser, args)
+    try:
+        resultats = {
+            cible: [palier(url, connection, args.schema, args.prefixe_telephone, args.passages, c)
+                    for c in args.concurrence]
+            for cible, url in (('sync', args.sync), ('async', args.url_async))
+        }
+    finally:
+        connection.close()
+
+    print(f"{'cible':<6} {'conc.':>5} {'phase':<7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}  ok")
+    for cible, paliers in resultats.items():
+        for p in paliers:
+            for nom in ('entree', 'sortie'):
+                m = p[nom]
+                if not m['requetes']:
+                    continue
+                print(f"{cible:<6} {p['concurrence']:>5} {nom:<7} {m['requetes_par_s']:>8} "
+                      f"{m['p50_ms']:>8} {m['p95_ms']:>8} {m['p99_ms']:>8}  {m['reponses_ok']}/{m['requetes']}")
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(resultats, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+"""
+Banc d'essai de l'ensemble des routes : connexion, passages (entrée/sortie),
+listes des tableaux de bord et statistiques.
+
+Chaque scénario est un mélange pondéré de routes (MELANGES) rejoué par N
+clients simultanés pendant une durée fixe, pour chaque niveau de
+concurrence. Chaque client ouvre une session admin et une session agent,
+garde les tickets de ses entrées et les présente en sortie. Le rapport donne
+par route le débit (requêtes/s), les latences p50/p95/p99 et les statuts
+HTTP ; il est enregistré en JSON (commit git, date, paramètres) pour
+comparer deux révisions avec --comparer.
+
+Hors ligne (défaut) : app.py est lancée dans un processus séparé sur
+faux_oracledb (base SQLite peuplée au démarrage, procédures PL/SQL en
+Python). Les chiffres mesurent alors l'application, pas Oracle.
+
+Contre une API réelle (base de test) : --url. Les clients créés ont des
+téléphones --prefixe-telephone ('09...' par défaut), notés à chaque entrée.
+--nettoyer supprime à la fin ces clients et leurs passages, et eux seuls : il
+exige la base de test (--dsn, --user, --schema, voir charge_entree.py) et
+refuse de démarrer si des clients y ont déjà des téléphones du préfixe.
+
+Usage :
+    python benchmarks/bench_routes.py                                   # hors ligne, tous les scénarios
+    python benchmarks/bench_routes.py --scenario guichet --concurrence 1 8 32 --duree 20
+    python benchmarks/bench_routes.py --comparer benchmarks/resultats/routes-20261018-101500-fe61a70.json
+    python benchmarks/bench_routes.py --url http://localhost:5000 --admin ADMIN1:'Admin#2025' --nettoyer \
+        --dsn localhost/TESTPDB --user parking_test --schema PARKING_TEST
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict, deque
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from charge_entree import ajouter_arguments_base, percentile
+
+RACINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DOSSIER_RESULTATS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultats')
+
+# Route -> (méthode, chemin, session utilisée)
+ROUTES = {
+    'login': ('POST', '/login', None),
+    'entree': ('POST', '/entree', None),
+    'sortie': ('POST', '/sortie', None),
+    'places': ('GET', '/places', None),
+    'places_disponibles': ('GET', '/places/disponibles', None),
+    'reservations': ('GET', '/reservations', None),
+    'reservations_en_cours': ('GET', '/reservations?en_cours=true', None),
+    'paiements': ('GET', '/paiements', None),
+    'clients': ('GET', '/clients', 'admin'),
+    'abonnements': ('GET', '/abonnements', None),
+    'tarifs': ('GET', '/tarifs', 'admin'),
+    'statistiques': ('GET', '/statistiques', None),
+    'admin_dashboard': ('GET', '/admin/dashboard-data', 'admin'),
+    'agent_dashboard': ('GET', '/agent/dashboard', 'agent'),
+    'agent_tickets': ('GET', '/agent/tickets', None),
+    'agent_statistiques': ('GET', '/agent/statistiques', None),
+}
+
+# Scénario -> poids relatifs des routes
+MELANGES = {
+    # Bornes d'entrée/sortie et écran de l'agent
+    'guichet': {
+        'entree': 45, 'sortie': 45, 'agent_tickets': 5, 'places_disponibles': 5,
+    },
+    # Tableaux de bord ouverts (listes et statistiques)
+    'tableaux_de_bord': {
+        'admin_dashboard': 15, 'agent_dashboard': 15, 'statistiques': 15, 'agent_statistiques': 10,
+        'clients': 8, 'reservations': 8, 'reservations_en_cours': 5, 'paiements': 8,
+        'abonnements': 5, 'places': 6, 'tarifs': 5,
+    },
+    # Journée type : passages majoritaires, tableaux de bord rafraîchis, quelques connexions
+    'mixte': {
+        'entree': 25, 'sortie': 25, 'agent_tickets': 6, 'places_disponibles': 4,
+        'admin_dashboard': 6, 'agent_dashboard': 6, 'statistiques': 8, 'agent_statistiques': 6,
+        'clients': 2, 'reservations': 3, 'paiements': 3, 'abonnements': 1, 'places': 2,
+        'tarifs': 1, 'login': 2,
+    },
+}
+
+
+# ========================================================
+# CLIENT HTTP
+# ========================================================
+class _SansRedirection(urllib.request.HTTPRedirectHandler):
+    """Une session perdue (302 vers /) est mesurée comme telle, pas suivie"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def ouvrir_session():
+    return urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _SansRedirection)
+
+
+def envoyer(session, url, methode, chemin, donnees=None):
+    """Retourne (statut HTTP ou 0 si la requête n'a pas abouti, corps JSON ou None, latence en ms)"""
+    requete = urllib.request.Request(
+        url + chemin, method=methode,
+        data=json.dumps(donnees).encode('utf-8') if donnees is not None else None,
+        headers={'Content-Type': 'application/json'})
+    debut = time.perf_counter()
+    try:
+        with session.open(requete, timeout=60) as reponse:
+            statut, corps = reponse.status, reponse.read()
+    except urllib.error.HTTPError as error:
+        statut, corps = error.code, error.read()
+    except (urllib.error.URLError, OSError):
+        statut, corps = 0, b''
+    latence = (time.perf_counter() - debut) * 1000
+    try:
+        donnees = json.loads(corps) if corps else None
+    except ValueError:
+        donnees = None
+    return statut, donnees, latence
+
+
+class Client:
+    """Client simulé : sessions admin et agent, tickets de ses entrées en cours"""
+
+    def __init__(self, url, identifiants, numero, palier, graine, prefixe, telephones):
+        self.url = url
+        self.identifiants = identifiants
+        self.numero = numero
+        self.palier = palier
+        self.prefixe = prefixe
+        self.telephones = telephones
+        self.alea = random.Random(graine)
+        self.sessions = {'admin': ouvrir_session(), 'agent': ouvrir_session(), None: ouvrir_session()}
+        self.tickets = deque()
+        self.passages = 0
+        self.mesures = []
+
+    def _corps_login(self, role):
+        utilisateur, mot_de_passe = self.identifiants[role]
+        return {'username': utilisateur, 'password': mot_de_passe, 'role': role.upper()}
+
+    def connecter(self):
+        for role in ('admin', 'agent'):
+            self.mesurer('login', *envoyer(self.sessions[role], self.url, 'POST', '/login',
+                                           self._corps_login(role)))
+
+    def mesurer(self, route, statut, corps, latence):
+        self.mesures.append((route, statut, latence))
+        return statut, corps
+
+    def telephone(self):
+        self.passages += 1
+        telephone = f'{self.prefixe}{self.palier:02d}{self.numero:03d}{self.passages:05d}'
+        self.telephones.append(telephone)
+        return telephone
+
+    def executer(self, route):
+        # Sans ticket en cours, une sortie devient une entrée
+        if route == 'sortie' and not self.tickets:
+            route = 'entree'
+        methode, chemin, role = ROUTES[route]
+        donnees = None
+        if route == 'entree':
+            donnees = {'nom': 'Bench', 'prenom': f'Client{self.numero}', 'telephone': self.telephone(),
+                       'pmr': 'O' if self.alea.random() < 0.05 else 'N'}
+        elif route == 'sortie':
+            donnees = {'id_ticket': self.tickets.popleft(), 'mode_paiement': 'Carte'}
+        elif route == 'login':
+            donnees = self._corps_login(self.alea.choice(('admin', 'agent')))
+
+        statut, corps = self.mesurer(route, *envoyer(self.sessions[role], self.url, methode, chemin, donnees))
+        if route == 'entree' and corps and corps.get('success'):
+            self.tickets.append(corps['id_ticket'])
+
+    def liberer(self):
+        """Sorties des tickets restants (non mesurées) : le palier suivant repart d'un parking vide"""
+        while self.tickets:
+            envoyer(self.sessions[None], self.url, 'POST', '/sortie',
+                    {'id_ticket': self.tickets.popleft(), 'mode_paiement': 'Carte'})
+
+
+# ========================================================
+# PALIERS ET RAPPORT
+# ========================================================
+def resumer(mesures, duree):
+    """Débit, latences et statuts d'une liste de mesures (route, statut, ms)"""
+    latences = [ms for _, _, ms in mesures]
+    statuts = defaultdict(int)
+    for _, statut, _ in mesures:
+        statuts[str(statut)] += 1
+    return {
+        'requetes': len(mesures),
+        'erreurs': sum(1 for _, statut, _ in mesures if statut == 0 or statut >= 500 or 300 <= statut < 400),
+        'statuts': dict(sorted(statuts.items())),
+        'requetes_par_s': round(len(mesures) / duree, 1),
+        'moyenne_ms': round(statistics.fmean(latences), 2),
+        'p50_ms': round(statistics.median(latences), 2),
+        'p95_ms': round(percentile(latences, 95), 2),
+        'p99_ms': round(percentile(latences, 99), 2),
+        'max_ms': round(max(latences), 2)
+    }
+
+
+def palier(url, identifiants, scenario, concurrence, duree, numero_palier, graine, prefixe, telephones):
+    """Lance `concurrence` clients sur le mélange `scenario` pendant `duree` secondes ;
+    les téléphones des entrées envoyées sont ajoutés à `telephones`"""
+    routes, poids = zip(*MELANGES[scenario].items())
+    clients = [Client(url, identifiants, i, numero_palier, graine * 1000 + i, prefixe, telephones)
+               for i in range(concurrence)]
+    # Tous les clients sont connectés avant le départ : les connexions initiales ne comptent pas
+    depart = threading.Barrier(concurrence + 1)
+
+    def travailler(client):
+        client.connecter()
+        client.mesures.clear()
+        depart.wait()
+        fin = time.perf_counter() + duree
+        while time.perf_counter() < fin:
+            client.executer(client.alea.choices(routes, poids)[0])
+
+    threads = [threading.Thread(target=travailler, args=(c,), daemon=True) for c in clients]
+    for thread in threads:
+        thread.start()
+    depart.wait()
+    debut = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duree_reelle = time.perf_counter() - debut
+
+    for client in clients:
+        client.liberer()
+
+    mesures = [m for client in clients for m in client.mesures]
+    par_route = defaultdict(list)
+    for mesure in mesures:
+        par_route[mesure[0]].append(mesure)
+    return {
+        'concurrence': concurrence,
+        'duree_s': round(duree_reelle, 2),
+        'total': resumer(mesures, duree_reelle) if mesures else None,
+        'routes': {route: resumer(m, duree_reelle) for route, m in sorted(par_route.items())}
+    }
+
+
+def version_git():
+    """(commit abrégé, arbre modifié) ou (None, None) hors dépôt git"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RACINE, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        modifie = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RACINE,
+                                      capture_output=True, text=True, check=True).stdout.strip())
+        return commit, modifie
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def afficher(resultats):
+    print(f"{'scénario':<17} {'conc.':>5} {'route':<22} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for scenario, paliers in resultats['scenarios'].items():
+        for p in paliers:
+            lignes = list(p['routes'].items()) + [('TOTAL', p['total'])]
+            for route, m in lignes:
+                if not m:
+                    continue
+                print(f"{scenario:<17} {p['concurrence']:>5} {route:<22} {m['requetes_par_s']:>8} "
+                      f"{m['p50_ms']:>8} {m['p95_ms']:>8} {m['p99_ms']:>8} {m['erreurs']:>5}")
+
+
+def comparer(resultats, reference):
+    """Écart de débit et de p99 par route avec un rapport précédent"""
+    print(f"\nComparaison avec {reference.get('commit')} ({reference.get('date')}) :")
+    print(f"{'scénario':<17} {'conc.':>5} {'route':<22} {'req/s':>16} {'p99 (ms)':>18}")
+
+    def ecart(avant, apres):
+        return f"{(apres - avant) / avant * 100:+.1f}%" if avant else 'n/a'
+
+    for scenario, paliers in resultats['scenarios'].items():
+        precedents = {p['concurrence']: p for p in reference.get('scenarios', {}).get(scenario, [])}
+        for p in paliers:
+            ancien = precedents.get(p['concurrence'])
+            if not ancien:
+                continue
+            lignes = list(p['routes'].items()) + [('TOTAL', p['total'])]
+            for route, m in lignes:
+                a = ancien['total'] if route == 'TOTAL' else ancien['routes'].get(route)
+                if not m or not a:
+                    continue
+                print(f"{scenario:<17} {p['concurrence']:>5} {route:<22} "
+                      f"{a['requetes_par_s']:>7}→{m['requetes_par_s']:<7} {ecart(a['requetes_par_s'], m['requetes_par_s']):>8} "
+                      f"{a['p99_ms']:>8}→{m['p99_ms']:<8} {ecart(a['p99_ms'], m['p99_ms']):>8}")
+
+
+# ========================================================
+# SERVEUR HORS LIGNE
+# ========================================================
+def port_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def demarrer_serveur_hors_ligne(places, clients, historique):
+    """Lance app.py sur faux_oracledb dans un processus séparé ; retourne (processus, url)"""
+    port = port_libre()
+    processus = subprocess.Popen([
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'faux_oracledb.py'),
+        '--port', str(port), '--places', str(places), '--clients', str(clients),
+        '--historique', str(historique)
+    ])
+    url = f'http://127.0.0.1:{port}'
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processus.poll() is not None:
+            raise RuntimeError(f"Le serveur hors ligne s'est arrêté (code {processus.returncode})")
+        if envoyer(ouvrir_session(), url, 'GET', '/test-connexion')[0] == 200:
+            return processus, url
+        time.sleep(0.2)
+    processus.terminate()
+    raise RuntimeError("Le serveur hors ligne n'a pas répondu dans les 60 s")
+
+
+def lire_identifiants(texte):
+    utilisateur, _, mot_de_passe = texte.partition(':')
+    return utilisateur, mot_de_passe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help="URL d'une API déjà lancée (défaut : app.py hors ligne sur faux_oracledb)")
+    parser.add_argument('--scenario', choices=sorted(MELANGES), nargs='+', default=list(MELANGES))
+    parser.add_argument('--concurrence', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duree', type=float, default=10, help='Secondes par palier')
+    parser.add_argument('--graine', type=int, default=1)
+    parser.add_argument('--admin', type=lire_identifiants, default=('ADMIN1', 'Admin#2025'),
+                        help='UTILISATEUR:MOT_DE_PASSE du compte admin')
+    parser.add_argument('--agent', type=lire_identifiants, default=('AGENT1', 'Agent@2025'),
+                        help='UTILISATEUR:MOT_DE_PASSE du compte agent')
+    parser.add_argument('--places', type=int, default=1000, help='Places de la base hors ligne')
+    parser.add_argument('--clients', type=int, default=5000, help='Clients de la base hors ligne')
+    parser.add_argument('--historique', type=int, default=20000, help='Passages payés de la base hors ligne')
+    parser.add_argument('--sortie', help='Fichier JSON du rapport (défaut : benchmarks/resultats/routes-<date>-<commit>.json)')
+    parser.add_argument('--comparer', help='Rapport JSON précédent à comparer')
+    parser.add_argument('--nettoyer', action='store_true',
+                        help='Avec --url : supprime à la fin les clients créés (base de test requise)')
+    ajouter_arguments_base(parser, requis=False)
+    args = parser.parse_args()
+
+    connection = None
+    if args.url and args.nettoyer:
+        from charge_entree import connecter_base_de_test, verifier_prefixe_libre
+        connection = connecter_base_de_test(parser, args)
+        verifier_prefixe_libre(connection.cursor(), args.schema, args.prefixe_telephone)
+
+    processus = None
+    url = args.url
+    if url is None:
+        processus, url = demarrer_serveur_hors_ligne(args.places, args.clients, args.historique)
+    identifiants = {'admin': args.admin, 'agent': args.agent}
+
+    commit, modifie = version_git()
+    maintenant = datetime.now()
+    resultats = {
+        'commit': commit,
+        'arbre_modifie': modifie,
+        'date': maintenant.isoformat(timespec='seconds'),
+        'cible': 'faux_oracledb' if processus else url,
+        'python': platform.python_version(),
+        'parametres': {
+            'duree_s': args.duree, 'concurrence': args.concurrence, 'graine': args.graine,
+            **({'places': args.places, 'clients': args.clients, 'historique': args.historique} if processus else {})
+        },
+        'melanges': {s: MELANGES[s] for s in args.scenario},
+        'scenarios': {}
+    }
+    telephones = []
+    try:
+        numero_palier = 0
+        for scenario in args.scenario:
+            resultats['scenarios'][scenario] = []
+            for concurrence in args.concurrence:
+                numero_palier += 1
+                resultats['scenarios'][scenario].append(palier(
+                    url, identifiants, scenario, concurrence, args.duree, numero_palier, args.graine,
+                    args.prefixe_telephone, telephones))
+    finally:
+        if processus:
+            processus.terminate()
+            processus.wait()
+        if connection:
+            from charge_entree import nettoyer
+            with connection:
+                nettoyer(connection.cursor(), args.schema, telephones)
+                connection.commit()
+
+    afficher(resultats)
+    sortie = args.sortie or os.path.join(
+        DOSSIER_RESULTATS, f"routes-{maintenant:%Y%m%d-%H%M%S}-{commit or 'hors-git'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, 'w', encoding='utf-8') as f:
+        json.dump(resultats, f, indent=2, ensure_ascii=False)
+    print(f"\nRapport enregistré : {sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding='utf-8') as f:
+            comparer(resultats, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Test de charge des entrées simultanées (POST /entree).
+
+Lance de nombreuses entrées en parallèle contre l'API et vérifie dans Oracle
+qu'aucune place n'a été attribuée deux fois et qu'aucune entrée n'a été
+perdue sur une collision. Les latences (p50/p95/p99) sont mesurées pour
+plusieurs tailles de table PLACE afin de vérifier qu'elles restent stables.
+
+Le test écrit dans la base : il ne s'exécute que sur un schéma de test désigné
+explicitement (--dsn, --user, --schema), sur lequel l'API (--url) doit aussi
+être lancée. La base de DB_CONFIG / TABLE_OWNER est refusée sauf
+--autoriser-base-app.
+
+Usage :
+    python benchmarks/charge_entree.py --dsn localhost/TESTPDB --user parking_test \\
+        --schema PARKING_TEST --threads 32 --entrees 500 --places 100 1000 5000
+
+Seules les lignes créées par le test sont supprimées à la fin de chaque palier :
+les places insérées (identifiants notés à l'insertion) et les clients des
+téléphones de test, avec leurs réservations, tickets et paiements. Ces
+téléphones (--prefixe-telephone) doivent être absents de la base avant le
+palier : le test refuse de démarrer sinon.
+"""
+import argparse
+import getpass
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import oracledb
+from app import DB_CONFIG, TABLE_OWNER
+
+PREFIXE_PLACE = 'LT'
+PREFIXE_TELEPHONE = '09'
+TAILLE_LISTE = 10000      # Éléments par collection liée (SYS.ODCI*LIST : 32767 max)
+
+
+# ========================================================
+# BASE DE TEST (PARTAGÉ AVEC bench_passages.py ET bench_routes.py)
+# ========================================================
+def ajouter_arguments_base(parser, requis=True):
+    """Arguments désignant la base de test (--dsn, --user, --password, --schema...)"""
+    parser.add_argument('--dsn', required=requis, help="Base de test (la même que celle de l'API testée)")
+    parser.add_argument('--user', required=requis)
+    parser.add_argument('--password', default=os.environ.get('CHARGE_PASSWORD'),
+                        help='Défaut : variable CHARGE_PASSWORD, sinon demandé')
+    parser.add_argument('--schema', required=requis, help='Schéma propriétaire des tables de test')
+    parser.add_argument('--prefixe-telephone', default=PREFIXE_TELEPHONE,
+                        help='Téléphones des clients créés (absents de la base avant le test)')
+    parser.add_argument('--autoriser-base-app', action='store_true',
+                        help='Accepte la base et le schéma de DB_CONFIG / TABLE_OWNER')
+
+
+def connecter_base_de_test(parser, args):
+    """Connexion à la base de test ; refuse la base de l'application sauf --autoriser-base-app"""
+    if not (args.dsn and args.user and args.schema):
+        parser.error("--dsn, --user et --schema sont requis pour écrire dans la base")
+    # Le schéma est un identifiant écrit dans le SQL (pas une variable de liaison)
+    if not re.fullmatch(r'[A-Za-z][A-Za-z0-9_$#]{0,127}', args.schema):
+        parser.error(f"--schema invalide: {args.schema}")
+    # CLIENT.telephone : 15 caractères, dont 10 chiffres de numérotation au plus
+    if not re.fullmatch(r'[0-9]{1,4}', args.prefixe_telephone):
+        parser.error(f"--prefixe-telephone invalide: {args.prefixe_telephone}")
+    base_app = args.dsn == DB_CONFIG['dsn'] and (
+        args.user.upper() == DB_CONFIG['user'].upper() or args.schema.upper() == TABLE_OWNER.upper())
+    if base_app and not args.autoriser_base_app:
+        parser.error("--dsn/--user/--schema désignent la base de l'application (DB_CONFIG) : "
+                     "utiliser un schéma de test, ou --autoriser-base-app")
+    password = args.password or getpass.getpass(f"Mot de passe de {args.user}: ")
+    return oracledb.connect(user=args.user, password=password, dsn=args.dsn)
+
+
+def liste(cursor, type_liste, valeurs):
+    """Collection Oracle liée en une seule variable (SYS.ODCI*LIST)"""
+    return cursor.connection.gettype(type_liste).newobject(list(valeurs))
+
+
+def par_tranches(valeurs):
+    valeurs = list(valeurs)
+    return [valeurs[i:i + TAILLE_LISTE] for i in range(0, len(valeurs), TAILLE_LISTE)]
+
+
+def telephones_de_test(prefixe, nb_entrees):
+    return [f'{prefixe}{numero:08d}' for numero in range(nb_entrees)]
+
+
+def verifier_prefixe_libre(cursor, schema, prefixe):
+    """Refuse de démarrer si un client a déjà un téléphone du préfixe de test :
+    tout client de ce préfixe trouvé après le test a alors été créé par lui"""
+    cursor.execute(f"SELECT COUNT(*) FROM {schema}.CLIENT WHERE telephone LIKE :motif",
+                   {'motif': prefixe + '%'})
+    if cursor.fetchone()[0]:
+        raise SystemExit(f"Des clients existent déjà avec des téléphones {prefixe}... : "
+                         f"choisir un autre --prefixe-telephone")
+
+
+def preparer_places(cursor, schema, nb_places):
+    """Crée nb_places places 'Standard' libres réservées au test ; retourne leurs identifiants"""
+    cursor.execute(f"SELECT {schema}.seq_place.NEXTVAL FROM DUAL CONNECT BY LEVEL <= :nb", {'nb': nb_places})
+    ids = [id_place for (id_place,) in cursor]
+    cursor.executemany(
+        f"INSERT INTO {schema}.PLACE (id_place, numero_place, disponible, type_place) "
+        f"VALUES (:1, :2, 'O', 'Standard')",
+        [(id_place, f'{PREFIXE_PLACE}{id_place}') for id_place in ids]
+    )
+    return ids
+
+
+def nettoyer(cursor, schema, telephones, places=()):
+    """Supprime les clients des téléphones de test (et leurs passages) et les places créées"""
+    for tranche in par_tranches(telephones):
+        _nettoyer_clients(cursor, schema, tranche)
+    for tranche in par_tranches(places):
+        cursor.execute(
+            f"DELETE FROM {schema}.PLACE WHERE id_place IN (SELECT column_value FROM TABLE(:places))",
+            {'places': liste(cursor, 'SYS.ODCINUMBERLIST', tranche)}
+        )
+
+
+def _nettoyer_clients(cursor, schema, telephones):
+    params = {'telephones': liste(cursor, 'SYS.ODCIVARCHAR2LIST', telephones)}
+    filtre_clients = (f"SELECT id_client FROM {schema}.CLIENT "
+                      f"WHERE telephone IN (SELECT column_value FROM TABLE(:telephones))")
+    filtre_res = f"SELECT id_reservation FROM {schema}.RESERVATION WHERE id_client IN ({filtre_clients})"
+    # Les places hors test occupées par les entrées du test sont rendues libres
+    cursor.execute(f"""
+        UPDATE {schema}.PLACE SET disponible = 'O'
+        WHERE id_place IN (SELECT id_place FROM {schema}.RESERVATION
+                           WHERE id_client IN ({filtre_clients}) AND date_sortie IS NULL)
+    """, params)
+    cursor.execute(f"DELETE FROM {schema}.PAIEMENT WHERE id_reservation IN ({filtre_res})", params)
+    cursor.execute(f"DELETE FROM {schema}.TICKET WHERE id_reservation IN ({filtre_res})", params)
+    cursor.execute(f"DELETE FROM {schema}.RESERVATION WHERE id_client IN ({filtre_clients})", params)
+    cursor.execute(f"DELETE FROM {schema}.CLIENT WHERE id_client IN ({filtre_clients})", params)
+
+
+def verifier(cursor, schema, telephones):
+    """Retourne (entrées enregistrées, places attribuées plusieurs fois)"""
+    cursor.execute(f"""
+        SELECT COUNT(*), COUNT(*) - COUNT(DISTINCT r.id_place)
+        FROM {schema}.RESERVATION r
+        JOIN {schema}.CLIENT c ON r.id_client = c.id_client
+        WHERE c.telephone IN (SELECT column_value FROM TABLE(:telephones))
+          AND r.date_sortie IS NULL
+    """, {'telephones': liste(cursor, 'SYS.ODCIVARCHAR2LIST', telephones)})
+    return cursor.fetchone()
+
+
+def envoyer_entree(url, numero, telephone):
+    corps = json.dumps({
+        'nom': 'Charge',
+        'prenom': f'Test{numero}',
+        'telephone': telephone,
+        'pmr': 'N'
+    }).encode('utf-8')
+    requete = urllib.request.Request(url + '/entree', data=corps, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    debut = time.perf_counter()
+    try:
+        with urllib.request.urlopen(requete, timeout=30) as reponse:
+            ok = 200 <= reponse.status < 300
+    except Exception:
+        ok = False
+    return ok, (time.perf_counter() - debut) * 1000
+
+
+def percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(round(p / 100 * (len(valeurs) - 1))))]
+
+
+def palier(url, connection, schema, prefixe, nb_places, nb_entrees, nb_threads):
+    # Les places existantes hors test sont laissées telles quelles : on ne
+    # lance pas plus d'entrées que de places créées pour le test
+    nb_entrees = min(nb_entrees, nb_places)
+    telephones = telephones_de_test(prefixe, nb_entrees)
+    cursor = connection.cursor()
+    verifier_prefixe_libre(cursor, schema, prefixe)
+    places = preparer_places(cursor, schema, nb_places)
+    connection.commit()
+
+    try:
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=nb_threads) as executor:
+            resultats = list(executor.map(lambda n: envoyer_entree(url, n, telephones[n]), range(nb_entrees)))
+        duree = time.perf_counter() - debut
+        enregistrees, doublons = verifier(cursor, schema, telephones)
+    finally:
+        nettoyer(cursor, schema, telephones, places)
+        connection.commit()
+        cursor.close()
+
+    latences = [ms for _, ms in resultats]
+    return {
+        'places': nb_places,
+        'entrees_envoyees': nb_entrees,
+        'reponses_ok': sum(1 for ok, _ in resultats if ok),
+        'entrees_enregistrees': enregistrees,
+        'entrees_perdues': nb_entrees - enregistrees,
+        'places_en_double': doublons,
+        'requetes_par_s': round(nb_entrees / duree, 1),
+        'p50_ms': round(statistics.median(latences), 1),
+        'p95_ms': round(percentile(latences, 95), 1),
+        'p99_ms': round(percentile(latences, 99), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000')
+    ajouter_arguments_base(parser)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--entrees', type=int, default=500)
+    parser.add_argument('--places', type=int, nargs='+', default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    connection = connecter_base_de_test(parser, args)
+    try:
+        rapports = [palier(args.url, connection, args.schema, args.prefixe_telephone, n, args.entrees, args.threads)
+                    for n in args.places]
+    finally:
+        connection.close()
+
+    print(json.dumps(rapports, indent=2))
+    collisions = sum(r['entrees_perdues'] + r['places_en_double'] for r in rapports)
+    print(f"Collisions: {collisions}")
+    sys.exit(1 if collisions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,971 @@
+"""
+Faux module `oracledb` adossé à SQLite, pour les bancs d'essai hors ligne.
+
+Installé avant l'import de app.py, il remplace python-oracledb : le pool, les
+sessions et les curseurs exécutent les requêtes de l'application sur une base
+SQLite (fichier temporaire en mode WAL) et les procédures et fonctions
+PL/SQL du schéma (ajouter_entree, valider_sortie, s_abonner, Ajouter_client,
+mettre_a_jour_tarifs, les fonctions de statistiques) sont réécrites en Python
+avec les mêmes codes d'erreur (ORA-20001, ORA-01403...). Les triggers de
+parking_schema.sql sont des triggers SQLite.
+
+Les mesures obtenues portent sur le coût de l'application (Flask, pool,
+conversion des lignes, caches, JSON) et non sur celui d'Oracle : SQLite
+sérialise les écritures là où Oracle verrouille des lignes.
+
+Usage :
+    python benchmarks/faux_oracledb.py --port 5000 --places 500   # app.py servie hors ligne
+
+    import faux_oracledb
+    faux_oracledb.installer(places=500, clients=2000, historique=5000)
+    import app    # app.oracledb est ce module
+
+Non pris en charge (DatabaseError explicite) : pool asynchrone, types objet
+(gettype), blocs PL/SQL autres que les blocs de passage groupé, vues du
+dictionnaire autres que USER_ROLE_PRIVS, tables des migrations (PAIEMENT_DAILY,
+OCCUPATION_HISTORIQUE, PASSAGE_JOURNAL) sauf VERSION_DONNEES.
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# ========================================================
+# TYPES, CONSTANTES ET EXCEPTIONS (API python-oracledb)
+# ========================================================
+class _TypeBase:
+    def __init__(self, nom):
+        self.name = nom
+
+    def __repr__(self):
+        return f'<DbType {self.name}>'
+
+DB_TYPE_DATE = _TypeBase('DB_TYPE_DATE')
+DB_TYPE_NUMBER = _TypeBase('DB_TYPE_NUMBER')
+DB_TYPE_TIMESTAMP = _TypeBase('DB_TYPE_TIMESTAMP')
+DB_TYPE_TIMESTAMP_TZ = _TypeBase('DB_TYPE_TIMESTAMP_TZ')
+DB_TYPE_TIMESTAMP_LTZ = _TypeBase('DB_TYPE_TIMESTAMP_LTZ')
+DB_TYPE_VARCHAR = _TypeBase('DB_TYPE_VARCHAR')
+NUMBER = DB_TYPE_NUMBER
+STRING = DB_TYPE_VARCHAR
+DATETIME = DB_TYPE_DATE
+
+POOL_GETMODE_WAIT = 0
+POOL_GETMODE_NOWAIT = 1
+POOL_GETMODE_FORCEGET = 2
+POOL_GETMODE_TIMEDWAIT = 3
+
+
+class _Defaults:
+    fetch_decimals = False
+    arraysize = 100
+    prefetchrows = 2
+
+defaults = _Defaults()
+
+
+class _Erreur:
+    """Objet d'erreur porté par error.args[0] (code, message, full_code)"""
+
+    def __init__(self, code, message, offset=0):
+        self.code = code
+        self.message = message
+        self.full_code = f'ORA-{code:05d}'
+        self.offset = offset
+
+    def __str__(self):
+        return self.message
+
+
+class Error(Exception):
+    pass
+
+class DatabaseError(Error):
+    pass
+
+class IntegrityError(DatabaseError):
+    pass
+
+class OperationalError(DatabaseError):
+    pass
+
+class NotSupportedError(DatabaseError):
+    pass
+
+class InterfaceError(Error):
+    pass
+
+
+def _erreur(classe, code, texte):
+    return classe(_Erreur(code, f'ORA-{code:05d}: {texte}'))
+
+def _non_pris_en_charge(quoi):
+    return _erreur(NotSupportedError, 3001, f'{quoi} non pris en charge par faux_oracledb')
+
+
+class _ErreurApplication(Exception):
+    """RAISE_APPLICATION_ERROR / NO_DATA_FOUND levés par une procédure"""
+
+    def __init__(self, code, texte):
+        super().__init__(texte)
+        self.code = code
+        self.texte = texte
+
+_AUCUNE_DONNEE = (1403, 'no data found')
+_RAISE_ORA = re.compile(r'ORA-(\d{5}): ?(.*)', re.S)
+
+def _traduire(error):
+    """Exception SQLite ou applicative -> exception oracledb équivalente"""
+    if isinstance(error, Error):
+        return error
+    if isinstance(error, _ErreurApplication):
+        return _erreur(DatabaseError, error.code, error.texte)
+    message = str(error)
+    trouve = _RAISE_ORA.match(message)
+    if trouve:
+        return _erreur(DatabaseError, int(trouve.group(1)), trouve.group(2))
+    if isinstance(error, sqlite3.IntegrityError):
+        if 'UNIQUE' in message:
+            return _erreur(IntegrityError, 1, f'unique constraint violated ({message})')
+        if 'CHECK' in message:
+            return _erreur(IntegrityError, 2290, f'check constraint violated ({message})')
+        if 'FOREIGN KEY' in message:
+            return _erreur(IntegrityError, 2291, f'integrity constraint violated ({message})')
+        if 'NOT NULL' in message:
+            return _erreur(IntegrityError, 1400, f'cannot insert NULL ({message})')
+        return _erreur(IntegrityError, 2290, message)
+    if 'locked' in message or 'busy' in message:
+        return _erreur(DatabaseError, 54, f'resource busy ({message})')
+    return _erreur(DatabaseError, 900, f'{message}')
+
+# ========================================================
+# BASE SQLITE
+# ========================================================
+_BASE = {'chemin': None}
+
+# Utilisateurs applicatifs (parking_schema.sql) : mot de passe et rôles
+UTILISATEURS = {
+    'ADMIN1': ('Admin#2025', ('R_ADMIN',)),
+    'AGENT1': ('Agent@2025', ('R_AGENT',)),
+    'AGENT2': ('Agent@@2025', ('R_AGENT',)),
+}
+
+# Schémas propriétaires retirés des noms qualifiés (SYSTEM.CLIENT -> CLIENT)
+PROPRIETAIRES = ('SYSTEM', 'PARKING')
+
+SCHEMA = """
+CREATE TABLE CLIENT (
+    id_client INTEGER PRIMARY KEY,
+    nom TEXT NOT NULL,
+    prenom TEXT NOT NULL,
+    telephone TEXT UNIQUE,
+    pmr TEXT DEFAULT 'O' CHECK (pmr IN ('O', 'N'))
+);
+CREATE TABLE TARIF (
+    id_tarif INTEGER PRIMARY KEY,
+    type_client TEXT NOT NULL UNIQUE CHECK (type_client IN ('Abonne', 'Non_Abonne')),
+    tarif_horaire REAL NOT NULL
+);
+CREATE TABLE ABONNEMENT (
+    id_abonne INTEGER PRIMARY KEY,
+    id_client INTEGER NOT NULL REFERENCES CLIENT(id_client),
+    date_inscription DATE NOT NULL,
+    date_expiration DATE,
+    statut TEXT DEFAULT 'Actif' CHECK (statut IN ('Actif', 'Suspendu', 'Expire'))
+);
+CREATE TABLE PLACE (
+    id_place INTEGER PRIMARY KEY,
+    numero_place TEXT UNIQUE,
+    disponible TEXT DEFAULT 'O' CHECK (disponible IN ('O', 'N')),
+    type_place TEXT CHECK (type_place IN ('Standard', 'VIP', 'Handicape'))
+);
+CREATE TABLE RESERVATION (
+    id_reservation INTEGER PRIMARY KEY,
+    id_client INTEGER NOT NULL REFERENCES CLIENT(id_client) ON DELETE CASCADE,
+    id_place INTEGER NOT NULL REFERENCES PLACE(id_place),
+    id_tarif INTEGER REFERENCES TARIF(id_tarif),
+    date_entree DATE NOT NULL,
+    date_sortie DATE,
+    statut TEXT DEFAULT 'En attente'
+        CHECK (statut IN ('En attente', 'Confirmee', 'Annulee', 'Terminee')),
+    montant_total REAL
+);
+CREATE TABLE TICKET (
+    id_ticket INTEGER PRIMARY KEY,
+    id_reservation INTEGER NOT NULL REFERENCES RESERVATION(id_reservation),
+    date_emission DATE
+);
+CREATE TABLE PAIEMENT (
+    id_paiement INTEGER PRIMARY KEY,
+    id_reservation INTEGER NOT NULL REFERENCES RESERVATION(id_reservation),
+    date_paiement DATE NOT NULL,
+    montant REAL NOT NULL,
+    mode_paiement TEXT CHECK (mode_paiement IN ('Especes', 'Carte', 'En ligne')),
+    statut TEXT DEFAULT 'Effectue' CHECK (statut IN ('Effectue', 'Annule', 'En attente'))
+);
+CREATE TABLE SEQUENCES (nom TEXT PRIMARY KEY, valeur INTEGER NOT NULL);
+
+CREATE INDEX idx_client_nom ON CLIENT(nom, prenom, id_client);
+CREATE INDEX idx_res_client ON RESERVATION(id_client);
+CREATE INDEX idx_res_place ON RESERVATION(id_place);
+CREATE INDEX idx_res_entree ON RESERVATION(date_entree, id_reservation);
+CREATE INDEX idx_res_sortie ON RESERVATION(date_sortie);
+CREATE INDEX idx_ticket_res ON TICKET(id_reservation);
+CREATE INDEX idx_place_type_dispo ON PLACE(type_place, disponible);
+CREATE INDEX idx_paiement_date ON PAIEMENT(date_paiement, id_paiement);
+CREATE INDEX idx_paiement_res ON PAIEMENT(id_reservation);
+CREATE INDEX idx_paiement_statut ON PAIEMENT(statut);
+CREATE INDEX idx_abonnement_client ON ABONNEMENT(id_client, statut);
+CREATE INDEX idx_abonnement_date ON ABONNEMENT(date_inscription, id_abonne);
+
+CREATE TRIGGER verifier_place_libre BEFORE INSERT ON RESERVATION
+WHEN (SELECT disponible FROM PLACE WHERE id_place = NEW.id_place) = 'N'
+BEGIN
+    SELECT RAISE(ABORT, 'ORA-20010: Erreur : la place est déjà occupée.');
+END;
+CREATE TRIGGER reserver_place AFTER INSERT ON RESERVATION
+BEGIN
+    UPDATE PLACE SET disponible = 'N' WHERE id_place = NEW.id_place;
+END;
+CREATE TRIGGER liberer_place AFTER UPDATE OF date_sortie ON RESERVATION
+WHEN NEW.date_sortie IS NOT NULL
+BEGIN
+    UPDATE PLACE SET disponible = 'O' WHERE id_place = NEW.id_place;
+END;
+CREATE TRIGGER verifier_abonnement_actif BEFORE INSERT ON ABONNEMENT
+WHEN EXISTS (SELECT 1 FROM ABONNEMENT WHERE id_client = NEW.id_client AND statut = 'Actif')
+BEGIN
+    SELECT RAISE(ABORT, 'ORA-20020: Erreur : le client a déjà une abonnement actif.');
+END;
+"""
+
+# Versions des tables (migration 7) : SQLite n'a que des triggers de ligne
+TABLES_VERSIONNEES = ('ABONNEMENT', 'CLIENT', 'PAIEMENT', 'PLACE', 'RESERVATION', 'TARIF', 'TICKET')
+SCHEMA += "CREATE TABLE VERSION_DONNEES (nom_table TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0);\n"
+SCHEMA += "".join(f"INSERT INTO VERSION_DONNEES (nom_table) VALUES ('{table}');\n" for table in TABLES_VERSIONNEES)
+SCHEMA += "".join(f"""CREATE TRIGGER version_{table.lower()}_{operation.lower()} AFTER {operation} ON {table}
+BEGIN
+    UPDATE VERSION_DONNEES SET version = version + 1 WHERE nom_table = '{table}';
+END;
+""" for table in TABLES_VERSIONNEES for operation in ('INSERT', 'UPDATE', 'DELETE'))
+
+SEQUENCES = {
+    'seq_client': ('CLIENT', 'id_client'),
+    'seq_abonnement': ('ABONNEMENT', 'id_abonne'),
+    'seq_tarif': ('TARIF', 'id_tarif'),
+    'seq_place': ('PLACE', 'id_place'),
+    'seq_reservation': ('RESERVATION', 'id_reservation'),
+    'seq_ticket': ('TICKET', 'id_ticket'),
+    'seq_paiement': ('PAIEMENT', 'id_paiement'),
+}
+
+_FORMAT_DATE = '%Y-%m-%d %H:%M:%S'
+
+def _date_sqlite(valeur):
+    return valeur.strftime(_FORMAT_DATE)
+
+def _lire_date(octets):
+    texte = octets.decode()
+    return datetime.strptime(texte[:19], _FORMAT_DATE) if len(texte) > 10 else datetime.strptime(texte, '%Y-%m-%d')
+
+sqlite3.register_adapter(datetime, _date_sqlite)
+sqlite3.register_adapter(date, lambda d: d.strftime('%Y-%m-%d'))
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_converter('DATE', _lire_date)
+
+
+def _ouvrir():
+    connexion = sqlite3.connect(_BASE['chemin'], timeout=30, isolation_level=None,
+                                check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+    connexion.execute('PRAGMA foreign_keys = ON')
+    connexion.execute('PRAGMA synchronous = NORMAL')
+    return connexion
+
+
+def _maintenant():
+    return datetime.now().replace(microsecond=0)
+
+
+def creer_base(chemin, places=200, clients=1000, historique=2000, graine=42):
+    """Crée et peuple la base : places (80 % Standard, 10 % VIP, 10 % Handicape),
+    tarifs, clients (30 % abonnés) et `historique` passages terminés et payés
+    répartis sur les 90 derniers jours"""
+    alea = random.Random(graine)
+    if os.path.exists(chemin):
+        os.remove(chemin)
+    _BASE['chemin'] = chemin
+    connexion = _ouvrir()
+    connexion.execute('PRAGMA journal_mode = WAL')
+    connexion.executescript(SCHEMA)
+    maintenant = _maintenant()
+
+    connexion.execute('BEGIN')
+    connexion.executemany("INSERT INTO TARIF VALUES (?, ?, ?)",
+                          [(1, 'Abonne', 5.0), (2, 'Non_Abonne', 10.0)])
+    types = ['Standard'] * 8 + ['VIP', 'Handicape']
+    prefixes = {'Standard': 'A', 'VIP': 'V', 'Handicape': 'C'}
+    connexion.executemany("INSERT INTO PLACE VALUES (?, ?, 'O', ?)", [
+        (i, f'{prefixes[types[i % 10]]}{i}', types[i % 10]) for i in range(1, places + 1)
+    ])
+    connexion.executemany("INSERT INTO CLIENT VALUES (?, ?, ?, ?, ?)", [
+        (i, f'Nom{i % 500}', f'Prenom{i}', f'06{i:08d}', 'O' if i % 10 == 0 else 'N')
+        for i in range(1, clients + 1)
+    ])
+    abonnes = [i for i in range(1, clients + 1) if i % 10 < 3]
+    connexion.executemany("INSERT INTO ABONNEMENT VALUES (?, ?, ?, ?, 'Actif')", [
+        (n, i, maintenant - timedelta(days=alea.randint(0, 29)), maintenant + timedelta(days=alea.randint(1, 30)))
+        for n, i in enumerate(abonnes, start=1)
+    ])
+
+    reservations, tickets, paiements = [], [], []
+    for n in range(1, historique + 1):
+        entree = maintenant - timedelta(days=alea.uniform(0, 90))
+        if entree > maintenant - timedelta(hours=12):
+            entree -= timedelta(hours=12)
+        sortie = entree + timedelta(hours=alea.uniform(0.2, 10))
+        client = alea.randint(1, clients)
+        id_tarif = 1 if client in abonnes else 2
+        montant = math.ceil((sortie - entree).total_seconds() / 3600) * (5.0 if id_tarif == 1 else 10.0)
+        reservations.append((n, client, alea.randint(1, places), id_tarif, entree, sortie, 'Terminee', montant))
+        tickets.append((n, n, entree))
+        paiements.append((n, n, sortie, montant, alea.choice(('Especes', 'Carte', 'En ligne')), 'Effectue'))
+    # Insertion directe : les triggers ne doivent pas occuper les places de l'historique
+    connexion.execute('DROP TRIGGER reserver_place')
+    connexion.executemany("INSERT INTO RESERVATION VALUES (?, ?, ?, ?, ?, ?, ?, ?)", reservations)
+    connexion.executemany("INSERT INTO TICKET VALUES (?, ?, ?)", tickets)
+    connexion.executemany("INSERT INTO PAIEMENT VALUES (?, ?, ?, ?, ?, ?)", paiements)
+    connexion.executemany("INSERT INTO SEQUENCES VALUES (?, ?)", [
+        (nom, connexion.execute(f"SELECT IFNULL(MAX({colonne}), 0) FROM {table}").fetchone()[0])
+        for nom, (table, colonne) in SEQUENCES.items()
+    ])
+    connexion.execute('COMMIT')
+    connexion.executescript(SCHEMA[SCHEMA.index('CREATE TRIGGER reserver_place'):
+                                   SCHEMA.index('CREATE TRIGGER liberer_place')])
+    connexion.execute('ANALYZE')
+    connexion.close()
+    return chemin
+
+
+def installer(chemin=None, **peuplement):
+    """Crée la base et remplace `oracledb` dans sys.modules ; retourne le chemin de la base"""
+    if chemin is None:
+        chemin = os.path.join(tempfile.mkdtemp(prefix='faux_oracledb_'), 'parking.db')
+    creer_base(chemin, **peuplement)
+    sys.modules['oracledb'] = sys.modules[__name__]
+    return chemin
+
+# ========================================================
+# TRADUCTION DU SQL ORACLE
+# ========================================================
+_PROPRIETAIRE = re.compile(r'\b(?:' + '|'.join(PROPRIETAIRES) + r')\.(?=[A-Za-z_])', re.I)
+_FETCH_FIRST = re.compile(r'\bFETCH\s+FIRST\s+(:\w+|\d+)\s+ROWS\s+ONLY', re.I)
+_TRUNC_SYSDATE_PLUS = re.compile(r'TRUNC\s*\(\s*SYSDATE\s*\)\s*\+\s*(\d+)', re.I)
+_TRUNC_SYSDATE = re.compile(r'TRUNC\s*\(\s*SYSDATE\s*\)', re.I)
+_SYSDATE = re.compile(r'\bSYSDATE\b', re.I)
+_NVL = re.compile(r'\bNVL\s*\(', re.I)
+_DUAL = re.compile(r'\bFROM\s+DUAL\b', re.I)
+_POSITIONNEL = re.compile(r'(?<![:\w]):(\d+)\b')
+_NEXTVAL = re.compile(r'\b(seq_\w+)\.NEXTVAL\b', re.I)
+_ECRITURE = re.compile(r'^\s*(INSERT|UPDATE|DELETE|MERGE)\b', re.I)
+_BLOC = re.compile(r'^\s*(BEGIN|DECLARE)\b', re.I)
+_ROLES = re.compile(r'\bUSER_ROLE_PRIVS\b', re.I)
+
+_cache_traduction = {}
+
+def traduire_sql(sql):
+    """Réécrit une requête Oracle de l'application en SQL SQLite"""
+    traduit = _cache_traduction.get(sql)
+    if traduit is None:
+        if _NEXTVAL.search(sql):
+            raise _non_pris_en_charge('seq.NEXTVAL dans une requête')
+        traduit = _PROPRIETAIRE.sub('', sql)
+        traduit = _FETCH_FIRST.sub(r'LIMIT \1', traduit)
+        traduit = _TRUNC_SYSDATE_PLUS.sub(r"date('now', 'localtime', '+\1 day')", traduit)
+        traduit = _TRUNC_SYSDATE.sub("date('now', 'localtime')", traduit)
+        traduit = _SYSDATE.sub("datetime('now', 'localtime')", traduit)
+        traduit = _NVL.sub('IFNULL(', traduit)
+        traduit = _DUAL.sub('', traduit)
+        traduit = _POSITIONNEL.sub(r'?\1', traduit)
+        _cache_traduction[sql] = traduit
+    return traduit
+
+
+def _type_colonne(valeurs):
+    for valeur in valeurs:
+        if valeur is None:
+            continue
+        if isinstance(valeur, datetime):
+            return DB_TYPE_DATE
+        if isinstance(valeur, (int, float, Decimal)):
+            return DB_TYPE_NUMBER
+        return DB_TYPE_VARCHAR
+    return DB_TYPE_VARCHAR
+
+FetchInfo = namedtuple('FetchInfo', ['name', 'type_code', 'display_size', 'internal_size',
+                                     'precision', 'scale', 'null_ok'])
+
+# ========================================================
+# PROCÉDURES ET FONCTIONS PL/SQL (parking_schema.sql)
+# ========================================================
+def _un(db, sql, params=()):
+    ligne = db.execute(sql, params).fetchone()
+    if ligne is None:
+        raise _ErreurApplication(*_AUCUNE_DONNEE)
+    return ligne[0] if len(ligne) == 1 else ligne
+
+def _nextval(db, sequence):
+    db.execute("UPDATE SEQUENCES SET valeur = valeur + 1 WHERE nom = ?", (sequence,))
+    return _un(db, "SELECT valeur FROM SEQUENCES WHERE nom = ?", (sequence,))
+
+def ajouter_client(db, nom, prenom, telephone, pmr):
+    ligne = db.execute("SELECT id_client FROM CLIENT WHERE telephone = ?", (telephone,)).fetchone()
+    if ligne:
+        return ligne[0]
+    db.execute("SAVEPOINT ajouter_client")
+    try:
+        id_client = _nextval(db, 'seq_client')
+        db.execute("INSERT INTO CLIENT (id_client, nom, prenom, telephone, pmr) VALUES (?, ?, ?, ?, ?)",
+                   (id_client, nom, prenom, telephone, pmr))
+    except sqlite3.Error:
+        db.execute("ROLLBACK TO ajouter_client")
+        return -1
+    finally:
+        db.execute("RELEASE ajouter_client")
+    return id_client
+
+def verifier_abonnement(db, id_client):
+    ligne = db.execute("SELECT date_expiration FROM ABONNEMENT WHERE id_client = ? AND statut = 'Actif'",
+                       (id_client,)).fetchone()
+    if ligne is None:
+        return False
+    if ligne[0] <= _maintenant():
+        db.execute("UPDATE ABONNEMENT SET statut = 'Expire' WHERE id_client = ? AND statut = 'Actif'",
+                   (id_client,))
+        return False
+    return True
+
+def chercher_place_libre(db, pmr):
+    type_place = {'O': 'Handicape', 'N': 'Standard'}.get(pmr)
+    if type_place is None:
+        return None
+    ligne = db.execute("SELECT id_place FROM PLACE WHERE type_place = ? AND disponible = 'O' LIMIT 1",
+                       (type_place,)).fetchone()
+    return ligne[0] if ligne else None
+
+def type_client_tarif(db, id_client):
+    return 'Abonne' if verifier_abonnement(db, id_client) else 'Non_Abonne'
+
+def tarif_par_type(db, type_client):
+    return _un(db, "SELECT tarif_horaire FROM TARIF WHERE type_client = ?", (type_client,))
+
+def id_tarif_par_type(db, type_client):
+    return _un(db, "SELECT id_tarif FROM TARIF WHERE type_client = ?", (type_client,))
+
+def ajouter_entree(db, nom, prenom, telephone, pmr):
+    ligne = db.execute("SELECT id_client FROM CLIENT WHERE telephone = ?", (telephone,)).fetchone()
+    if ligne:
+        id_client = ligne[0]
+        verifier_abonnement(db, id_client)
+    else:
+        id_client = ajouter_client(db, nom, prenom, telephone, pmr)
+
+    id_place = chercher_place_libre(db, pmr)
+    if id_place is None:
+        raise _ErreurApplication(20001, 'Aucune place disponible !')
+    numero_place = _un(db, "SELECT numero_place FROM PLACE WHERE id_place = ?", (id_place,))
+
+    type_client = type_client_tarif(db, id_client)
+    tarif = tarif_par_type(db, type_client)
+    id_tarif = id_tarif_par_type(db, type_client)
+    maintenant = _maintenant()
+
+    id_reservation = _nextval(db, 'seq_reservation')
+    db.execute("""
+        INSERT INTO RESERVATION (id_reservation, id_client, id_place, id_tarif, date_entree,
+                                 date_sortie, statut, montant_total)
+        VALUES (?, ?, ?, ?, ?, NULL, 'Confirmee', NULL)
+    """, (id_reservation, id_client, id_place, id_tarif, maintenant))
+    id_ticket = _nextval(db, 'seq_ticket')
+    db.execute("INSERT INTO TICKET (id_ticket, id_reservation, date_emission) VALUES (?, ?, ?)",
+               (id_ticket, id_reservation, maintenant))
+    return id_ticket, id_reservation, numero_place, tarif
+
+def valider_sortie(db, id_ticket, mode_paiement):
+    id_reservation = _un(db, "SELECT id_reservation FROM TICKET WHERE id_ticket = ?", (id_ticket,))
+    if _un(db, "SELECT COUNT(*) FROM PAIEMENT WHERE id_reservation = ?", (id_reservation,)) > 0:
+        raise _ErreurApplication(20001, 'Paiement déjà effectué pour ce ticket.')
+    date_entree, id_client = _un(db, "SELECT date_entree, id_client FROM RESERVATION WHERE id_reservation = ?",
+                                 (id_reservation,))
+    tarif = tarif_par_type(db, type_client_tarif(db, id_client))
+    maintenant = _maintenant()
+    duree = (maintenant - date_entree).total_seconds() / 3600
+    montant = math.ceil(duree) * tarif
+
+    id_paiement = _nextval(db, 'seq_paiement')
+    db.execute("""
+        INSERT INTO PAIEMENT (id_paiement, id_reservation, date_paiement, montant, mode_paiement, statut)
+        VALUES (?, ?, ?, ?, ?, 'Effectue')
+    """, (id_paiement, id_reservation, maintenant, montant, mode_paiement))
+    db.execute("""
+        UPDATE RESERVATION SET date_sortie = ?, statut = 'Terminee', montant_total = ?
+        WHERE id_reservation = ?
+    """, (maintenant, montant, id_reservation))
+    return montant, duree, id_paiement
+
+def s_abonner(db, nom, prenom, telephone, pmr):
+    # La procédure absorbe ses erreurs (ROLLBACK sans RAISE)
+    try:
+        id_client = ajouter_client(db, nom, prenom, telephone, pmr)
+        if id_client >= 0:
+            maintenant = _maintenant()
+            db.execute("""
+                INSERT INTO ABONNEMENT (id_abonne, id_client, date_inscription, date_expiration, statut)
+                VALUES (?, ?, ?, ?, 'Actif')
+            """, (_nextval(db, 'seq_abonnement'), id_client, maintenant, maintenant + timedelta(days=30)))
+    except sqlite3.Error:
+        db.execute("ROLLBACK")
+        db.execute("BEGIN IMMEDIATE")
+    return ()
+
+def mettre_a_jour_tarifs(db, tarif_abonne, tarif_non_abonne):
+    if tarif_abonne <= 0 or tarif_non_abonne <= 0:
+        raise _ErreurApplication(20030, 'Les tarifs doivent être positifs.')
+    db.execute("UPDATE TARIF SET tarif_horaire = ? WHERE type_client = 'Abonne'", (tarif_abonne,))
+    db.execute("UPDATE TARIF SET tarif_horaire = ? WHERE type_client = 'Non_Abonne'", (tarif_non_abonne,))
+    return ()
+
+def _taux(db, disponible):
+    total = _un(db, "SELECT COUNT(*) FROM PLACE")
+    return _un(db, "SELECT COUNT(*) FROM PLACE WHERE disponible = ?", (disponible,)) / total * 100
+
+# Procédures : exécutées dans leur propre transaction, validée (COMMIT) ou
+# annulée (ROLLBACK puis RAISE) comme dans le schéma
+PROCEDURES = {
+    'ajouter_entree': ajouter_entree,
+    'valider_sortie': valider_sortie,
+    's_abonner': s_abonner,
+    'mettre_a_jour_tarifs': mettre_a_jour_tarifs,
+}
+
+# Fonctions : la transaction reste à la charge de l'appelant
+FONCTIONS = {
+    'ajouter_client': ajouter_client,
+    'verifier_abonnement': verifier_abonnement,
+    'chercher_place_libre': chercher_place_libre,
+    'type_client_tarif': type_client_tarif,
+    'tarif_par_type': tarif_par_type,
+    'id_tarif_par_type': id_tarif_par_type,
+    'total_clients': lambda db: _un(db, "SELECT COUNT(*) FROM CLIENT"),
+    'total_abonnes': lambda db: _un(db, "SELECT COUNT(*) FROM ABONNEMENT WHERE statut = 'Actif'"),
+    'taux_d_occup_places': lambda db: _taux(db, 'N'),
+    'taux_places_libres': lambda db: _taux(db, 'O'),
+    'revenu_d_jour': lambda db: _un(db, """
+        SELECT IFNULL(SUM(montant), 0) FROM PAIEMENT
+        WHERE date_paiement >= date('now', 'localtime') AND date_paiement < date('now', 'localtime', '+1 day')
+    """),
+    'nbr_paiement_valide': lambda db: _un(db, "SELECT COUNT(*) FROM PAIEMENT WHERE statut = 'Effectue'"),
+}
+FONCTIONS_ECRITURE = ('ajouter_client', 'verifier_abonnement', 'type_client_tarif')
+
+def _nom_sous_programme(nom):
+    return nom.rsplit('.', 1)[-1].lower()
+
+# Bloc d'un passage groupé : BEGIN proc(:a, ...); EXCEPTION WHEN OTHERS THEN :erreur := SQLERRM; END;
+_BLOC_LOT = re.compile(
+    r'^\s*BEGIN\s+([\w.]+)\s*\(([^)]*)\)\s*;\s*EXCEPTION\s+WHEN\s+OTHERS\s+THEN\s+'
+    r':(\w+)\s*:=\s*SQLERRM\s*;\s*END\s*;\s*$', re.I | re.S)
+
+# ========================================================
+# VARIABLES, CURSEURS, SESSIONS
+# ========================================================
+class Var:
+    """Variable de liaison (cursor.var) : une valeur par ligne de executemany"""
+
+    def __init__(self, type_=None, arraysize=1):
+        self.type = type_
+        self.values = [None] * max(arraysize or 1, 1)
+
+    def getvalue(self, pos=0):
+        return self.values[pos]
+
+    def setvalue(self, pos, valeur):
+        if pos >= len(self.values):
+            self.values.extend([None] * (pos + 1 - len(self.values)))
+        self.values[pos] = valeur
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = defaults.arraysize
+        self.prefetchrows = defaults.prefetchrows
+        self.rowfactory = None
+        self.description = None
+        self.rowcount = -1
+        self._lignes = []
+        self._position = 0
+        self._tailles = {}
+        self._erreurs_lot = []
+
+    # -- exécution ------------------------------------------------------
+    def execute(self, sql, parametres=None, **nommes):
+        parametres = nommes or parametres
+        if _BLOC.match(sql):
+            self._executer_bloc(sql, [parametres or {}])
+            return None
+        if _ROLES.search(sql):
+            roles = UTILISATEURS.get(self.connection.username, ('', ()))[1]
+            self._resultat([('GRANTED_ROLE',)], [(role,) for role in roles])
+            return self
+        db = self.connection._db
+        try:
+            if _ECRITURE.match(sql):
+                self.connection._debut_ecriture()
+            curseur = db.execute(traduire_sql(sql), self._binds(parametres))
+        except (sqlite3.Error, _ErreurApplication) as error:
+            raise _traduire(error) from None
+        if curseur.description is None:
+            self._resultat(None, [])
+            self.rowcount = curseur.rowcount
+            return None
+        self._resultat(curseur.description, curseur.fetchall())
+        return self
+
+    def executemany(self, sql, lignes, batcherrors=False, arraydmlrowcounts=False):
+        lignes = list(lignes)
+        if _BLOC.match(sql):
+            self._executer_bloc(sql, lignes)
+            return
+        requete = traduire_sql(sql)
+        self._erreurs_lot = []
+        self.connection._debut_ecriture()
+        db = self.connection._db
+        total = 0
+        for i, ligne in enumerate(lignes):
+            try:
+                total += db.execute(requete, self._binds(ligne)).rowcount
+            except sqlite3.Error as error:
+                if not batcherrors:
+                    raise _traduire(error) from None
+                erreur = _traduire(error).args[0]
+                self._erreurs_lot.append(_Erreur(erreur.code, erreur.message, offset=i))
+        self._resultat(None, [])
+        self.rowcount = total
+
+    def getbatcherrors(self):
+        return list(self._erreurs_lot)
+
+    def _binds(self, parametres):
+        if parametres is None:
+            return ()
+        if isinstance(parametres, dict):
+            return {cle: (valeur.getvalue() if isinstance(valeur, Var) else valeur)
+                    for cle, valeur in parametres.items()}
+        return tuple(parametres)
+
+    def _resultat(self, description, lignes):
+        self._lignes = lignes
+        self._position = 0
+        self.rowcount = len(lignes) if description else -1
+        if description is None:
+            self.description = None
+            return
+        colonnes = list(zip(*lignes)) if lignes else [()] * len(description)
+        self.description = [
+            FetchInfo(col[0].upper(), _type_colonne(colonnes[i]), None, None, None, None, True)
+            for i, col in enumerate(description)
+        ]
+
+    def _executer_bloc(self, sql, lignes):
+        """Blocs des passages groupés : une procédure par ligne, erreur dans :erreur"""
+        bloc = _BLOC_LOT.match(sql)
+        if not bloc:
+            raise _non_pris_en_charge('Bloc PL/SQL')
+        nom, arguments, variable_erreur = bloc.groups()
+        procedure = PROCEDURES.get(_nom_sous_programme(nom))
+        if procedure is None:
+            raise _non_pris_en_charge(f'Procédure {nom}')
+        noms = [a.strip().lstrip(':') for a in arguments.split(',') if a.strip()]
+        for i, ligne in enumerate(lignes):
+            valeurs = dict(ligne) if isinstance(ligne, dict) else dict(zip(
+                [n for n in noms if n not in self._tailles], ligne))
+            entrees = [valeurs[n] for n in noms if n not in self._tailles]
+            try:
+                resultats = self.connection._appeler_procedure(procedure, entrees)
+            except Error as error:
+                self._tailles[variable_erreur].setvalue(i, str(error))
+                continue
+            sorties = [n for n in noms if n in self._tailles]
+            for n, valeur in zip(sorties, resultats):
+                self._tailles[n].setvalue(i, valeur)
+
+    def callproc(self, nom, parametres=(), keyword_parameters=None):
+        procedure = PROCEDURES.get(_nom_sous_programme(nom))
+        if procedure is None:
+            raise _non_pris_en_charge(f'Procédure {nom}')
+        entrees = [p for p in parametres if not isinstance(p, Var)]
+        sorties = [p for p in parametres if isinstance(p, Var)]
+        resultats = self.connection._appeler_procedure(procedure, entrees)
+        for variable, valeur in zip(sorties, resultats):
+            variable.setvalue(0, valeur)
+        return list(parametres)
+
+    def callfunc(self, nom, type_retour, parametres=(), keyword_parameters=None):
+        nom = _nom_sous_programme(nom)
+        fonction = FONCTIONS.get(nom)
+        if fonction is None:
+            raise _non_pris_en_charge(f'Fonction {nom}')
+        try:
+            if nom in FONCTIONS_ECRITURE:
+                self.connection._debut_ecriture()
+            valeur = fonction(self.connection._db, *parametres)
+        except (sqlite3.Error, _ErreurApplication) as error:
+            raise _traduire(error) from None
+        return type_retour(valeur) if type_retour in (int, float, str) and valeur is not None else valeur
+
+    # -- variables ------------------------------------------------------
+    def var(self, type_, size=0, arraysize=1, **options):
+        return Var(type_, arraysize)
+
+    def arrayvar(self, type_, valeurs, size=0):
+        variable = Var(type_, len(valeurs))
+        variable.values = list(valeurs)
+        return variable
+
+    def setinputsizes(self, *positionnels, **nommes):
+        self._tailles = {nom: v for nom, v in nommes.items() if isinstance(v, Var)}
+        return self._tailles
+
+    # -- lecture --------------------------------------------------------
+    def _fabriquer(self, lignes):
+        if self.rowfactory is None:
+            return lignes
+        return [self.rowfactory(*ligne) for ligne in lignes]
+
+    def fetchone(self):
+        if self._position >= len(self._lignes):
+            return None
+        ligne = self._lignes[self._position]
+        self._position += 1
+        return self._fabriquer([ligne])[0]
+
+    def fetchmany(self, nombre=None):
+        nombre = nombre or self.arraysize
+        lignes = self._lignes[self._position:self._position + nombre]
+        self._position += len(lignes)
+        return self._fabriquer(lignes)
+
+    def fetchall(self):
+        lignes = self._lignes[self._position:]
+        self._position = len(self._lignes)
+        return self._fabriquer(lignes)
+
+    def __iter__(self):
+        while True:
+            ligne = self.fetchone()
+            if ligne is None:
+                return
+            yield ligne
+
+    def close(self):
+        self._lignes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Connection:
+    def __init__(self, user=None, pool=None):
+        self.username = (user or '').upper()
+        self._pool = pool
+        self._db = _ouvrir()
+        self._transaction = False
+        self.autocommit = False
+
+    def cursor(self):
+        return Cursor(self)
+
+    def _debut_ecriture(self):
+        if not self._transaction:
+            try:
+                self._db.execute('BEGIN IMMEDIATE')
+            except sqlite3.Error as error:
+                raise _traduire(error) from None
+            self._transaction = True
+
+    def _appeler_procedure(self, procedure, entrees):
+        """Appel d'une procédure du schéma : COMMIT en fin, ROLLBACK puis RAISE en cas d'erreur"""
+        self._debut_ecriture()
+        try:
+            resultats = procedure(self._db, *entrees)
+        except (sqlite3.Error, _ErreurApplication) as error:
+            self.rollback()
+            raise _traduire(error) from None
+        self.commit()
+        return resultats
+
+    def commit(self):
+        if self._transaction:
+            self._transaction = False
+            self._db.execute('COMMIT')
+
+    def rollback(self):
+        if self._transaction:
+            self._transaction = False
+            self._db.execute('ROLLBACK')
+
+    def gettype(self, nom):
+        raise _non_pris_en_charge(f'Type objet {nom}')
+
+    def ping(self):
+        return None
+
+    def close(self):
+        self.rollback()
+        if self._pool is not None:
+            self._pool.release(self)
+        else:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """Pool de sessions : `max` connexions SQLite, attente bornée par wait_timeout (ms)"""
+
+    def __init__(self, user=None, password=None, dsn=None, min=1, max=2, increment=1,
+                 homogeneous=True, getmode=POOL_GETMODE_WAIT, wait_timeout=0, **options):
+        self.user = user
+        self.homogeneous = homogeneous
+        self.min = min
+        self.max = max
+        self.getmode = getmode
+        self.wait_timeout = wait_timeout
+        self._libres = []
+        self._places = threading.BoundedSemaphore(max)
+        self._verrou = threading.Lock()
+        self._ouvertes = 0
+        self._occupees = 0
+
+    @property
+    def opened(self):
+        return self._ouvertes
+
+    @property
+    def busy(self):
+        return self._occupees
+
+    def acquire(self, user=None, password=None, **options):
+        if not self.homogeneous:
+            attendu = UTILISATEURS.get((user or '').upper())
+            if attendu is None or attendu[0] != password:
+                raise _erreur(DatabaseError, 1017, 'invalid username/password; logon denied')
+        delai = self.wait_timeout / 1000 if self.getmode == POOL_GETMODE_TIMEDWAIT else None
+        if not self._places.acquire(timeout=delai):
+            raise _erreur(DatabaseError, 24459, 'OCISessionGet() timed out waiting for pool to create new connections')
+        with self._verrou:
+            self._occupees += 1
+            if self.homogeneous and self._libres:
+                return self._libres.pop()
+            self._ouvertes += 1
+        return Connection(user or self.user, pool=self)
+
+    def release(self, connection):
+        connection.rollback()
+        with self._verrou:
+            self._occupees -= 1
+            if self.homogeneous:
+                self._libres.append(connection)
+            else:
+                self._ouvertes -= 1
+                connection._db.close()
+        self._places.release()
+
+    def drop(self, connection):
+        connection.rollback()
+        with self._verrou:
+            self._occupees -= 1
+            self._ouvertes -= 1
+        connection._pool = None
+        connection._db.close()
+        self._places.release()
+
+    def close(self, force=False):
+        with self._verrou:
+            libres, self._libres = self._libres, []
+            self._ouvertes -= len(libres)
+        for connection in libres:
+            connection._db.close()
+
+
+def create_pool(**options):
+    if _BASE['chemin'] is None:
+        raise InterfaceError('faux_oracledb : installer() doit être appelé avant de créer un pool')
+    return ConnectionPool(**options)
+
+def connect(user=None, password=None, dsn=None, **options):
+    if _BASE['chemin'] is None:
+        raise InterfaceError('faux_oracledb : installer() doit être appelé avant de se connecter')
+    return Connection(user)
+
+def create_pool_async(**options):
+    raise _non_pris_en_charge('Pool asynchrone')
+
+def init_oracle_client(**options):
+    return None
+
+
+# ========================================================
+# SERVEUR HORS LIGNE
+# ========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hote', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--base', help='Fichier SQLite (défaut : fichier temporaire recréé)')
+    parser.add_argument('--places', type=int, default=200)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--historique', type=int, default=2000, help='Passages terminés pré-chargés')
+    parser.add_argument('--verbeux', action='store_true', help='Garde les journaux INFO de app.py')
+    args = parser.parse_args()
+
+    chemin = installer(args.base, places=args.places, clients=args.clients, historique=args.historique)
+    import app
+    from werkzeug.serving import make_server
+
+    # Pas d'échantillonneur : OCCUPATION_HISTORIQUE (migration 4) n'existe pas ici
+    app.OCCUPATION_CONFIG['actif'] = False
+    if not args.verbeux:
+        logging.getLogger('app').setLevel(logging.WARNING)
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    serveur = make_server(args.hote, args.port, app.app, threaded=True)
+    print(f"app.py servie sur http://{args.hote}:{serveur.port} (base {chemin})", flush=True)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == '__main__':
+    main()
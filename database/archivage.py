@@ -0,0 +1,215 @@
+"""
+Archivage des partitions mensuelles closes de RESERVATION et PAIEMENT.
+
+Depuis la migration 5, RESERVATION (date_entree) et PAIEMENT (date_paiement)
+sont partitionnées par mois. Une partition est close lorsque son mois est
+antérieur aux `mois_actifs` derniers mois ; deux traitements sont possibles :
+  - compresser : la partition reste en place, déplacée en ligne et compressée ;
+  - archiver   : les lignes sont copiées dans *_ARCHIVE puis retirées de la
+    table active (TRUNCATE pour PAIEMENT, DELETE pour RESERVATION et ses
+    tickets, référencés par clé étrangère).
+
+PAIEMENT_DAILY n'est pas affecté : le TRUNCATE ne déclenche pas le trigger de
+cumul, l'historique des revenus reste complet.
+
+Usage :
+    python database/archivage.py                          # compresse au-delà de 12 mois
+    python database/archivage.py --mode archiver --mois 24
+    python database/archivage.py --lister                 # partitions et état
+
+Depuis Python :
+    from database.archivage import archiver
+    archiver(connection, mois_actifs=12, mode='archiver')
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import oracledb
+from app import DB_CONFIG, TABLE_OWNER
+
+logger = logging.getLogger(__name__)
+
+MODES = ('compresser', 'archiver')
+
+# Table partitionnée -> table d'archive ; PAIEMENT d'abord (il référence RESERVATION)
+TABLES_ARCHIVEES = {
+    'PAIEMENT': 'PAIEMENT_ARCHIVE',
+    'RESERVATION': 'RESERVATION_ARCHIVE',
+}
+
+_NOM_PARTITION = re.compile(r'^[A-Z0-9_$#]+$')
+_DATE_HIGH_VALUE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+
+# ========================================================
+# PARTITIONS
+# ========================================================
+def limite_active(mois_actifs, aujourd_hui=None):
+    """Premier jour du plus ancien mois actif : les partitions bornées en dessous sont closes"""
+    aujourd_hui = aujourd_hui or date.today()
+    mois = aujourd_hui.year * 12 + aujourd_hui.month - 1 - mois_actifs
+    return datetime(mois // 12, mois % 12 + 1, 1)
+
+
+def lister_partitions(cursor, table):
+    """Partitions de `table` : [(nom, borne_sup, compression, nb_lignes_estimé)] par borne croissante"""
+    cursor.execute("""
+        SELECT partition_name, high_value, compression, num_rows
+        FROM ALL_TAB_PARTITIONS
+        WHERE table_owner = :owner AND table_name = :table_name
+    """, {'owner': TABLE_OWNER, 'table_name': table})
+    partitions = []
+    for nom, high_value, compression, nb_lignes in cursor:
+        # HIGH_VALUE est un LONG : "TO_DATE(' 2025-02-01 00:00:00', ...)"
+        trouve = _DATE_HIGH_VALUE.search(high_value or '')
+        if not trouve or not _NOM_PARTITION.match(nom):
+            logger.warning(f"Partition {table}.{nom} ignorée (borne illisible: {high_value})")
+            continue
+        partitions.append((nom, datetime.strptime(trouve.group(1), '%Y-%m-%d'), compression, nb_lignes))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def partitions_closes(cursor, table, limite):
+    """Partitions entièrement antérieures à `limite`"""
+    return [p for p in lister_partitions(cursor, table) if p[1] <= limite]
+
+
+# ========================================================
+# TRAITEMENTS
+# ========================================================
+def compresser_partition(cursor, table, partition):
+    """Reconstruit la partition compressée, sans bloquer les lectures ni les index"""
+    cursor.execute(f"""
+        ALTER TABLE {TABLE_OWNER}.{table} MOVE PARTITION {partition}
+        COMPRESS ONLINE UPDATE INDEXES
+    """)
+
+
+def archiver_paiements(cursor, partition):
+    """Copie la partition dans PAIEMENT_ARCHIVE puis la vide ; retourne le nombre de lignes copiées"""
+    cursor.execute(f"LOCK TABLE {TABLE_OWNER}.PAIEMENT PARTITION ({partition}) IN EXCLUSIVE MODE")
+    cursor.execute(f"""
+        INSERT INTO {TABLE_OWNER}.PAIEMENT_ARCHIVE
+        SELECT p.* FROM {TABLE_OWNER}.PAIEMENT PARTITION ({partition}) p
+        WHERE NOT EXISTS (SELECT 1 FROM {TABLE_OWNER}.PAIEMENT_ARCHIVE a
+                          WHERE a.id_paiement = p.id_paiement)
+    """)
+    copiees = cursor.rowcount
+    # Le DDL valide la copie ; le TRUNCATE ne touche pas PAIEMENT_DAILY
+    cursor.execute(f"""
+        ALTER TABLE {TABLE_OWNER}.PAIEMENT TRUNCATE PARTITION {partition}
+        UPDATE GLOBAL INDEXES
+    """)
+    # Un TRUNCATE ne déclenche pas le trigger de version : les ETag des listes de
+    # paiements doivent changer quand même. Transaction autonome (migration 9) :
+    # l'incrément est validé aussitôt, même si rien n'est validé après lui, et
+    # ne garde pas la ligne de PAIEMENT verrouillée pour les passages
+    cursor.callproc(f"{TABLE_OWNER}.incrementer_version", ['PAIEMENT'])
+    return copiees
+
+
+def archiver_reservations(cursor, partition):
+    """Déplace les réservations terminées et sans paiement actif (avec leurs tickets) ;
+    retourne (lignes déplacées, lignes conservées)"""
+    cursor.execute(f"LOCK TABLE {TABLE_OWNER}.RESERVATION PARTITION ({partition}) IN EXCLUSIVE MODE")
+    # Réservations déplaçables : sortie enregistrée, paiements déjà archivés
+    selection = f"""
+        SELECT r.id_reservation FROM {TABLE_OWNER}.RESERVATION PARTITION ({partition}) r
+        WHERE r.date_sortie IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM {TABLE_OWNER}.PAIEMENT p
+                          WHERE p.id_reservation = r.id_reservation)
+    """
+    cursor.execute(f"""
+        INSERT INTO {TABLE_OWNER}.TICKET_ARCHIVE
+        SELECT t.* FROM {TABLE_OWNER}.TICKET t
+        WHERE t.id_reservation IN ({selection})
+          AND NOT EXISTS (SELECT 1 FROM {TABLE_OWNER}.TICKET_ARCHIVE a WHERE a.id_ticket = t.id_ticket)
+    """)
+    cursor.execute(f"""
+        INSERT INTO {TABLE_OWNER}.RESERVATION_ARCHIVE
+        SELECT r.* FROM {TABLE_OWNER}.RESERVATION r
+        WHERE r.id_reservation IN ({selection})
+          AND NOT EXISTS (SELECT 1 FROM {TABLE_OWNER}.RESERVATION_ARCHIVE a
+                          WHERE a.id_reservation = r.id_reservation)
+    """)
+    cursor.execute(f"DELETE FROM {TABLE_OWNER}.TICKET WHERE id_reservation IN ({selection})")
+    cursor.execute(f"""
+        DELETE FROM {TABLE_OWNER}.RESERVATION PARTITION ({partition})
+        WHERE id_reservation IN ({selection})
+    """)
+    deplacees = cursor.rowcount
+    cursor.execute(f"SELECT COUNT(*) FROM {TABLE_OWNER}.RESERVATION PARTITION ({partition})")
+    return deplacees, cursor.fetchone()[0]
+
+
+def archiver(connection, mois_actifs=12, mode='compresser'):
+    """Traite les partitions closes de RESERVATION et PAIEMENT ; retourne le compte rendu par table"""
+    if mode not in MODES:
+        raise ValueError(f"mode doit valoir {', '.join(MODES)}")
+    if mois_actifs < 1:
+        raise ValueError("mois_actifs doit être supérieur ou égal à 1")
+
+    limite = limite_active(mois_actifs)
+    rapport = {}
+    cursor = connection.cursor()
+    try:
+        for table in TABLES_ARCHIVEES:
+            rapport[table] = []
+            for nom, borne, compression, _ in partitions_closes(cursor, table, limite):
+                if mode == 'compresser':
+                    if compression == 'ENABLED':
+                        continue
+                    compresser_partition(cursor, table, nom)
+                    ligne = {'partition': nom, 'avant': borne.date().isoformat(), 'compressee': True}
+                elif table == 'PAIEMENT':
+                    ligne = {'partition': nom, 'avant': borne.date().isoformat(),
+                             'archivees': archiver_paiements(cursor, nom)}
+                else:
+                    deplacees, conservees = archiver_reservations(cursor, nom)
+                    connection.commit()
+                    ligne = {'partition': nom, 'avant': borne.date().isoformat(),
+                             'archivees': deplacees, 'conservees': conservees}
+                logger.info(f"{table} {ligne}")
+                rapport[table].append(ligne)
+    except oracledb.Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return rapport
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=MODES, default='compresser', help='Traitement des partitions closes')
+    parser.add_argument('--mois', type=int, default=12, help='Nombre de mois gardés actifs (défaut : 12)')
+    parser.add_argument('--lister', action='store_true', help='Affiche les partitions sans rien modifier')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    connection = oracledb.connect(**DB_CONFIG)
+    try:
+        if args.lister:
+            limite = limite_active(args.mois)
+            cursor = connection.cursor()
+            for table in TABLES_ARCHIVEES:
+                for nom, borne, compression, nb_lignes in lister_partitions(cursor, table):
+                    etat = 'close' if borne <= limite else 'active'
+                    print(f"{table:<12} {nom:<20} < {borne.date()}  {etat:<6} "
+                          f"compression={compression} lignes≈{nb_lignes if nb_lignes is not None else '?'}")
+            return
+        rapport = archiver(connection, args.mois, args.mode)
+        for table, lignes in rapport.items():
+            print(f"{table}: {len(lignes)} partition(s) traitée(s)")
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,512 @@
+"""
+Migrations versionnées du schéma (appliquées depuis Python).
+
+database/parking_schema.sql crée le schéma de base (version 0) ; chaque
+migration ci-dessous s'applique une seule fois et est enregistrée dans la
+table SCHEMA_VERSION du propriétaire des tables.
+
+Usage :
+    python database/migrations.py            # applique les migrations en attente
+    python database/migrations.py --statut   # affiche la version courante
+    python database/migrations.py --cible 1  # s'arrête à la version 1
+
+Depuis Python :
+    from database.migrations import appliquer_migrations
+    appliquer_migrations(connection)
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import oracledb
+from app import DB_CONFIG, TABLE_OWNER, TABLES_VERSIONNEES
+
+logger = logging.getLogger(__name__)
+
+# Erreurs signifiant qu'une instruction a déjà été appliquée (relance après un
+# échec partiel : le DDL Oracle valide chaque instruction séparément)
+ERREURS_DEJA_APPLIQUE = {
+    955,    # ORA-00955 : nom déjà utilisé par un objet existant
+    1408,   # ORA-01408 : cette liste de colonnes est déjà indexée
+    1430,   # ORA-01430 : colonne déjà présente dans la table
+    1442,   # ORA-01442 : colonne déjà NOT NULL
+    2260,   # ORA-02260 : la table ne peut avoir qu'une clé primaire
+    2275,   # ORA-02275 : contrainte référentielle déjà présente
+}
+
+# ========================================================
+# MIGRATIONS
+# ========================================================
+def _partitionner_par_mois(table, colonne, index_locaux):
+    """Bloc convertissant `table` en partitionnement mensuel par intervalle (sans effet si déjà partitionnée)"""
+    index = ', '.join(f'{nom} LOCAL' for nom in index_locaux)
+    return f"""
+        DECLARE
+            v_partitionnee NUMBER;
+        BEGIN
+            SELECT COUNT(*) INTO v_partitionnee FROM ALL_PART_TABLES
+            WHERE owner = '{TABLE_OWNER}' AND table_name = '{table}';
+            IF v_partitionnee = 0 THEN
+                EXECUTE IMMEDIATE q'[
+                    ALTER TABLE {TABLE_OWNER}.{table} MODIFY
+                    PARTITION BY RANGE ({colonne}) INTERVAL (NUMTOYMINTERVAL(1, 'MONTH'))
+                    (PARTITION p_origine VALUES LESS THAN (DATE '2024-01-01'))
+                    ONLINE UPDATE INDEXES ({index})
+                ]';
+            END IF;
+        END;
+    """
+
+MIGRATIONS = [
+    {
+        'version': 1,
+        'description': 'Index des prédicats chauds',
+        'instructions': [
+            # date_sortie IS NULL : id_reservation (non nul) garantit que
+            # les réservations en cours figurent aussi dans l'index
+            f"CREATE INDEX {TABLE_OWNER}.idx_res_sortie ON {TABLE_OWNER}.RESERVATION(date_sortie, date_entree, id_reservation)",
+            f"CREATE INDEX {TABLE_OWNER}.idx_place_dispo ON {TABLE_OWNER}.PLACE(disponible)",
+            f"CREATE INDEX {TABLE_OWNER}.idx_paiement_date ON {TABLE_OWNER}.PAIEMENT(date_paiement, id_paiement)",
+            f"CREATE INDEX {TABLE_OWNER}.idx_abonnement_client ON {TABLE_OWNER}.ABONNEMENT(id_client, statut)",
+            f"CREATE INDEX {TABLE_OWNER}.idx_paiement_res ON {TABLE_OWNER}.PAIEMENT(id_reservation)",
+        ]
+    },
+    {
+        'version': 2,
+        'description': 'Index des clés de pagination des listes',
+        'instructions': [
+            f"CREATE INDEX {TABLE_OWNER}.idx_res_entree ON {TABLE_OWNER}.RESERVATION(date_entree, id_reservation)",
+            f"CREATE INDEX {TABLE_OWNER}.idx_client_nom ON {TABLE_OWNER}.CLIENT(nom, prenom, id_client)",
+            f"CREATE INDEX {TABLE_OWNER}.idx_abonnement_inscription ON {TABLE_OWNER}.ABONNEMENT(date_inscription, id_abonne)",
+        ]
+    },
+    {
+        'version': 3,
+        'description': 'Cumul journalier des paiements (PAIEMENT_DAILY)',
+        'instructions': [
+            f"""
+            CREATE TABLE {TABLE_OWNER}.PAIEMENT_DAILY (
+                jour DATE NOT NULL,
+                mode_paiement VARCHAR2(20) NOT NULL,
+                nb_paiements NUMBER DEFAULT 0 NOT NULL,
+                montant_total NUMBER(14,2) DEFAULT 0 NOT NULL,
+                CONSTRAINT pk_paiement_daily PRIMARY KEY (jour, mode_paiement)
+            ) ORGANIZATION INDEX
+            """,
+            # Ajoute un delta au cumul d'un jour ; l'INSERT concurrent du
+            # premier paiement du jour se replie sur l'UPDATE
+            f"""
+            CREATE OR REPLACE PROCEDURE {TABLE_OWNER}.cumuler_paiement (
+                p_date IN DATE,
+                p_mode IN VARCHAR2,
+                p_nb IN NUMBER,
+                p_montant IN NUMBER
+            ) IS
+                v_jour DATE := TRUNC(p_date);
+                v_mode VARCHAR2(20) := NVL(p_mode, 'Inconnu');
+            BEGIN
+                UPDATE PAIEMENT_DAILY
+                SET nb_paiements = nb_paiements + p_nb,
+                    montant_total = montant_total + p_montant
+                WHERE jour = v_jour AND mode_paiement = v_mode;
+                IF SQL%ROWCOUNT = 0 THEN
+                    BEGIN
+                        INSERT INTO PAIEMENT_DAILY (jour, mode_paiement, nb_paiements, montant_total)
+                        VALUES (v_jour, v_mode, p_nb, p_montant);
+                    EXCEPTION
+                        WHEN DUP_VAL_ON_INDEX THEN
+                            UPDATE PAIEMENT_DAILY
+                            SET nb_paiements = nb_paiements + p_nb,
+                                montant_total = montant_total + p_montant
+                            WHERE jour = v_jour AND mode_paiement = v_mode;
+                    END;
+                END IF;
+            END cumuler_paiement;
+            """,
+            # Maintenu dans la transaction de valider_sortie (et de tout autre écriture)
+            f"""
+            CREATE OR REPLACE TRIGGER {TABLE_OWNER}.maj_paiement_daily
+            AFTER INSERT OR UPDATE OF date_paiement, mode_paiement, montant OR DELETE ON {TABLE_OWNER}.PAIEMENT
+            FOR EACH ROW
+            BEGIN
+                IF DELETING OR UPDATING THEN
+                    cumuler_paiement(:OLD.date_paiement, :OLD.mode_paiement, -1, -:OLD.montant);
+                END IF;
+                IF INSERTING OR UPDATING THEN
+                    cumuler_paiement(:NEW.date_paiement, :NEW.mode_paiement, 1, :NEW.montant);
+                END IF;
+            END;
+            """,
+            # Reconstruction depuis l'historique, trigger déjà actif : le verrou
+            # SHARE attend les paiements en cours et bloque les suivants le
+            # temps du recalcul (rejouable sans double comptage)
+            f"""
+            BEGIN
+                LOCK TABLE {TABLE_OWNER}.PAIEMENT IN SHARE MODE;
+                DELETE FROM {TABLE_OWNER}.PAIEMENT_DAILY;
+                INSERT INTO {TABLE_OWNER}.PAIEMENT_DAILY (jour, mode_paiement, nb_paiements, montant_total)
+                SELECT TRUNC(date_paiement), NVL(mode_paiement, 'Inconnu'), COUNT(*), SUM(montant)
+                FROM {TABLE_OWNER}.PAIEMENT
+                GROUP BY TRUNC(date_paiement), NVL(mode_paiement, 'Inconnu');
+                COMMIT;
+            END;
+            """,
+            f"GRANT SELECT ON {TABLE_OWNER}.PAIEMENT_DAILY TO R_ADMIN",
+        ]
+    },
+    {
+        'version': 4,
+        'description': "Historique de l'occupation par type de place",
+        'instructions': [
+            f"""
+            CREATE TABLE {TABLE_OWNER}.OCCUPATION_HISTORIQUE (
+                instant DATE NOT NULL,
+                type_place VARCHAR2(30) NOT NULL,
+                places_total NUMBER NOT NULL,
+                places_occupees NUMBER NOT NULL,
+                CONSTRAINT pk_occupation_historique PRIMARY KEY (instant, type_place)
+            ) ORGANIZATION INDEX COMPRESS 1
+            """,
+            f"GRANT SELECT ON {TABLE_OWNER}.OCCUPATION_HISTORIQUE TO R_ADMIN",
+        ]
+    },
+    {
+        'version': 5,
+        'description': 'Partitionnement mensuel de RESERVATION et PAIEMENT, tables d\'archive',
+        'instructions': [
+            # Une clé de partitionnement par intervalle ne peut pas être NULL
+            f"ALTER TABLE {TABLE_OWNER}.RESERVATION MODIFY (date_entree NOT NULL)",
+            f"ALTER TABLE {TABLE_OWNER}.PAIEMENT MODIFY (date_paiement NOT NULL)",
+            # Conversion en ligne ; les index sur la date deviennent locaux, la
+            # clé primaire et les index de jointure restent globaux
+            _partitionner_par_mois('RESERVATION', 'date_entree', ['idx_res_entree', 'idx_res_sortie']),
+            _partitionner_par_mois('PAIEMENT', 'date_paiement', ['idx_paiement_date']),
+            f"CREATE TABLE {TABLE_OWNER}.RESERVATION_ARCHIVE COMPRESS AS SELECT * FROM {TABLE_OWNER}.RESERVATION WHERE 1 = 0",
+            f"CREATE TABLE {TABLE_OWNER}.TICKET_ARCHIVE COMPRESS AS SELECT * FROM {TABLE_OWNER}.TICKET WHERE 1 = 0",
+            f"CREATE TABLE {TABLE_OWNER}.PAIEMENT_ARCHIVE COMPRESS AS SELECT * FROM {TABLE_OWNER}.PAIEMENT WHERE 1 = 0",
+            f"ALTER TABLE {TABLE_OWNER}.RESERVATION_ARCHIVE ADD CONSTRAINT pk_reservation_archive PRIMARY KEY (id_reservation)",
+            f"ALTER TABLE {TABLE_OWNER}.TICKET_ARCHIVE ADD CONSTRAINT pk_ticket_archive PRIMARY KEY (id_ticket)",
+            f"ALTER TABLE {TABLE_OWNER}.PAIEMENT_ARCHIVE ADD CONSTRAINT pk_paiement_archive PRIMARY KEY (id_paiement)",
+        ]
+    },
+    {
+        'version': 6,
+        'description': 'Marqueurs des passages rejoués depuis le journal local',
+        'instructions': [
+            # Une ligne par événement appliqué, validée avec le passage lui-même
+            f"""
+            CREATE TABLE {TABLE_OWNER}.PASSAGE_JOURNAL (
+                source VARCHAR2(32) NOT NULL,
+                id_evenement NUMBER NOT NULL,
+                date_application DATE NOT NULL,
+                id_ticket NUMBER,
+                id_reservation NUMBER,
+                numero_place VARCHAR2(20),
+                tarif_horaire NUMBER(10,2),
+                montant NUMBER(10,2),
+                duree_heures NUMBER,
+                id_paiement NUMBER,
+                CONSTRAINT pk_passage_journal PRIMARY KEY (source, id_evenement)
+            )
+            """,
+        ]
+    },
+    {
+        'version': 7,
+        'description': 'Versions des tables (ETag et cache partagés par les processus)',
+        'instructions': [
+            f"""
+            CREATE TABLE {TABLE_OWNER}.VERSION_DONNEES (
+                nom_table VARCHAR2(30) PRIMARY KEY,
+                version NUMBER DEFAULT 0 NOT NULL
+            )
+            """,
+            *[f"""
+              INSERT INTO {TABLE_OWNER}.VERSION_DONNEES (nom_table)
+              SELECT '{table}' FROM DUAL
+              WHERE NOT EXISTS (SELECT 1 FROM {TABLE_OWNER}.VERSION_DONNEES WHERE nom_table = '{table}')
+              """ for table in TABLES_VERSIONNEES],
+            # Trigger d'instruction : une incrémentation par écriture, validée
+            # (ou annulée) avec elle
+            *[f"""
+              CREATE OR REPLACE TRIGGER {TABLE_OWNER}.version_{table.lower()}
+              AFTER INSERT OR UPDATE OR DELETE ON {TABLE_OWNER}.{table}
+              BEGIN
+                  UPDATE {TABLE_OWNER}.VERSION_DONNEES SET version = version + 1
+                  WHERE nom_table = '{table}';
+              END;
+              """ for table in TABLES_VERSIONNEES],
+        ]
+    },
+    {
+        'version': 8,
+        'description': 'Index du statut des paiements (statistiques)',
+        'instructions': [
+            # Les paiements valides des statistiques sont comptés dans l'index
+            # (local : suit la compression et l'archivage des partitions)
+            f"CREATE INDEX {TABLE_OWNER}.idx_paiement_statut ON {TABLE_OWNER}.PAIEMENT(statut) LOCAL",
+        ]
+    },
+    {
+        'version': 9,
+        'description': 'Versions des tables incrémentées hors de la transaction des écritures',
+        'instructions': [
+            # Transaction autonome : la ligne de VERSION_DONNEES n'est verrouillée
+            # que le temps de l'incrément, jamais jusqu'au COMMIT de l'écriture
+            # (passages concurrents, import ou archivage longs). La version peut
+            # donc changer avant la validation : app.py tient compte de ce délai.
+            f"""
+            CREATE OR REPLACE PROCEDURE {TABLE_OWNER}.incrementer_version (p_table IN VARCHAR2) IS
+                PRAGMA AUTONOMOUS_TRANSACTION;
+            BEGIN
+                UPDATE {TABLE_OWNER}.VERSION_DONNEES SET version = version + 1
+                WHERE nom_table = p_table;
+                COMMIT WRITE BATCH NOWAIT;
+            END incrementer_version;
+            """,
+            *[f"""
+              CREATE OR REPLACE TRIGGER {TABLE_OWNER}.version_{table.lower()}
+              AFTER INSERT OR UPDATE OR DELETE ON {TABLE_OWNER}.{table}
+              BEGIN
+                  {TABLE_OWNER}.incrementer_version('{table}');
+              END;
+              """ for table in TABLES_VERSIONNEES],
+        ]
+    },
+    {
+        'version': 10,
+        'description': "Date d'inscription obligatoire (clé de pagination des abonnements)",
+        'instructions': [
+            # a.date_inscription est la première clé de CLES_ABONNEMENTS : un NULL
+            # (trié en tête en DESC) donne un curseur qui ne correspond à aucune
+            # ligne. Les rares lignes sans date reprennent la durée de s_abonner.
+            f"""
+            UPDATE {TABLE_OWNER}.ABONNEMENT
+            SET date_inscription = NVL(date_expiration - 30, DATE '2000-01-01')
+            WHERE date_inscription IS NULL
+            """,
+            f"ALTER TABLE {TABLE_OWNER}.ABONNEMENT MODIFY (date_inscription NOT NULL)",
+        ]
+    },
+    {
+        'version': 11,
+        'description': 'Passages sans COMMIT (marqueur du journal validé avec le passage)',
+        'instructions': [
+            # Corps de ajouter_entree / valider_sortie sans COMMIT ni ROLLBACK :
+            # la transaction reste à l'appelant. Le rejeu du journal écrit le
+            # marqueur PASSAGE_JOURNAL et ses résultats avant de tout valider.
+            f"""
+            CREATE OR REPLACE PROCEDURE {TABLE_OWNER}.enregistrer_entree (
+                p_nom IN VARCHAR2,
+                p_prenom IN VARCHAR2,
+                p_telephone IN VARCHAR2,
+                p_PMR IN CHAR,
+                p_id_ticket OUT NUMBER,
+                p_id_reservation OUT NUMBER,
+                p_numero_place OUT VARCHAR2,
+                p_tarif_horaire OUT NUMBER
+            ) IS
+                v_id_client NUMBER;
+                v_id_place NUMBER;
+                v_id_tarif NUMBER;
+                v_type_client VARCHAR2(20);
+            BEGIN
+                BEGIN
+                    SELECT id_client INTO v_id_client FROM CLIENT
+                    WHERE telephone = p_telephone;
+                    IF NOT verifier_abonnement(v_id_client) THEN
+                        DBMS_OUTPUT.PUT_LINE('Client non abonné, mais déjà enregistré.');
+                    END IF;
+                EXCEPTION
+                    WHEN NO_DATA_FOUND THEN
+                        v_id_client := ajouter_client(p_nom, p_prenom, p_telephone, p_PMR);
+                END;
+
+                v_id_place := chercher_place_libre(p_PMR);
+                IF v_id_place IS NULL THEN
+                    RAISE_APPLICATION_ERROR(-20001, 'Aucune place disponible !');
+                END IF;
+
+                SELECT numero_place INTO p_numero_place
+                FROM PLACE
+                WHERE id_place = v_id_place;
+
+                v_type_client := type_client_tarif(v_id_client);
+                p_tarif_horaire := tarif_par_type(v_type_client);
+                v_id_tarif := id_tarif_par_type(v_type_client);
+
+                INSERT INTO RESERVATION (id_reservation, id_client, id_place, id_tarif, date_entree, date_sortie, statut, montant_total)
+                VALUES (seq_reservation.NEXTVAL, v_id_client, v_id_place, v_id_tarif, SYSDATE, NULL, 'Confirmee', NULL)
+                RETURNING id_reservation INTO p_id_reservation;
+
+                INSERT INTO TICKET (id_ticket, id_reservation, date_emission)
+                VALUES (seq_ticket.NEXTVAL, p_id_reservation, SYSDATE)
+                RETURNING id_ticket INTO p_id_ticket;
+            END enregistrer_entree;
+            """,
+            f"""
+            CREATE OR REPLACE PROCEDURE {TABLE_OWNER}.enregistrer_sortie (
+                p_id_ticket IN NUMBER,
+                p_mode_paiement VARCHAR2,
+                p_montant OUT NUMBER,
+                p_duree OUT NUMBER,
+                p_id_paiement OUT NUMBER
+            ) IS
+                v_tarif NUMBER;
+                v_id_client NUMBER;
+                v_id_place NUMBER;
+                v_date_entree DATE;
+                v_id_reservation NUMBER;
+            BEGIN
+                SELECT id_reservation INTO v_id_reservation
+                FROM TICKET
+                WHERE id_ticket = p_id_ticket;
+
+                IF verifier_paiement(v_id_reservation) > 0 THEN
+                    RAISE_APPLICATION_ERROR(-20001, 'Paiement déjà effectué pour ce ticket.');
+                END IF;
+
+                SELECT date_entree, id_client, id_place
+                INTO v_date_entree, v_id_client, v_id_place
+                FROM RESERVATION
+                WHERE id_reservation = v_id_reservation;
+
+                v_tarif := Determiner_tarif(v_id_client);
+                p_duree := calculer_duree(v_date_entree, SYSDATE);
+                p_montant := calculer_montant(p_duree, v_tarif);
+
+                INSERT INTO PAIEMENT (id_paiement, id_reservation, date_paiement, montant, mode_paiement, statut)
+                VALUES (seq_paiement.NEXTVAL, v_id_reservation, SYSDATE, p_montant, p_mode_paiement, 'Effectue')
+                RETURNING id_paiement INTO p_id_paiement;
+
+                UPDATE RESERVATION
+                SET date_sortie = SYSDATE, statut = 'Terminee', montant_total = p_montant
+                WHERE id_reservation = v_id_reservation;
+            END enregistrer_sortie;
+            """,
+            # Les procédures publiques gardent leur contrat : validées ou annulées d'un bloc
+            f"""
+            CREATE OR REPLACE PROCEDURE {TABLE_OWNER}.ajouter_entree (
+                p_nom IN VARCHAR2,
+                p_prenom IN VARCHAR2,
+                p_telephone IN VARCHAR2,
+                p_PMR IN CHAR,
+                p_id_ticket OUT NUMBER,
+                p_id_reservation OUT NUMBER,
+                p_numero_place OUT VARCHAR2,
+                p_tarif_horaire OUT NUMBER
+            ) IS
+            BEGIN
+                enregistrer_entree(p_nom, p_prenom, p_telephone, p_PMR,
+                                   p_id_ticket, p_id_reservation, p_numero_place, p_tarif_horaire);
+                COMMIT;
+            EXCEPTION
+                WHEN OTHERS THEN
+                    ROLLBACK;
+                    RAISE;
+            END ajouter_entree;
+            """,
+            f"""
+            CREATE OR REPLACE PROCEDURE {TABLE_OWNER}.valider_sortie (
+                p_id_ticket IN NUMBER,
+                p_mode_paiement VARCHAR2,
+                p_montant OUT NUMBER,
+                p_duree OUT NUMBER,
+                p_id_paiement OUT NUMBER
+            ) IS
+            BEGIN
+                enregistrer_sortie(p_id_ticket, p_mode_paiement, p_montant, p_duree, p_id_paiement);
+                COMMIT;
+            EXCEPTION
+                WHEN OTHERS THEN
+                    ROLLBACK;
+                    RAISE;
+            END valider_sortie;
+            """,
+            f"GRANT EXECUTE ON {TABLE_OWNER}.enregistrer_entree TO R_ADMIN, R_AGENT",
+            f"GRANT EXECUTE ON {TABLE_OWNER}.enregistrer_sortie TO R_ADMIN, R_AGENT",
+        ]
+    },
+]
+
+# ========================================================
+# APPLICATION
+# ========================================================
+def _executer_ddl(cursor, instruction):
+    """Exécute une instruction DDL ; ignore celles déjà appliquées"""
+    try:
+        cursor.execute(instruction)
+    except oracledb.DatabaseError as error:
+        code = error.args[0].code if error.args else None
+        if code not in ERREURS_DEJA_APPLIQUE:
+            raise
+        logger.info(f"Déjà appliqué (ORA-{code:05d}): {instruction}")
+
+def creer_table_versions(cursor):
+    """Crée la table SCHEMA_VERSION si elle n'existe pas"""
+    _executer_ddl(cursor, f"""
+        CREATE TABLE {TABLE_OWNER}.SCHEMA_VERSION (
+            version NUMBER PRIMARY KEY,
+            description VARCHAR2(200) NOT NULL,
+            date_application DATE DEFAULT SYSDATE NOT NULL
+        )
+    """)
+
+def version_courante(cursor):
+    """Retourne la dernière version appliquée (0 = schéma de base)"""
+    cursor.execute(f"SELECT NVL(MAX(version), 0) FROM {TABLE_OWNER}.SCHEMA_VERSION")
+    return cursor.fetchone()[0]
+
+def migrations_en_attente(version, cible=None):
+    """Migrations postérieures à `version`, jusqu'à `cible` incluse"""
+    return [m for m in sorted(MIGRATIONS, key=lambda m: m['version'])
+            if m['version'] > version and (cible is None or m['version'] <= cible)]
+
+def appliquer_migrations(connection, cible=None):
+    """Applique les migrations en attente dans l'ordre ; retourne les versions appliquées"""
+    cursor = connection.cursor()
+    try:
+        creer_table_versions(cursor)
+        appliquees = []
+        for migration in migrations_en_attente(version_courante(cursor), cible):
+            logger.info(f"Migration {migration['version']}: {migration['description']}")
+            for instruction in migration['instructions']:
+                _executer_ddl(cursor, instruction)
+            cursor.execute(f"""
+                INSERT INTO {TABLE_OWNER}.SCHEMA_VERSION (version, description)
+                VALUES (:version, :description)
+            """, {'version': migration['version'], 'description': migration['description']})
+            connection.commit()
+            appliquees.append(migration['version'])
+        return appliquees
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cible', type=int, help='Version maximale à appliquer')
+    parser.add_argument('--statut', action='store_true', help='Affiche la version courante sans rien appliquer')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    connection = oracledb.connect(**DB_CONFIG)
+    try:
+        if args.statut:
+            cursor = connection.cursor()
+            creer_table_versions(cursor)
+            version = version_courante(cursor)
+            attente = [m['version'] for m in migrations_en_attente(version)]
+            print(f"Version courante: {version} ; en attente: {attente or 'aucune'}")
+            return
+        appliquees = appliquer_migrations(connection, args.cible)
+        print(f"Migrations appliquées: {appliquees or 'aucune'}")
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
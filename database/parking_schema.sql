@@ -201,6 +201,8 @@ CREATE INDEX idx_client_tel ON CLIENT(telephone);
 CREATE INDEX idx_res_client ON RESERVATION(id_client);
 CREATE INDEX idx_res_place ON RESERVATION(id_place);
 CREATE INDEX idx_ticket_res ON TICKET(id_reservation);
+-- Recherche d'une place libre par type (chercher_place_libre)
+CREATE INDEX idx_place_type_dispo ON PLACE(type_place, disponible);
 
 
 --========================================================
@@ -277,24 +279,36 @@ END;
     -- Fonction : chercher une place libre
 -----------------------------------------------------------
 
+-- La place retournée reste verrouillée (FOR UPDATE) jusqu'au COMMIT de
+-- l'appelant : deux entrées simultanées ne peuvent pas obtenir la même place,
+-- la seconde saute la ligne verrouillée (SKIP LOCKED) et prend la suivante.
 CREATE OR REPLACE FUNCTION chercher_place_libre (
     p_PMR IN CHAR
 ) RETURN NUMBER 
 IS
     v_id_place NUMBER ;
+    v_type_place PLACE.type_place%TYPE ;
+    CURSOR c_places ( p_type VARCHAR2 ) IS
+        SELECT id_place FROM PLACE
+        WHERE type_place = p_type
+          AND disponible = 'O'
+        FOR UPDATE SKIP LOCKED ;
 BEGIN
-    SELECT id_place INTO v_id_place FROM PLACE
-    WHERE disponible = 'O'
-      AND (
-           (p_PMR = 'O' AND type_place = 'Handicape')
-        OR (p_PMR = 'N' AND type_place = 'Standard') 
-            )
-      AND ROWNUM = 1;
-    RETURN v_id_place ;
-    
-EXCEPTION 
-    WHEN NO_DATA_FOUND THEN 
+    IF p_PMR = 'O' THEN
+        v_type_place := 'Handicape' ;
+    ELSIF p_PMR = 'N' THEN
+        v_type_place := 'Standard' ;
+    ELSE
         RETURN NULL ;
+    END IF ;
+
+    OPEN c_places ( v_type_place ) ;
+    FETCH c_places INTO v_id_place ;
+    IF c_places%NOTFOUND THEN
+        v_id_place := NULL ;
+    END IF ;
+    CLOSE c_places ;
+    RETURN v_id_place ;
 END;
 /
 
@@ -316,6 +330,56 @@ BEGIN
 END;
 /
 
+-----------------------------------------------------------
+    -- Fonctions : tarif et identifiant de tarif par type de client
+-----------------------------------------------------------
+-- RESULT_CACHE : TARIF ne change que quelques fois par an ; Oracle invalide
+-- automatiquement ces résultats au COMMIT d'une modification de TARIF
+-- (mettre_a_jour_tarifs compris).
+
+CREATE OR REPLACE FUNCTION tarif_par_type (
+    p_type_client IN VARCHAR2
+) RETURN NUMBER RESULT_CACHE
+IS
+    v_tarif NUMBER ;
+BEGIN
+    SELECT tarif_horaire INTO v_tarif
+    FROM TARIF
+    WHERE type_client = p_type_client ;
+    RETURN v_tarif ;
+END ;
+/
+
+CREATE OR REPLACE FUNCTION id_tarif_par_type (
+    p_type_client IN VARCHAR2
+) RETURN NUMBER RESULT_CACHE
+IS
+    v_id_tarif NUMBER ;
+BEGIN
+    SELECT id_tarif INTO v_id_tarif
+    FROM TARIF
+    WHERE type_client = p_type_client ;
+    RETURN v_id_tarif ;
+END ;
+/
+
+-----------------------------------------------------------
+    -- Fonction : type de client ('Abonne' / 'Non_Abonne')
+-----------------------------------------------------------
+-- Non mise en cache : verifier_abonnement expire les abonnements échus.
+
+CREATE OR REPLACE FUNCTION type_client_tarif (
+    p_id_client IN NUMBER
+) RETURN VARCHAR2
+IS
+BEGIN
+    IF verifier_abonnement( p_id_client ) THEN
+        RETURN 'Abonne' ;
+    END IF ;
+    RETURN 'Non_Abonne' ;
+END ;
+/
+
 -----------------------------------------------------------
     -- Fonction : Determiner le tarif horaire du client
 -----------------------------------------------------------
@@ -324,18 +388,8 @@ CREATE OR REPLACE FUNCTION Determiner_tarif (
     p_id_client IN NUMBER
 ) RETURN NUMBER
 IS
-    v_tarif NUMBER ;
 BEGIN 
-    IF verifier_abonnement( p_id_client ) THEN
-        SELECT tarif_horaire INTO v_tarif 
-        FROM TARIF
-        WHERE type_client = 'Abonne' ;
-    ELSE
-        SELECT tarif_horaire INTO v_tarif 
-        FROM TARIF
-        WHERE type_client = 'Non_Abonne' ;
-    END IF ;
-    RETURN v_tarif ;
+    RETURN tarif_par_type( type_client_tarif( p_id_client ) ) ;
 END ;
 /
 
@@ -478,8 +532,10 @@ RETURN NUMBER
 IS
     v_revenu NUMBER;
 BEGIN
+    -- Intervalle semi-ouvert sur la colonne brute : utilisable par idx_paiement_date
     SELECT NVL(SUM(montant), 0) INTO v_revenu FROM PAIEMENT
-    WHERE TRUNC(date_paiement) = TRUNC(SYSDATE);
+    WHERE date_paiement >= TRUNC(SYSDATE)
+      AND date_paiement < TRUNC(SYSDATE) + 1;
     RETURN v_revenu;
 END;
 /
@@ -538,13 +594,16 @@ CREATE OR REPLACE PROCEDURE ajouter_entree (
     p_nom IN VARCHAR2 ,
     p_prenom IN VARCHAR2 ,  
     p_telephone IN VARCHAR2,
-    p_PMR IN CHAR
+    p_PMR IN CHAR,
+    p_id_ticket OUT NUMBER,
+    p_id_reservation OUT NUMBER,
+    p_numero_place OUT VARCHAR2,
+    p_tarif_horaire OUT NUMBER
 ) IS 
     v_id_client NUMBER ;
     v_id_place NUMBER ;
-    v_tarif_horaire NUMBER ;
-    v_id_reservation NUMBER ;
     v_id_tarif NUMBER ;
+    v_type_client VARCHAR2(20) ;
 BEGIN
     BEGIN
         SELECT id_client INTO v_id_client FROM CLIENT
@@ -563,26 +622,30 @@ BEGIN
         RAISE_APPLICATION_ERROR ( -20001, 'Aucune place disponible !' );
     END IF ;
     
-    v_tarif_horaire := Determiner_tarif ( v_id_client ) ;
+    SELECT numero_place INTO p_numero_place
+    FROM PLACE
+    WHERE id_place = v_id_place ;
     
-    SELECT id_tarif INTO v_id_tarif 
-    FROM TARIF
-    WHERE tarif_horaire = v_tarif_horaire ;
+    v_type_client := type_client_tarif ( v_id_client ) ;
+    p_tarif_horaire := tarif_par_type ( v_type_client ) ;
+    v_id_tarif := id_tarif_par_type ( v_type_client ) ;
     
-    v_id_reservation := seq_reservation.NEXTVAL;
     INSERT INTO RESERVATION ( id_reservation, id_client, id_place, id_tarif, date_entree, date_sortie, statut, montant_total )
-    VALUES( v_id_reservation, v_id_client, v_id_place, v_id_tarif, SYSDATE, NULL, 'Confirmee', NULL ) ;
+    VALUES( seq_reservation.NEXTVAL, v_id_client, v_id_place, v_id_tarif, SYSDATE, NULL, 'Confirmee', NULL )
+    RETURNING id_reservation INTO p_id_reservation ;
     
     INSERT INTO TICKET ( id_ticket, id_reservation, date_emission )
-    VALUES( seq_ticket.NEXTVAL, v_id_reservation, SYSDATE ) ;
+    VALUES( seq_ticket.NEXTVAL, p_id_reservation, SYSDATE )
+    RETURNING id_ticket INTO p_id_ticket ;
     
     COMMIT ;
-    DBMS_OUTPUT.PUT_LINE('Entrée validée pour le client ' || p_nom || p_prenom || ', place ' || v_id_place);
+    DBMS_OUTPUT.PUT_LINE('Entrée validée pour le client ' || p_nom || p_prenom || ', place ' || p_numero_place);
     
 EXCEPTION
     WHEN OTHERS THEN
         ROLLBACK ;
         DBMS_OUTPUT.PUT_LINE('Erreur lors de l’entrée : ' || SQLERRM);
+        RAISE ;
 END ;
 /
 
@@ -592,11 +655,12 @@ END ;
 
 CREATE OR REPLACE PROCEDURE valider_sortie ( 
     p_id_ticket  IN NUMBER ,
-    p_mode_paiement VARCHAR2
+    p_mode_paiement VARCHAR2,
+    p_montant OUT NUMBER,
+    p_duree OUT NUMBER,
+    p_id_paiement OUT NUMBER
 ) IS
     v_paiemnt_exist NUMBER;
-    v_duree NUMBER ;
-    v_montant NUMBER ;
     v_tarif NUMBER ;
     v_id_client NUMBER ;
     v_id_place NUMBER ;
@@ -620,23 +684,25 @@ BEGIN
     WHERE id_reservation = v_id_reservation;
     
     v_tarif := Determiner_tarif ( v_id_client ) ;
-    v_duree := calculer_duree ( v_date_entree , SYSDATE ) ;
-    v_montant := calculer_montant ( v_duree , v_tarif ) ;
+    p_duree := calculer_duree ( v_date_entree , SYSDATE ) ;
+    p_montant := calculer_montant ( p_duree , v_tarif ) ;
     
     INSERT INTO PAIEMENT (id_paiement, id_reservation, date_paiement, montant, mode_paiement, statut )
-    VALUES ( seq_paiement.NEXTVAL , v_id_reservation, SYSDATE, v_montant, p_mode_paiement, 'Effectue' ) ;
+    VALUES ( seq_paiement.NEXTVAL , v_id_reservation, SYSDATE, p_montant, p_mode_paiement, 'Effectue' )
+    RETURNING id_paiement INTO p_id_paiement ;
     
     UPDATE RESERVATION
-    SET date_sortie = SYSDATE, statut = 'Terminee', montant_total = v_montant
+    SET date_sortie = SYSDATE, statut = 'Terminee', montant_total = p_montant
     WHERE id_reservation = v_id_reservation ;
     
     COMMIT ;
-    DBMS_OUTPUT.PUT_LINE('Sortie validée. Montant à payer : ' || v_montant || ' DH');
+    DBMS_OUTPUT.PUT_LINE('Sortie validée. Montant à payer : ' || p_montant || ' DH');
     
 EXCEPTION
     WHEN OTHERS THEN
     ROLLBACK ;
     DBMS_OUTPUT.PUT_LINE ( 'Erreur lors de la sortie : ' || SQLERRM ) ;
+    RAISE ;
     
 END valider_sortie ;
 /
@@ -721,6 +787,9 @@ GRANT EXECUTE ON verifier_abonnement     TO R_ADMIN, R_AGENT;
 GRANT EXECUTE ON chercher_place_libre    TO R_ADMIN, R_AGENT;
 GRANT EXECUTE ON verifier_paiement       TO R_ADMIN, R_AGENT;
 GRANT EXECUTE ON Determiner_tarif        TO R_ADMIN, R_AGENT;
+GRANT EXECUTE ON tarif_par_type          TO R_ADMIN, R_AGENT;
+GRANT EXECUTE ON id_tarif_par_type       TO R_ADMIN, R_AGENT;
+GRANT EXECUTE ON type_client_tarif       TO R_ADMIN, R_AGENT;
 GRANT EXECUTE ON calculer_duree          TO R_ADMIN, R_AGENT;
 GRANT EXECUTE ON calculer_montant        TO R_ADMIN, R_AGENT;
 GRANT EXECUTE ON total_clients           TO R_ADMIN;
@@ -0,0 +1,158 @@
+"""
+Contrôle de régression des plans d'exécution.
+
+Exécute EXPLAIN PLAN pour chaque requête de app.py et échoue (code 1) dès
+qu'un TABLE ACCESS FULL apparaît sur une table volumineuse. Les requêtes sont
+collectées de deux façons :
+  - les instructions du registre app.SQL (les blocs PL/SQL sont écartés) ;
+  - les requêtes de liste composées par executer_page/requete_export à partir
+    des constructeurs requete_*() (avec prédicat de clé et filtres de dates).
+
+Les plans dépendent des statistiques : lancer le contrôle sur une base de
+volumétrie représentative, statistiques à jour, migrations appliquées.
+
+Usage :
+    python database/verifier_plans.py             # contrôle (Oracle requis)
+    python database/verifier_plans.py --lister    # affiche les requêtes collectées
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+RACINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RACINE)
+
+import oracledb
+import app
+
+# Tables sur lesquelles un parcours complet est une régression
+TABLES_VOLUMINEUSES = {'CLIENT', 'ABONNEMENT', 'RESERVATION', 'TICKET', 'PAIEMENT'}
+
+# Parcours complets assumés : étiquette de requête -> tables autorisées
+SCANS_AUTORISES = {
+    'export:clients': {'CLIENT'},
+    'export:abonnements': {'ABONNEMENT', 'CLIENT'},
+    'export:reservations': {'RESERVATION', 'CLIENT'},
+    'export:paiements': {'PAIEMENT', 'RESERVATION', 'CLIENT'},
+}
+
+# Valeurs de clé quelconques : seule la forme du prédicat compte pour le plan
+_VALEURS_CLE = {
+    'NOM': 'A', 'PRENOM': 'A', 'ID_CLIENT': 0,
+    'DATE_INSCRIPTION': '2025-01-01', 'ID_ABONNE': 0,
+    'DATE_ENTREE': '2025-01-01', 'ID_RESERVATION': 0,
+    'DATE_PAIEMENT': '2025-01-01', 'ID_PAIEMENT': 0,
+}
+
+
+# ========================================================
+# COLLECTE DES REQUÊTES
+# ========================================================
+class _RequeteCapturee(Exception):
+    pass
+
+
+class CurseurCapture:
+    """Curseur factice : mémorise la requête puis interrompt executer_page"""
+
+    def execute(self, query, params=None):
+        self.query = query
+        raise _RequeteCapturee
+
+
+def requetes_enregistrees():
+    """Instructions du registre app.SQL (hors bases liste_*, expliquées une fois composées)"""
+    return [(f'sql:{nom}', texte) for nom, texte in app.SQL.items() if not nom.startswith('liste_')]
+
+
+def requetes_de_liste():
+    """Requêtes de liste telles qu'executer_page et requete_export les composent"""
+    variantes = {
+        'clients': (app.requete_clients(), app.CLES_CLIENTS, False),
+        'abonnements': (app.requete_abonnements(), app.CLES_ABONNEMENTS, True),
+        'abonnements_actifs': (app.requete_abonnements(actif_only=True), app.CLES_ABONNEMENTS, True),
+        'reservations': (app.requete_reservations(), app.CLES_RESERVATIONS, True),
+        'reservations_en_cours': (app.requete_reservations(en_cours=True), app.CLES_RESERVATIONS, True),
+        'reservations_periode': (app.requete_reservations(debut=datetime(2025, 1, 1), fin=datetime(2025, 2, 1)),
+                                 app.CLES_RESERVATIONS, True),
+        'paiements': (app.requete_paiements(), app.CLES_PAIEMENTS, True),
+        'paiements_periode': (app.requete_paiements(debut=datetime(2025, 1, 1), fin=datetime(2025, 2, 1)),
+                              app.CLES_PAIEMENTS, True),
+    }
+    requetes = []
+    for nom, ((query, conditions, params), cles, descendant) in variantes.items():
+        for page, valeurs in (('premiere', None), ('suivante', [_VALEURS_CLE[c] for _, c in cles])):
+            curseur = CurseurCapture()
+            try:
+                app.executer_page(curseur, query, conditions, params, cles, descendant,
+                                  pagination=(app.PAGINATION_CONFIG['limite_defaut'], valeurs))
+            except _RequeteCapturee:
+                requetes.append((f'page:{nom}:{page}', curseur.query))
+        if not nom.endswith(('_actifs', '_en_cours', '_periode')):
+            requetes.append((f'export:{nom}', app.requete_export(query, conditions, cles)))
+    return requetes
+
+
+def est_requete(sql):
+    """Vrai pour le SQL explicable (hors PL/SQL et DDL)"""
+    return sql.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'MERGE')
+
+
+# ========================================================
+# CONTRÔLE DES PLANS
+# ========================================================
+def parcours_complets(cursor, identifiant, sql):
+    """Tables parcourues en entier (TABLE ACCESS FULL) dans le plan de `sql`"""
+    cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{identifiant}' FOR {sql}")
+    cursor.execute("""
+        SELECT object_name FROM PLAN_TABLE
+        WHERE statement_id = :id
+          AND operation = 'TABLE ACCESS'
+          AND options LIKE 'FULL%'
+    """, {'id': identifiant})
+    tables = {row[0] for row in cursor}
+    cursor.execute("DELETE FROM PLAN_TABLE WHERE statement_id = :id", {'id': identifiant})
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lister', action='store_true', help='Affiche les requêtes collectées sans Oracle')
+    args = parser.parse_args()
+
+    requetes = [(e, sql) for e, sql in requetes_enregistrees() + requetes_de_liste() if est_requete(sql)]
+
+    if args.lister:
+        for etiquette, sql in requetes:
+            print(f"-- {etiquette}\n{' '.join(sql.split())}\n")
+        print(f"{len(requetes)} requête(s)")
+        return
+
+    connection = oracledb.connect(**app.DB_CONFIG)
+    regressions = []
+    try:
+        cursor = connection.cursor()
+        for i, (etiquette, sql) in enumerate(requetes):
+            try:
+                tables = parcours_complets(cursor, f'vp{i}', sql)
+            except oracledb.DatabaseError as error:
+                regressions.append((etiquette, f'EXPLAIN impossible: {error}'))
+                continue
+            fautives = (tables & TABLES_VOLUMINEUSES) - SCANS_AUTORISES.get(etiquette, set())
+            statut = 'ÉCHEC' if fautives else 'ok'
+            print(f"{statut:<6} {etiquette}" + (f"  FULL: {', '.join(sorted(fautives))}" if fautives else ''))
+            if fautives:
+                regressions.append((etiquette, f"TABLE ACCESS FULL sur {', '.join(sorted(fautives))}"))
+        connection.rollback()
+    finally:
+        connection.close()
+
+    print(f"\n{len(requetes)} requête(s) expliquée(s), {len(regressions)} régression(s)")
+    for etiquette, motif in regressions:
+        print(f"  {etiquette}: {motif}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Contrôle des instructions SQL : aucune route ne concatène une entrée utilisateur.
+
+Deux volets, sans Oracle :
+  - statique : dans app.py et app_async.py, le SQL passé à execute,
+    executemany, callproc et callfunc vient du registre (SQL['...'], clé
+    existante) ou d'une variable/constante ; jamais d'une f-string, d'une
+    concaténation ou d'un formatage (%, format, join). Les textes du registre
+    sont des littéraux, et le schéma n'est écrit qu'au travers de TABLE_OWNER
+    ({schema} dans le registre, sous_programme() pour PL/SQL) ;
+  - dynamique : chaque route de app.py est appelée (session administrateur)
+    sur la base SQLite de benchmarks/faux_oracledb.py, une fois par paramètre
+    d'URL et par champ JSON avec une valeur marquée. Le marqueur ne doit
+    jamais apparaître dans le texte SQL exécuté, seulement dans les variables
+    de liaison, et chaque texte exécuté doit provenir du registre (tel quel,
+    ou une base liste_* complétée par executer_page/requete_export).
+Les requêtes du journal SQLite des passages ne sont pas concernées.
+
+Usage :
+    python database/verifier_requetes.py             # les deux volets
+    python database/verifier_requetes.py --statique  # analyse du source seulement
+"""
+import argparse
+import ast
+import logging
+import os
+import re
+import sys
+
+RACINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RACINE)
+
+FICHIERS = ('app.py', 'app_async.py')
+METHODES_SQL = ('execute', 'executemany', 'callproc', 'callfunc')
+
+# Nom de schéma écrit en dur devant une table (FROM Parking.TICKET...)
+_SCHEMA_EN_DUR = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+[A-Za-z_]\w*\.[A-Za-z_]')
+
+# Valeur injectée : le jeton est recherché sans tenir compte de la casse
+JETON = 'zq7inj'
+MARQUEUR = f"{JETON}' OR '1'='1"
+
+PARAMETRES_URL = ('type', 'actif', 'en_cours', 'limit', 'cursor', 'shape', 'format', 'from', 'to',
+                  'date_debut', 'date_fin', 'tz', 'group', 'points', 'heures', 'type_client', 'abonner')
+
+CORPS_VALIDE = {
+    'nom': 'Controle', 'prenom': 'Requetes', 'telephone': '0699000001', 'pmr': 'N',
+    'id_ticket': 1, 'mode_paiement': 'Carte', 'tarif_abonne': 5, 'tarif_non_abonne': 10,
+    'username': 'ADMIN1', 'password': 'Admin#2025', 'role': 'ADMIN'
+}
+
+# Routes dont le corps est une liste d'événements ou de clients
+ROUTES_LISTE = ('/entree/batch', '/sortie/batch', '/clients/import')
+
+# Routes non appelées : flux SSE sans fin, fin de session
+ROUTES_IGNOREES = ('/events', '/logout')
+
+
+# ========================================================
+# VOLET STATIQUE
+# ========================================================
+def _est_journal(noeud):
+    """Vrai pour un appel sur le journal SQLite des passages (_journal() ou connexion)"""
+    if isinstance(noeud, ast.Call) and isinstance(noeud.func, ast.Name):
+        return noeud.func.id == '_journal'
+    return isinstance(noeud, ast.Name) and noeud.id == 'connexion'
+
+
+def _cle_registre(noeud):
+    """Clé littérale de SQL['...'] (None si ce n'est pas un accès au registre par constante)"""
+    if (isinstance(noeud, ast.Subscript) and isinstance(noeud.value, ast.Name) and noeud.value.id == 'SQL'
+            and isinstance(noeud.slice, ast.Constant) and isinstance(noeud.slice.value, str)):
+        return noeud.slice.value
+    return None
+
+
+def _nature_sql(noeud):
+    """Motif de refus du premier argument d'un appel SQL (None s'il est accepté)"""
+    if isinstance(noeud, ast.JoinedStr):
+        return 'f-string'
+    if isinstance(noeud, ast.BinOp):
+        return 'concaténation ou formatage (+, %)'
+    if isinstance(noeud, ast.Call):
+        return 'texte calculé par un appel (format, join...)'
+    if isinstance(noeud, ast.Constant):
+        return 'littéral hors registre'
+    if isinstance(noeud, ast.Subscript) and not (isinstance(noeud.value, ast.Name) and noeud.value.id == 'SQL'):
+        return 'texte lu hors registre'
+    return None
+
+
+def cles_enregistrees(arbre):
+    """Noms passés à requete('nom', ...) dans le source, avec les appels non littéraux"""
+    cles, fautes = set(), []
+    for noeud in ast.walk(arbre):
+        if isinstance(noeud, ast.Call) and isinstance(noeud.func, ast.Name) and noeud.func.id == 'requete':
+            if len(noeud.args) != 2 or not all(isinstance(a, ast.Constant) and isinstance(a.value, str)
+                                               for a in noeud.args):
+                fautes.append((noeud.lineno, "requete() attend un nom et un texte littéraux"))
+            else:
+                cles.add(noeud.args[0].value)
+    return cles, fautes
+
+
+def controle_statique():
+    """Retourne la liste des violations [(fichier:ligne, motif)] du source"""
+    arbres = {}
+    for nom in FICHIERS:
+        with open(os.path.join(RACINE, nom), encoding='utf-8') as f:
+            arbres[nom] = ast.parse(f.read())
+    cles, fautes = cles_enregistrees(arbres['app.py'])
+    violations = [(f'app.py:{ligne}', motif) for ligne, motif in fautes]
+
+    for nom, arbre in arbres.items():
+        def visiter(noeud, fonction):
+            for enfant in ast.iter_child_nodes(noeud):
+                if isinstance(enfant, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    visiter(enfant, enfant.name)
+                    continue
+                lieu = f'{nom}:{getattr(enfant, "lineno", "?")}'
+                if (isinstance(enfant, ast.Call) and isinstance(enfant.func, ast.Attribute)
+                        and enfant.func.attr in METHODES_SQL and enfant.args
+                        and not _est_journal(enfant.func.value)):
+                    motif = _nature_sql(enfant.args[0])
+                    if motif:
+                        violations.append((lieu, f'{enfant.func.attr}() : {motif}'))
+                cle = _cle_registre(enfant)
+                if cle is not None and cle not in cles:
+                    violations.append((lieu, f"SQL['{cle}'] n'est pas enregistrée"))
+                if isinstance(enfant, ast.JoinedStr) and fonction != 'sous_programme' and any(
+                        isinstance(v, ast.FormattedValue) and isinstance(v.value, ast.Name)
+                        and v.value.id == 'TABLE_OWNER' for v in enfant.values):
+                    violations.append((lieu, 'TABLE_OWNER interpolé hors du registre'))
+                if (isinstance(enfant, ast.Constant) and isinstance(enfant.value, str)
+                        and _SCHEMA_EN_DUR.search(enfant.value)):
+                    violations.append((lieu, f"schéma écrit en dur : {_SCHEMA_EN_DUR.search(enfant.value).group(0)}"))
+                visiter(enfant, fonction)
+
+        visiter(arbre, '<module>')
+    return violations
+
+
+# ========================================================
+# VOLET DYNAMIQUE
+# ========================================================
+def _contient_jeton(valeur):
+    return JETON in repr(valeur).lower()
+
+
+def _variantes(regle):
+    """(query_string, corps JSON) d'une route : une valeur marquée à la fois"""
+    variantes = [({parametre: MARQUEUR}, None) for parametre in PARAMETRES_URL]
+    if regle.methods & {'POST', 'PUT'}:
+        for champ in CORPS_VALIDE:
+            corps = dict(CORPS_VALIDE, **{champ: MARQUEUR})
+            variantes.append(({}, [corps] if regle.rule in ROUTES_LISTE else corps))
+    return variantes
+
+
+def controle_dynamique():
+    """Appelle chaque route avec des valeurs marquées ; retourne (violations, nb d'appels SQL)"""
+    sys.path.insert(0, os.path.join(RACINE, 'benchmarks'))
+    import faux_oracledb
+    faux_oracledb.installer()
+    logging.disable(logging.CRITICAL)
+    import app
+
+    app.OCCUPATION_CONFIG['actif'] = False
+    textes = set(app.SQL.values())
+    bases = tuple(texte for nom, texte in app.SQL.items() if nom.startswith('liste_'))
+    sous_programmes = {valeur for nom, valeur in vars(app).items()
+                       if nom.startswith(('PROCEDURE_', 'FONCTION_')) and isinstance(valeur, str)}
+
+    appels = []
+
+    def espionner(methode):
+        origine = getattr(faux_oracledb.Cursor, methode)
+
+        def espion(self, sql, *args, **kwargs):
+            appels.append((methode, sql, (args, kwargs)))
+            return origine(self, sql, *args, **kwargs)
+        setattr(faux_oracledb.Cursor, methode, espion)
+
+    for methode in METHODES_SQL:
+        espionner(methode)
+
+    client = app.app.test_client()
+    anonyme = app.app.test_client()
+    reponse = client.post('/login', json={'username': 'ADMIN1', 'password': 'Admin#2025', 'role': 'ADMIN'})
+    if reponse.status_code != 200:
+        raise SystemExit(f"Connexion administrateur impossible ({reponse.status_code})")
+
+    violations = []
+    jeton_lie = False
+    regles = sorted((r for r in app.app.url_map.iter_rules()
+                     if r.endpoint != 'static' and r.rule not in ROUTES_IGNOREES),
+                    key=lambda r: r.rule)
+    for regle in regles:
+        chemin = re.sub(r'<int:\w+>', '1', regle.rule)
+        for methode in sorted(regle.methods - {'HEAD', 'OPTIONS'}):
+            for query_string, corps in _variantes(regle):
+                del appels[:]
+                session = anonyme if regle.rule == '/login' else client
+                session.open(chemin, method=methode, query_string=query_string, json=corps)
+                for nom_methode, sql, parametres in appels:
+                    lieu = f'{methode} {regle.rule}'
+                    if _contient_jeton(sql):
+                        violations.append((lieu, f'valeur utilisateur dans le texte SQL : {" ".join(sql.split())[:120]}'))
+                    elif nom_methode in ('callproc', 'callfunc'):
+                        if sql not in sous_programmes:
+                            violations.append((lieu, f'sous-programme hors registre : {sql}'))
+                    elif sql not in textes and not sql.startswith(bases):
+                        violations.append((lieu, f'instruction hors registre : {" ".join(sql.split())[:120]}'))
+                    jeton_lie = jeton_lie or _contient_jeton(parametres)
+
+    if not jeton_lie:
+        violations.append(('(contrôle)', "le marqueur n'a atteint aucune variable de liaison : contrôle inopérant"))
+    return violations, len(regles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--statique', action='store_true', help='Analyse du source seulement (sans Flask)')
+    args = parser.parse_args()
+
+    violations = controle_statique()
+    print(f"Volet statique : {len(violations)} violation(s)")
+    if not args.statique:
+        dynamiques, nb_routes = controle_dynamique()
+        print(f"Volet dynamique : {nb_routes} route(s) appelée(s), {len(dynamiques)} violation(s)")
+        violations += dynamiques
+
+    for lieu, motif in violations:
+        print(f"  {lieu}: {motif}")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == '__main__':
+    main()